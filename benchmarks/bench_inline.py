@@ -0,0 +1,108 @@
+"""
+Compares the single-pass text_to_textnodes tokenizer with the previous pipeline
+of five chained split passes, on a fixed sample and on generated lines with an
+increasing share of marked up words.
+
+Usage:
+    python3 benchmarks/bench_inline.py [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from corpus import generate_inline  # noqa: E402
+from inline_markdown import (  # noqa: E402
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_textnodes,
+)
+from textnode import (  # noqa: E402
+    TextNode,
+    text_type_bold,
+    text_type_code,
+    text_type_italic,
+    text_type_text,
+)
+
+SAMPLE = (
+    "Some **bold text** and *italic text* with `inline code`, an image "
+    "![Alt text](https://www.example.com/image.png) and a "
+    "[link](https://www.example.com) followed by more plain words. "
+) * 20
+
+# Shares of words carrying inline markup in the generated lines.
+DENSITIES = (0.0, 0.2, 0.5, 1.0)
+
+
+def chained_text_to_textnodes(text):
+    """
+    The previous implementation of text_to_textnodes, kept as a baseline.
+
+    Args:
+        text (str): The input text string.
+
+    Returns:
+        list: A list of TextNode objects.
+    """
+
+    nodes = [TextNode(text, text_type_text)]
+    nodes = split_nodes_delimiter(nodes, "`", text_type_code)
+    nodes = split_nodes_delimiter(nodes, "**", text_type_bold)
+    nodes = split_nodes_delimiter(nodes, "*", text_type_italic)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+
+def bench(function, texts, number, repeat):
+    """
+    Times a tokenizer on a set of texts.
+
+    Args:
+        function (callable): The tokenizer to time.
+        texts (list): The texts to tokenize.
+        number (int): The number of calls per measurement.
+        repeat (int): The number of measurements.
+
+    Returns:
+        float: The best time per call, in microseconds.
+    """
+
+    timer = timeit.Timer(lambda: [function(text) for text in texts])
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    repeat = parse_args(argv).repeat
+    cases = [("sample", [SAMPLE])]
+
+    for density in DENSITIES:
+        rng = random.Random(0)
+        lines = [generate_inline(rng, 40, density) for _ in range(50)]
+        cases.append((f"density={density}", lines))
+
+    print(f"{'text':<14}{'chained us':>12}{'single us':>12}{'speedup':>10}")
+
+    for name, texts in cases:
+        for text in texts:
+            assert chained_text_to_textnodes(text) == text_to_textnodes(text)
+
+        chained = bench(chained_text_to_textnodes, texts, 100, repeat)
+        single = bench(text_to_textnodes, texts, 100, repeat)
+        print(f"{name:<14}{chained:12.1f}{single:12.1f}{chained / single:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Reports the memory used to parse one synthetic page: peak traced memory, the
+number of live allocations held by the resulting tree and the peak RSS. With
+--baseline, the sources of an earlier revision are measured as well, in a
+separate process, and both are reported side by side.
+
+Usage:
+    python3 benchmarks/bench_memory.py [--paragraphs 2000] [--baseline REV]
+"""
+
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# The measurements, with their labels, units and number of decimals.
+METRICS = (
+    ("nodes", "nodes", 1, 0),
+    ("tree_size", "tree size (MiB)", 1024 * 1024, 2),
+    ("allocations", "live allocations", 1, 0),
+    ("bytes_per_node", "bytes per node", 1, 1),
+    ("peak_traced", "peak traced (MiB)", 1024 * 1024, 2),
+    ("peak_rss", "peak RSS (MiB)", 1024, 2),
+)
+
+PARAGRAPH = (
+    "Some **bold text** and *italic text* with `inline code`, an image "
+    "![Alt text](https://www.example.com/image.png) and a "
+    "[link](https://www.example.com), then **more** *words* and `code`."
+)
+
+
+def synthetic_page(paragraphs):
+    """
+    Builds an inline-heavy markdown page.
+
+    Args:
+        paragraphs (int): The number of paragraphs and list items.
+
+    Returns:
+        str: The markdown text of the page.
+    """
+
+    lines = ["# Memory benchmark", ""]
+
+    for i in range(paragraphs):
+        lines.append(f"## Section {i}")
+        lines.append(PARAGRAPH)
+        lines.append(f"* {PARAGRAPH}")
+        lines.append(f"1. {PARAGRAPH}")
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def count_nodes(node):
+    """
+    Counts the nodes of a tree with an explicit stack, using only the children
+    of each node, so revisions without HTMLNode.walk can be measured too.
+
+    Args:
+        node (HTMLNode): The root of the tree.
+
+    Returns:
+        int: The number of nodes.
+    """
+
+    count = 0
+    stack = [node]
+
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(getattr(node, "children", None) or ())
+
+    return count
+
+
+def measure(src, paragraphs):
+    """
+    Parses the synthetic page with the modules of a source directory.
+
+    Args:
+        src (str): The directory of the modules to import.
+        paragraphs (int): The number of paragraphs and list items of the page.
+
+    Returns:
+        dict: The measurements, keyed by the names in METRICS.
+    """
+
+    sys.path.insert(0, src)
+    from markdown_blocks import markdown_to_html_node
+
+    markdown = synthetic_page(paragraphs)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+
+    node = markdown_to_html_node(markdown)
+
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    size = sum(stat.size_diff for stat in stats)
+    nodes = count_nodes(node)
+
+    return {
+        "nodes": nodes,
+        "tree_size": size,
+        "allocations": sum(stat.count_diff for stat in stats),
+        "bytes_per_node": size / nodes,
+        "peak_traced": peak,
+        "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def measure_revision(revision, paragraphs):
+    """
+    Measures the sources of a git revision in a separate process, so its peak
+    RSS is not mixed with the current one.
+
+    Args:
+        revision (str): The git revision.
+        paragraphs (int): The number of paragraphs and list items of the page.
+
+    Returns:
+        dict: The measurements, keyed by the names in METRICS.
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive = subprocess.run(
+            ["git", "-C", ROOT, "archive", revision, "src"],
+            check=True,
+            capture_output=True,
+        ).stdout
+        subprocess.run(["tar", "-x", "-C", directory], input=archive, check=True)
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--paragraphs",
+                str(paragraphs),
+                "--src",
+                os.path.join(directory, "src"),
+                "--json",
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+    return json.loads(output)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    parser.add_argument(
+        "--baseline", help="git revision to measure too, such as f1a1f5e~1"
+    )
+    parser.add_argument(
+        "--src",
+        default=os.path.join(ROOT, "src"),
+        help="directory of the modules to measure",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="print the measurements as JSON"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    current = measure(args.src, args.paragraphs)
+
+    if args.json:
+        json.dump(current, sys.stdout)
+        return
+
+    if args.baseline is None:
+        for name, label, unit, decimals in METRICS:
+            print(f"{label:<20}{current[name] / unit:14.{decimals}f}")
+
+        return
+
+    baseline = measure_revision(args.baseline, args.paragraphs)
+    print(f"{'':<20}{args.baseline:>14}{'current':>14}{'ratio':>8}")
+
+    for name, label, unit, decimals in METRICS:
+        print(
+            f"{label:<20}{baseline[name] / unit:14.{decimals}f}"
+            f"{current[name] / unit:14.{decimals}f}"
+            f"{current[name] / baseline[name]:8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Compares the explicit-stack HTMLNode renderer with the previous recursive
+to_html on deep and wide trees.
+
+Usage:
+    python3 benchmarks/bench_render.py [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from leafnode import LeafNode  # noqa: E402
+from parentnode import ParentNode  # noqa: E402
+
+
+def recursive_to_html(node):
+    """
+    The previous recursive rendering of ParentNode and LeafNode, kept as a baseline.
+
+    Args:
+        node (HTMLNode): The root of the tree.
+
+    Returns:
+        str: The HTML string representation of the tree.
+    """
+
+    if isinstance(node, LeafNode):
+        return node.to_html()
+
+    children_html = "".join([recursive_to_html(child) for child in node.children])
+    return f"<{node.tag} {node.props_to_html()}>{children_html}</{node.tag}>"
+
+
+def deep_tree(depth):
+    node = LeafNode("b", "leaf")
+
+    for _ in range(depth):
+        node = ParentNode("div", [node])
+
+    return node
+
+
+def wide_tree(width):
+    items = [ParentNode("li", [LeafNode("b", f"item {i}")]) for i in range(width)]
+    return ParentNode("ul", items)
+
+
+def bench(function, node, repeat):
+    """
+    Times a renderer on a tree.
+
+    Args:
+        function (callable): The renderer to time.
+        node (HTMLNode): The root of the tree.
+        repeat (int): The number of measurements.
+
+    Returns:
+        str: The best time in milliseconds, or the error raised by the renderer.
+    """
+
+    try:
+        function(node)
+    except RecursionError:
+        return "RecursionError"
+
+    timer = timeit.Timer(lambda: function(node))
+    return f"{min(timer.repeat(repeat=repeat, number=1)) * 1e3:.2f} ms"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    repeat = parse_args(argv).repeat
+    trees = [
+        ("deep 300", deep_tree(300)),
+        ("deep 100000", deep_tree(100000)),
+        ("wide 100000", wide_tree(100000)),
+    ]
+
+    print(f"{'tree':<14}{'recursive':>18}{'explicit stack':>18}")
+
+    for name, node in trees:
+        recursive = bench(recursive_to_html, node, repeat)
+        iterative = bench(lambda tree: tree.to_html(), node, repeat)
+        print(f"{name:<14}{recursive:>18}{iterative:>18}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Deterministic generator of synthetic markdown pages and sites for the benchmarks.
+The same seed and parameters always produce the same bytes.
+"""
+
+import os
+import random
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua enim ad minim veniam "
+    "quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo"
+).split()
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><title> {{ Title }} </title></head>
+<body><article>{{ Content }}</article></body>
+</html>
+"""
+
+
+def generate_inline(rng, words, inline_density):
+    """
+    Generates a line of text with inline markup.
+
+    Args:
+        rng (random.Random): The random generator.
+        words (int): The number of words in the line.
+        inline_density (float): The probability that a word carries inline markup.
+
+    Returns:
+        str: The generated line.
+    """
+
+    parts = []
+
+    for _ in range(words):
+        word = rng.choice(WORDS)
+
+        if rng.random() >= inline_density:
+            parts.append(word)
+            continue
+
+        kind = rng.randrange(5)
+
+        if kind == 0:
+            parts.append(f"**{word}**")
+        elif kind == 1:
+            parts.append(f"*{word}*")
+        elif kind == 2:
+            parts.append(f"`{word}`")
+        elif kind == 3:
+            parts.append(f"[{word}](https://example.com/{word})")
+        else:
+            parts.append(f"![{word}](/images/{word}.png)")
+
+    return " ".join(parts)
+
+
+def generate_markdown(seed=0, blocks=100, inline_density=0.2, list_length=5):
+    """
+    Generates a markdown page mixing every block type.
+
+    Args:
+        seed (int, optional): The random seed. Defaults to 0.
+        blocks (int, optional): The number of blocks after the title. Defaults to 100.
+        inline_density (float, optional): The probability that a word carries inline markup. Defaults to 0.2.
+        list_length (int, optional): The number of items in each list. Defaults to 5.
+
+    Returns:
+        str: The markdown text of the page.
+    """
+
+    rng = random.Random(seed)
+    lines = [f"# Page {seed}", ""]
+
+    for _ in range(blocks):
+        kind = rng.randrange(6)
+
+        if kind == 0:
+            lines.append(f"{'#' * rng.randint(2, 6)} {generate_inline(rng, 5, 0)}")
+        elif kind == 1:
+            lines.append(f"> {generate_inline(rng, 12, inline_density)}")
+        elif kind == 2:
+            lines.extend(
+                f"* {generate_inline(rng, 8, inline_density)}"
+                for _ in range(list_length)
+            )
+        elif kind == 3:
+            lines.extend(
+                f"{i}. {generate_inline(rng, 8, inline_density)}"
+                for i in range(1, list_length + 1)
+            )
+        elif kind == 4:
+            lines.append(f"```{generate_inline(rng, 6, 0)}```")
+        else:
+            lines.append(generate_inline(rng, 40, inline_density))
+
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def generate_site(root, pages=50, depth=2, seed=0, **page_options):
+    """
+    Writes a synthetic site (content, static and template.html) into a directory.
+    Pages are spread over nested directories up to the given depth.
+
+    Args:
+        root (str): The directory to write the site into.
+        pages (int, optional): The number of markdown pages. Defaults to 50.
+        depth (int, optional): The maximum nesting of content directories. Defaults to 2.
+        seed (int, optional): The random seed. Defaults to 0.
+        **page_options: Options passed to generate_markdown.
+
+    Returns:
+        list: The paths of the generated markdown files.
+    """
+
+    rng = random.Random(seed)
+    paths = []
+
+    for page in range(pages):
+        parts = [f"section{rng.randrange(3)}" for _ in range(rng.randint(0, depth))]
+        directory = os.path.join(root, "content", *parts)
+        os.makedirs(directory, exist_ok=True)
+
+        path = os.path.join(directory, f"page{page}.md")
+        with open(path, "w") as file:
+            file.write(generate_markdown(seed + page, **page_options))
+
+        paths.append(path)
+
+    os.makedirs(os.path.join(root, "static", "images"), exist_ok=True)
+
+    with open(os.path.join(root, "static", "index.css"), "w") as file:
+        file.write("body { margin: 0 }\n")
+
+    with open(os.path.join(root, "static", "images", "logo.png"), "wb") as file:
+        file.write(bytes(rng.randrange(256) for _ in range(4096)))
+
+    with open(os.path.join(root, "template.html"), "w") as file:
+        file.write(TEMPLATE)
+
+    return paths
@@ -0,0 +1,225 @@
+"""
+Benchmark suite for the markdown to HTML pipeline.
+
+Every stage is timed on a deterministic synthetic corpus and the results are
+written as JSON, so two runs can be compared with --compare.
+
+Usage:
+    python3 benchmarks/run.py [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from corpus import generate_inline, generate_markdown, generate_site  # noqa: E402
+from inline_markdown import text_to_textnodes  # noqa: E402
+from main import main as build_main  # noqa: E402
+from markdown_blocks import (  # noqa: E402
+    block_to_block_type,
+    markdown_to_block,
+    markdown_to_html_node,
+)
+
+
+def measure(function, repeat, setup=None):
+    """
+    Times a function, keeping the best and mean of several runs.
+
+    Args:
+        function (callable): The function to time.
+        repeat (int): The number of runs.
+        setup (callable, optional): Called before every run, outside the timing. Defaults to None.
+
+    Returns:
+        dict: The best and mean time of a run, in seconds.
+    """
+
+    times = []
+
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return {"best": min(times), "mean": sum(times) / len(times)}
+
+
+def bench_pipeline(args):
+    """
+    Times each stage of the pipeline on a set of synthetic pages.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+
+    Returns:
+        dict: The results of every stage, keyed by benchmark name.
+    """
+
+    results = {}
+
+    for size in args.sizes:
+        for density in args.densities:
+            name = f"blocks={size},density={density},list={args.list_length}"
+            markdown = generate_markdown(args.seed, size, density, args.list_length)
+            blocks = markdown_to_block(markdown)
+            rng = random.Random(args.seed)
+            lines = [generate_inline(rng, 40, density) for _ in range(size)]
+            node = markdown_to_html_node(markdown)
+
+            stages = {
+                "markdown_to_block": (lambda: markdown_to_block(markdown), 1),
+                "block_to_block_type": (
+                    lambda: [block_to_block_type(block) for block in blocks],
+                    len(blocks),
+                ),
+                "text_to_textnodes": (
+                    lambda: [text_to_textnodes(line) for line in lines],
+                    len(lines),
+                ),
+                "markdown_to_html_node": (lambda: markdown_to_html_node(markdown), 1),
+                "to_html": (node.to_html, 1),
+            }
+
+            for stage, (function, items) in stages.items():
+                result = measure(function, args.repeat)
+                result["items"] = items
+                result["bytes"] = len(markdown)
+                results[f"{stage}[{name}]"] = result
+
+    return results
+
+
+def bench_build(args):
+    """
+    Times end-to-end builds through main() on a generated site: a cold build
+    and a rebuild with nothing changed.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+
+    Returns:
+        dict: The results of the builds, keyed by benchmark name.
+    """
+
+    results = {}
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as root:
+        generate_site(
+            root,
+            pages=args.pages,
+            depth=args.depth,
+            seed=args.seed,
+            inline_density=args.densities[0],
+            list_length=args.list_length,
+        )
+        os.chdir(root)
+
+        def clean():
+            for directory in ("public", ".sitegenie"):
+                for path, dirs, files in os.walk(directory, topdown=False):
+                    for file in files:
+                        os.remove(os.path.join(path, file))
+                    os.rmdir(path)
+
+        def build():
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_main([])
+
+        name = f"pages={args.pages},depth={args.depth}"
+
+        try:
+            results[f"main.cold[{name}]"] = measure(build, args.repeat, clean)
+            results[f"main.noop[{name}]"] = measure(build, args.repeat)
+        finally:
+            os.chdir(cwd)
+
+    for result in results.values():
+        result["items"] = args.pages
+
+    return results
+
+
+def compare(results, baseline_path):
+    """
+    Prints the ratio between the best times of two runs.
+
+    Args:
+        results (dict): The results of the current run.
+        baseline_path (str): The path of the JSON results of a previous run.
+    """
+
+    with open(baseline_path) as file:
+        baseline = json.load(file)["results"]
+
+    print(f"{'benchmark':<70}{'baseline':>12}{'current':>12}{'ratio':>8}")
+
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+
+        before = baseline[name]["best"]
+        after = result["best"]
+        print(
+            f"{name:<70}{before * 1e3:>10.2f}ms{after * 1e3:>10.2f}ms"
+            f"{after / before:>8.2f}"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.0, 0.3])
+    parser.add_argument("--list-length", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    results = bench_pipeline(args)
+    results.update(bench_build(args))
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "compare")
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
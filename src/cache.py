@@ -0,0 +1,365 @@
+import collections
+import hashlib
+import marshal
+import os
+import tempfile
+import threading
+
+import htmlnode
+import inline_markdown
+import io_utils
+import leafnode
+import markdown_blocks
+import outline
+import parentnode
+import textnode
+
+CACHE_FORMAT = 2
+
+PARSER_MODULES = (
+    htmlnode,
+    inline_markdown,
+    io_utils,
+    leafnode,
+    markdown_blocks,
+    outline,
+    parentnode,
+    textnode,
+)
+
+
+def parser_version():
+    """
+    Computes a version of the markdown parser from the source of its modules, so
+    any change to the parser invalidates the cached fragments.
+
+    Returns:
+        str: The hexadecimal digest identifying the parser.
+    """
+
+    digest = hashlib.sha256(str(CACHE_FORMAT).encode())
+
+    for module in PARSER_MODULES:
+        with open(module.__file__, "rb") as file:
+            digest.update(file.read())
+
+    return digest.hexdigest()
+
+
+class FragmentCache:
+    """
+    FragmentCache stores the parsed output of markdown sources on disk (the page
+    title, the rendered content fragment and the table of contents), keyed by
+    the source hash and the parser version. The least recently used entries are
+    evicted once the cache grows beyond its size cap.
+
+    Attributes:
+        directory (str): The directory holding the cache entries.
+        max_size (int): The maximum total size of the entries, in bytes.
+        version (str): The parser version the entries are keyed by.
+    """
+
+    def __init__(self, directory, max_size=256 * 1024 * 1024):
+        """
+        Initializes a FragmentCache.
+
+        Args:
+            directory (str): The directory holding the cache entries.
+            max_size (int, optional): The maximum total size of the entries, in bytes. Defaults to 256 MiB.
+        """
+
+        self.directory = directory
+        self.max_size = max_size
+        self.version = parser_version()
+        self._sizes = None
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """
+        Drops the size index and the lock when the cache is sent to a worker
+        process, which rebuilds its own on first use.
+
+        Returns:
+            dict: The picklable state of the cache.
+        """
+
+        state = self.__dict__.copy()
+        state["_sizes"] = None
+        state["_total"] = 0
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores a cache sent to a worker process.
+
+        Args:
+            state (dict): The state returned by __getstate__.
+        """
+
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _path(self, source_hash):
+        """
+        Computes the path of the entry of a source.
+
+        Args:
+            source_hash (str): The hash of the markdown source.
+
+        Returns:
+            str: The path of the entry.
+        """
+
+        key = hashlib.sha256(f"{self.version}:{source_hash}".encode()).hexdigest()
+        return os.path.join(self.directory, key[:2], key)
+
+    def _index(self):
+        """
+        Loads the sizes of the existing entries, scanning the directory once, and
+        their total.
+
+        Returns:
+            dict: Maps each entry path to its size in bytes.
+        """
+
+        if self._sizes is None:
+            self._sizes = {}
+
+            if os.path.isdir(self.directory):
+                for bucket in os.scandir(self.directory):
+                    if not bucket.is_dir():
+                        continue
+
+                    for entry in os.scandir(bucket.path):
+                        self._sizes[entry.path] = entry.stat().st_size
+
+            self._total = sum(self._sizes.values())
+
+        return self._sizes
+
+    def get(self, source_hash):
+        """
+        Looks up the cached output of a source and marks it as recently used.
+
+        Args:
+            source_hash (str): The hash of the markdown source.
+
+        Returns:
+            tuple: The title, the content fragment and the table of contents, or None on a miss.
+        """
+
+        path = self._path(source_hash)
+
+        try:
+            with open(path, "rb") as file:
+                title, html, toc = marshal.load(file)
+        except (FileNotFoundError, EOFError, ValueError, TypeError):
+            return None
+
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+        return title, html, toc
+
+    def put(self, source_hash, title, html, toc=""):
+        """
+        Stores the output of a source, evicting old entries when over the size cap.
+        Safe to call from the writer threads of a pipelined build.
+
+        Args:
+            source_hash (str): The hash of the markdown source.
+            title (str): The title of the page.
+            html (str): The rendered content fragment.
+            toc (str, optional): The rendered table of contents. Defaults to an empty string.
+        """
+
+        path = self._path(source_hash)
+        data = marshal.dumps((title, html, toc))
+
+        if len(data) > self.max_size:
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+
+        os.replace(temp_path, path)
+
+        with self._lock:
+            sizes = self._index()
+            self._total += len(data) - sizes.get(path, 0)
+            sizes[path] = len(data)
+
+            if self._total > self.max_size:
+                self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache is back to 90% of its size cap.
+        Callers hold the lock of the cache.
+        """
+
+        sizes = self._index()
+        entries = []
+
+        for path in list(sizes):
+            try:
+                entries.append((os.stat(path).st_mtime_ns, path))
+            except FileNotFoundError:
+                self._total -= sizes.pop(path)
+
+        target = self.max_size * 0.9
+
+        for _, path in sorted(entries):
+            if self._total <= target:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            self._total -= sizes.pop(path)
+
+
+class MemoryCache:
+    """
+    MemoryCache keeps the parsed output of markdown sources in memory, in front
+    of an optional FragmentCache, so a long-running process such as the build
+    daemon reuses its pages without reading them back from disk. The least
+    recently used entries are evicted once they grow beyond the size cap.
+
+    Attributes:
+        backing (FragmentCache): The on-disk cache behind the memory, or None.
+        memory_size (int): The maximum total length of the entries kept in memory.
+        size (int): The current total length of the entries kept in memory.
+    """
+
+    def __init__(self, backing=None, memory_size=64 * 1024 * 1024):
+        """
+        Initializes an empty MemoryCache.
+
+        Args:
+            backing (FragmentCache, optional): The on-disk cache behind the memory. Defaults to None.
+            memory_size (int, optional): The maximum total length of the entries kept in memory. Defaults to 64 MiB.
+        """
+
+        self.backing = backing
+        self.memory_size = memory_size
+        self.size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """
+        Drops the entries and the lock when the cache is sent to a worker
+        process, which only uses the on-disk cache behind it.
+
+        Returns:
+            dict: The picklable state of the cache.
+        """
+
+        state = self.__dict__.copy()
+        state["_entries"] = collections.OrderedDict()
+        state["size"] = 0
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restores a cache sent to a worker process.
+
+        Args:
+            state (dict): The state returned by __getstate__.
+        """
+
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self):
+        """
+        int: The size of the largest entry the cache stores.
+        """
+
+        if self.backing is None:
+            return self.memory_size
+
+        return max(self.memory_size, self.backing.max_size)
+
+    def get(self, source_hash):
+        """
+        Looks up the cached output of a source in memory, then in the on-disk cache.
+
+        Args:
+            source_hash (str): The hash of the markdown source.
+
+        Returns:
+            tuple: The title, the content fragment and the table of contents, or None on a miss.
+        """
+
+        with self._lock:
+            entry = self._entries.get(source_hash)
+
+            if entry is not None:
+                self._entries.move_to_end(source_hash)
+                return entry
+
+        if self.backing is None:
+            return None
+
+        entry = self.backing.get(source_hash)
+
+        if entry is not None:
+            self._remember(source_hash, entry)
+
+        return entry
+
+    def put(self, source_hash, title, html, toc=""):
+        """
+        Stores the output of a source in memory and in the on-disk cache.
+
+        Args:
+            source_hash (str): The hash of the markdown source.
+            title (str): The title of the page.
+            html (str): The rendered content fragment.
+            toc (str, optional): The rendered table of contents. Defaults to an empty string.
+        """
+
+        self._remember(source_hash, (title, html, toc))
+
+        if self.backing is not None:
+            self.backing.put(source_hash, title, html, toc)
+
+    def _remember(self, source_hash, entry):
+        """
+        Keeps an entry in memory and evicts the least recently used entries.
+
+        Args:
+            source_hash (str): The hash of the markdown source.
+            entry (tuple): The title, the content fragment and the table of contents.
+        """
+
+        size = sum(map(len, entry))
+
+        if size > self.memory_size:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(source_hash, None)
+
+            if previous is not None:
+                self.size -= sum(map(len, previous))
+
+            self._entries[source_hash] = entry
+            self.size += size
+
+            while self.size > self.memory_size:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= sum(map(len, evicted))
@@ -0,0 +1,125 @@
+import argparse
+import json
+import socket
+import sys
+
+# Kept free of the parser imports, so the client starts as fast as the interpreter.
+SOCKET_PATH = ".sitegenie/daemon.sock"
+
+
+def read_message(stream):
+    """
+    Reads a message of the daemon protocol: a JSON object on a single line.
+
+    Args:
+        stream (io.BufferedIOBase): The stream of the connection.
+
+    Returns:
+        dict: The message, or None if the connection was closed.
+    """
+
+    line = stream.readline()
+    return json.loads(line) if line else None
+
+
+def write_message(stream, message):
+    """
+    Writes a message of the daemon protocol.
+
+    Args:
+        stream (io.BufferedIOBase): The stream of the connection.
+        message (dict): The message.
+    """
+
+    stream.write(json.dumps(message).encode("utf-8") + b"\n")
+    stream.flush()
+
+
+def send_request(request, path=SOCKET_PATH):
+    """
+    Sends a request to the build daemon and waits for its response.
+
+    Args:
+        request (dict): The request, with its command.
+        path (str, optional): The path of the daemon socket. Defaults to .sitegenie/daemon.sock.
+
+    Returns:
+        dict: The response of the daemon.
+
+    Raises:
+        OSError: If no daemon listens on the socket.
+    """
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+
+        with connection.makefile("rwb") as stream:
+            write_message(stream, request)
+            response = read_message(stream)
+
+    if response is None:
+        raise ConnectionError("The build daemon closed the connection")
+
+    return response
+
+
+def main(argv=None):
+    """
+    Sends a command to the build daemon and prints its response.
+
+    Args:
+        argv (list, optional): The command line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: The exit status, 0 on success.
+    """
+
+    parser = argparse.ArgumentParser(prog="sitegenie-client")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=("build", "status", "stop"),
+        default="build",
+        help="rebuild what changed since the last request (default), report the"
+        " state of the daemon or stop it",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="run a full build instead of an incremental one",
+    )
+    parser.add_argument(
+        "--socket",
+        default=SOCKET_PATH,
+        help="path of the socket the daemon listens on",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        response = send_request(
+            {"command": args.command, "full": args.full}, args.socket
+        )
+    except OSError as e:
+        print(f"No build daemon on {args.socket}: {e}", file=sys.stderr)
+        return 1
+
+    for output in response.get("outputs", []):
+        print(f"Updated {output}")
+
+    if not response.get("ok"):
+        print(response.get("error", "The request failed"), file=sys.stderr)
+        return 1
+
+    if args.command == "build":
+        print(f"Built in {response['elapsed'] * 1000:.1f} ms")
+    elif args.command == "status":
+        print(
+            f"Daemon {response['pid']} serving {response['pages']} pages,"
+            f" {response['builds']} builds"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
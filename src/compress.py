@@ -0,0 +1,241 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+from io_utils import replace_file
+from manifest import hash_bytes
+
+COMPRESSIBLE_EXTENSIONS = (
+    ".css",
+    ".html",
+    ".js",
+    ".json",
+    ".map",
+    ".svg",
+    ".txt",
+    ".xml",
+)
+
+
+def _gzip(data, level):
+    """
+    Compresses bytes with gzip. The header carries no timestamp, so the same
+    input always gives the same bytes.
+
+    Args:
+        data (bytes): The bytes to compress.
+        level (int): The compression level, clamped to 1-9.
+
+    Returns:
+        bytes: The compressed bytes.
+    """
+
+    return gzip.compress(data, compresslevel=max(1, min(level, 9)), mtime=0)
+
+
+def _brotli(data, level):
+    """
+    Compresses bytes with brotli.
+
+    Args:
+        data (bytes): The bytes to compress.
+        level (int): The compression quality, clamped to 0-11.
+
+    Returns:
+        bytes: The compressed bytes.
+    """
+
+    return brotli.compress(data, quality=max(0, min(level, 11)))
+
+
+def _zstd(data, level):
+    """
+    Compresses bytes with zstandard.
+
+    Args:
+        data (bytes): The bytes to compress.
+        level (int): The compression level, clamped to 1-22.
+
+    Returns:
+        bytes: The compressed bytes.
+    """
+
+    return zstd.compress(data, level=max(1, min(level, 22)))
+
+
+def available_codecs():
+    """
+    Lists the codecs that can be used: gzip, brotli when it is installed and
+    zstandard when the standard library provides it.
+
+    Returns:
+        dict: Maps the extension of each compressed sibling to its compress function.
+    """
+
+    codecs = {".gz": _gzip}
+
+    if brotli is not None:
+        codecs[".br"] = _brotli
+
+    if zstd is not None:
+        codecs[".zst"] = _zstd
+
+    return codecs
+
+
+def precompress(output_manifest, outputs, min_size=1024, level=9, threads=None):
+    """
+    Writes compressed siblings, such as index.html.gz, next to every text file
+    of the output so a static server can send them as they are. Siblings whose
+    source digest and level did not change since they were written are skipped.
+    Compression runs on a thread pool, as the codecs release the GIL.
+
+    Args:
+        output_manifest (OutputManifest): The digests of the output files, which
+            also receives the siblings.
+        outputs (iterable): The paths of the generated pages and copied assets.
+        min_size (int, optional): The size in bytes below which files are not compressed. Defaults to 1024.
+        level (int, optional): The compression level. Defaults to 9.
+        threads (int, optional): The number of compression threads. Defaults to one per CPU core.
+
+    Returns:
+        set: The paths of every sibling of the current output, written or not.
+    """
+
+    codecs = available_codecs()
+    siblings = set()
+    jobs = []
+
+    for path in outputs:
+        entry = output_manifest.files.get(path)
+
+        if entry is None or not path.endswith(COMPRESSIBLE_EXTENSIONS):
+            continue
+
+        if entry["size"] < min_size:
+            continue
+
+        fingerprint = f"{entry['digest']}:{level}"
+
+        for extension, compress in codecs.items():
+            sibling = path + extension
+            siblings.add(sibling)
+            previous = output_manifest.files.get(sibling)
+
+            if (
+                previous is not None
+                and previous.get("source") == fingerprint
+                and os.path.isfile(sibling)
+            ):
+                continue
+
+            jobs.append((path, sibling, compress, level, fingerprint))
+
+    with ThreadPoolExecutor(threads or os.cpu_count()) as pool:
+        for sibling, digest, size, fingerprint in pool.map(_compress_job, jobs):
+            output_manifest.record(sibling, digest, size, source=fingerprint)
+
+    return siblings
+
+
+def _compress_job(job):
+    """
+    Compresses a single file into its sibling.
+
+    Args:
+        job (tuple): The path of the file, the path of the sibling, the compress
+            function, the level and the fingerprint of the source.
+
+    Returns:
+        tuple: The path, digest and size of the sibling, and the fingerprint of its source.
+    """
+
+    path, sibling, compress, level, fingerprint = job
+
+    with open(path, "rb") as file:
+        data = compress(file.read(), level)
+
+    replace_file(sibling, data)
+    return sibling, hash_bytes(data), len(data), fingerprint
+
+
+def prune_compressed(output_manifest, siblings):
+    """
+    Removes the compressed siblings that are no longer part of the output, such
+    as those of removed pages or of files that became too small.
+
+    Args:
+        output_manifest (OutputManifest): The digests of the output files.
+        siblings (set): The paths of the siblings of the current output.
+
+    Returns:
+        list: The paths of the removed siblings.
+    """
+
+    removed = []
+
+    for path, entry in output_manifest.files.items():
+        if "source" not in entry or path in siblings:
+            continue
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+        removed.append(path)
+
+    return removed
+
+
+def update_compressed(output_manifest, outputs, min_size=1024, level=9, threads=None):
+    """
+    Brings the compressed siblings of the files touched by an incremental build
+    up to date: siblings of written files are compressed again when their
+    source changed, and those of removed files, or of files no longer
+    compressed, are removed.
+
+    Args:
+        output_manifest (OutputManifest): The digests of the output files, which
+            also receives the siblings.
+        outputs (iterable): The paths of the output files that were written or removed.
+        min_size (int, optional): The size in bytes below which files are not compressed. Defaults to 1024.
+        level (int, optional): The compression level. Defaults to 9.
+        threads (int, optional): The number of compression threads. Defaults to one per CPU core.
+
+    Returns:
+        list: The paths of the removed siblings.
+    """
+
+    outputs = list(outputs)
+    written = [path for path in outputs if os.path.isfile(path)]
+    siblings = precompress(output_manifest, written, min_size, level, threads)
+    extensions = list(available_codecs())
+    removed = []
+
+    for path in outputs:
+        for extension in extensions:
+            sibling = path + extension
+
+            if sibling in siblings or sibling not in output_manifest.files:
+                continue
+
+            try:
+                os.remove(sibling)
+            except FileNotFoundError:
+                pass
+
+            output_manifest.forget(sibling)
+            removed.append(sibling)
+
+    return removed
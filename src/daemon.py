@@ -0,0 +1,239 @@
+import logging
+import os
+import socket
+import socketserver
+import time
+
+from cache import MemoryCache
+from client import SOCKET_PATH, read_message, write_message
+from main import (
+    BuildError,
+    CONTENT_DIR,
+    PUBLIC_DIR,
+    STATIC_DIR,
+    TEMPLATE_PATH,
+    build,
+    open_cache,
+)
+from serve import IncrementalBuildError, IncrementalBuilder
+from watch import create_watcher
+
+
+class BuildDaemon:
+    """
+    BuildDaemon keeps a built site warm in memory: the compiled template, the
+    build manifest and the parsed pages, held in a MemoryCache in front of the
+    on-disk cache. Instead of a build plan, a watcher records which sources
+    changed, so a build request only regenerates the affected pages and assets,
+    without scanning the site again.
+
+    Attributes:
+        args (argparse.Namespace): The parsed command line arguments of the builds.
+        cache (MemoryCache): The parsed pages, kept across builds.
+        builder (IncrementalBuilder): The builder of the current site, or None before the first build.
+        builds (int): The number of builds run so far.
+        stopped (bool): Whether a stop request was received.
+    """
+
+    def __init__(self, args, paths=None):
+        """
+        Initializes a BuildDaemon. The first build is run by start.
+
+        Args:
+            args (argparse.Namespace): The parsed command line arguments of the builds.
+            paths (list, optional): The files and directories to watch. Defaults to
+                the content and static directories and the template.
+        """
+
+        self.args = args
+        self.paths = paths or [CONTENT_DIR, STATIC_DIR, TEMPLATE_PATH]
+        self.cache = MemoryCache(open_cache(args), args.page_cache_size * 1024 * 1024)
+        self.builder = None
+        self.builds = 0
+        self.stopped = False
+        self._watcher = None
+
+    def start(self):
+        """
+        Starts watching the sources and runs a full build.
+        """
+
+        # Watching first, so no change made during the build is missed.
+        self._watcher = create_watcher(self.paths)
+        self.full_build()
+
+    def close(self):
+        """
+        Stops watching the sources.
+        """
+
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+
+    def full_build(self):
+        """
+        Builds the whole site and keeps its manifest for the next incremental builds.
+        """
+
+        manifest = build(self.args, cache=self.cache)
+        self.builder = IncrementalBuilder.from_args(manifest, self.args, self.cache)
+        self.builds += 1
+
+    def pending_changes(self):
+        """
+        Collects the sources changed since the last build, without waiting.
+
+        Returns:
+            set: The paths that were created, modified or removed.
+        """
+
+        changed = set()
+
+        while True:
+            more = self._watcher.wait(0)
+
+            if not more:
+                return changed
+
+            changed |= more
+
+    def handle(self, request):
+        """
+        Runs a request of the daemon protocol.
+
+        Args:
+            request (dict): The request, with its command.
+
+        Returns:
+            dict: The response.
+        """
+
+        command = request.get("command")
+
+        if command == "status":
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "pages": len(self.builder.manifest.pages),
+                "builds": self.builds,
+            }
+
+        if command == "stop":
+            self.stopped = True
+            return {"ok": True}
+
+        if command != "build":
+            return {"ok": False, "error": f"Unknown command: {command!r}"}
+
+        start = time.perf_counter()
+
+        try:
+            if request.get("full"):
+                self.pending_changes()
+                self.full_build()
+                outputs = []
+            else:
+                changed = self.pending_changes()
+                outputs = []
+
+                if changed or self.builder.failed:
+                    outputs = self.builder.apply(changed)
+
+                self.builds += 1
+        except IncrementalBuildError as e:
+            logging.error("%s", e)
+            return {"ok": False, "error": str(e), "outputs": e.outputs}
+        except (BuildError, OSError, ValueError) as e:
+            logging.error("%s", e)
+            return {"ok": False, "error": str(e)}
+
+        return {
+            "ok": True,
+            "outputs": outputs,
+            "elapsed": time.perf_counter() - start,
+        }
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """
+    DaemonRequestHandler answers the requests of a single client connection.
+    """
+
+    def handle(self):
+        """
+        Reads requests until the client disconnects, answering each in turn.
+        """
+
+        while True:
+            request = read_message(self.rfile)
+
+            if request is None:
+                return
+
+            write_message(self.wfile, self.server.daemon.handle(request))
+
+            if self.server.daemon.stopped:
+                return
+
+
+def bind_socket(path):
+    """
+    Creates the server of the daemon, replacing a socket file left behind by a
+    daemon that did not exit cleanly.
+
+    Args:
+        path (str): The path of the socket.
+
+    Returns:
+        socketserver.UnixStreamServer: The bound server.
+
+    Raises:
+        BuildError: If another daemon already listens on the socket.
+    """
+
+    directory = os.path.dirname(path)
+
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if os.path.exists(path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(path)
+            except OSError:
+                os.remove(path)
+            else:
+                raise BuildError(f"A build daemon already listens on {path}")
+
+    return socketserver.UnixStreamServer(path, DaemonRequestHandler)
+
+
+def run_daemon(args, path=SOCKET_PATH):
+    """
+    Builds the site, then answers build requests on a Unix socket until a stop
+    request or an interrupt.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+        path (str, optional): The path of the socket. Defaults to .sitegenie/daemon.sock.
+    """
+
+    daemon = BuildDaemon(args)
+    server = bind_socket(path)
+    server.daemon = daemon
+
+    try:
+        daemon.start()
+        print(f"Build daemon listening on {path} ({PUBLIC_DIR} is up to date)")
+
+        while not daemon.stopped:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+        server.server_close()
+
+        if os.path.exists(path):
+            os.remove(path)
@@ -9,6 +9,9 @@ class HTMLNode:
         props (dict): A dictionary of HTML attributes and their values.
     """
 
+    # Pages create tens of thousands of nodes, so they carry no per-instance __dict__.
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         """
         Initializes an HTMLNode instance with the given tag, value, children, and properties.
@@ -36,15 +39,104 @@ class HTMLNode:
             ValueError: If the HTMLNode does not have a tag.
         """
 
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        """
+        Yields the HTML representation of the HTMLNode fragment by fragment, without
+        building the strings of its children.
+
+        The tree is walked with an explicit stack instead of recursion, so arbitrarily
+        deep trees render in constant Python stack depth.
+
+        Yields:
+            str: The fragments of the HTML representation.
+
+        Raises:
+            ValueError: If a node of the tree cannot be rendered.
+        """
+
+        opening, children, closing = self.html_parts()
+        yield opening
+
+        if not children:
+            return
+
+        # Each entry holds the iterator over the remaining children of an open
+        # node together with the closing fragment of that node.
+        stack = [(iter(children), closing)]
+
+        while stack:
+            children, closing = stack[-1]
+
+            for child in children:
+                opening, grandchildren, child_closing = child.html_parts()
+                yield opening
+
+                if grandchildren:
+                    stack.append((iter(grandchildren), child_closing))
+                    break
+            else:
+                stack.pop()
+                yield closing
+
+    def html_parts(self):
+        """
+        Splits the HTMLNode into the pieces rendered around its children.
+
+        Returns:
+            tuple: The opening fragment, the list of children and the closing fragment.
+
+        Raises:
+            ValueError: If the HTMLNode does not have a tag.
+        """
+
         if not self.tag:
             raise ValueError("HTMLNode must have a tag")
 
         if not self.children:
-            return f"<{self.tag} {self.props_to_html()}>{self.value}</{self.tag}>"
+            return (
+                f"<{self.tag} {self.props_to_html()}>{self.value}</{self.tag}>",
+                None,
+                None,
+            )
+
+        return (
+            f"<{self.tag} {self.props_to_html()}>",
+            self.children,
+            f"</{self.tag}>",
+        )
+
+    def walk(self):
+        """
+        Yields every node of the tree in document order, using an explicit stack
+        instead of recursion.
+
+        Yields:
+            HTMLNode: The nodes of the tree, starting with this one.
+        """
+
+        stack = [self]
 
-        children_html = "".join([child.to_html() for child in self.children])
+        while stack:
+            node = stack.pop()
+            yield node
+
+            if node.children:
+                stack.extend(reversed(node.children))
+
+    def write_html(self, stream):
+        """
+        Writes the HTML representation of the HTMLNode to a file or buffer.
+
+        Args:
+            stream (io.TextIOBase): The text stream to write to.
+
+        Raises:
+            ValueError: If the HTMLNode does not have a tag.
+        """
 
-        return f"<{self.tag} {self.props_to_html()}>{children_html}</{self.tag}>"
+        stream.writelines(self.iter_html())
 
     def props_to_html(self):
         """
@@ -11,27 +11,212 @@ from textnode import (
 )
 
 
+delimiter_pattern = re.compile(r"`|\*\*?")
+image_pattern = re.compile(r"!\[([^\]]+)\]\(([^)]+)\)")
+link_pattern = re.compile(r"(?<!!)\[([^\]]+)\]\(([^)]+)\)")
+# Inline elements in a single alternation. Spans never contain a delimiter that
+# would pair differently in the chained split passes, so any stray delimiter or
+# bracket matches the last branch instead, and the text is scanned again.
+inline_pattern = re.compile(
+    r"(?=[`*!\[])(?:"
+    r"`(?P<code>[^`]*)`"
+    r"|\*\*(?P<bold>[^`]*?)\*\*"
+    r"|\*(?P<italic>[^*`]+)\*(?!\*)"
+    r"|!\[(?P<image>[^\]*`]+)\]\((?P<image_url>[^)*`]+)\)"
+    r"|(?<!!)\[(?P<link>[^\]*`!]+)\]\((?P<link_url>[^)*`!]+)\)"
+    r"|[`*\[]"
+    r")"
+)
+delimited_types = {
+    "code": text_type_code,
+    "bold": text_type_bold,
+    "italic": text_type_italic,
+}
+title_pattern = re.compile(r"^#\s+(.+)$", re.MULTILINE)
+
+
 def text_to_textnodes(text):
     """
     Converts a text string into a list of TextNode objects, splitting the text into nodes.
 
+    The text is tokenized by a single pass of inline_pattern. It produces the same
+    nodes as splitting by code, bold and italic delimiters and then by images and
+    links, one pass after the other. Text with a delimiter the pattern leaves
+    unpaired is scanned again delimiter by delimiter, to split it the same way or
+    reject it.
+
     Args:
         text (str): The input text string.
 
     Returns:
         list: A list of TextNode objects.
+
+    Raises:
+        ValueError: If a code, bold or italic delimiter is not closed.
     """
 
-    nodes = [TextNode(text, text_type_text)]
-    nodes = split_nodes_delimiter(nodes, "`", text_type_code)
-    nodes = split_nodes_delimiter(nodes, "**", text_type_bold)
-    nodes = split_nodes_delimiter(nodes, "*", text_type_italic)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    if "`" not in text and "*" not in text and "[" not in text:
+        return [TextNode(text, text_type_text)]
+
+    nodes = []
+    pos = 0
+    # Start of the run of text between code, bold and italic spans.
+    run = 0
+
+    for match in inline_pattern.finditer(text):
+        kind = match.lastgroup
+
+        if kind is None:
+            return _scan_text_to_textnodes(text)
+
+        start = match.start()
+
+        if kind == "image_url" or kind == "link_url":
+            if pos < start:
+                nodes.append(TextNode(text[pos:start], text_type_text))
+
+            if kind == "image_url":
+                nodes.append(
+                    TextNode(match["image"], text_type_image, match["image_url"])
+                )
+            else:
+                nodes.append(TextNode(match["link"], text_type_link, match["link_url"]))
+        else:
+            # A run without images or links is kept whole, even when empty.
+            if pos < start or run == pos:
+                nodes.append(TextNode(text[pos:start], text_type_text))
+
+            nodes.append(TextNode(match[kind], delimited_types[kind]))
+            run = match.end()
+
+        pos = match.end()
+
+    if pos < len(text) or run == pos:
+        nodes.append(TextNode(text[pos:], text_type_text))
 
     return nodes
 
 
+def _scan_text_to_textnodes(text):
+    """
+    Converts a text string into a list of TextNode objects, following the
+    delimiters one by one. Unlike inline_pattern, the scan pairs every delimiter
+    the way the chained split passes do, so it also handles stray delimiters.
+
+    Args:
+        text (str): The input text string.
+
+    Returns:
+        list: A list of TextNode objects.
+
+    Raises:
+        ValueError: If a code, bold or italic delimiter is not closed.
+    """
+
+    nodes = []
+    pos = 0
+    bold = False
+    italic = False
+    match = delimiter_pattern.search(text)
+
+    while match:
+        delimiter = match.group()
+        start = match.start()
+
+        if delimiter == "`":
+            end = text.find("`", start + 1)
+
+            if bold or italic or end == -1:
+                raise ValueError("Invalid markdown")
+
+            _append_text(text[pos:start], nodes)
+            nodes.append(TextNode(text[start + 1 : end], text_type_code))
+            pos = end + 1
+        elif delimiter == "**":
+            if italic:
+                raise ValueError("Invalid markdown")
+
+            if bold:
+                nodes.append(TextNode(text[pos:start], text_type_bold))
+            else:
+                _append_text(text[pos:start], nodes)
+
+            bold = not bold
+            pos = start + 2
+        elif not bold:
+            if italic:
+                nodes.append(TextNode(text[pos:start], text_type_italic))
+            else:
+                _append_text(text[pos:start], nodes)
+
+            italic = not italic
+            pos = start + 1
+        else:
+            # A single * inside bold text is kept as it is.
+            match = delimiter_pattern.search(text, start + 1)
+            continue
+
+        match = delimiter_pattern.search(text, pos)
+
+    if bold or italic:
+        raise ValueError("Invalid markdown")
+
+    _append_text(text[pos:], nodes)
+    return nodes
+
+
+def _append_text(text, nodes):
+    """
+    Appends a run of plain text to a list of nodes, splitting out its images and links.
+
+    Args:
+        text (str): The plain text run.
+        nodes (list): The list of TextNode objects to append to.
+    """
+
+    if "[" not in text:
+        nodes.append(TextNode(text, text_type_text))
+        return
+
+    pos = 0
+
+    for match in image_pattern.finditer(text):
+        if pos < match.start():
+            _append_links(text[pos : match.start()], nodes)
+
+        nodes.append(TextNode(match.group(1), text_type_image, match.group(2)))
+        pos = match.end()
+
+    if pos == 0:
+        _append_links(text, nodes)
+    elif pos < len(text):
+        _append_links(text[pos:], nodes)
+
+
+def _append_links(text, nodes):
+    """
+    Appends a run of plain text to a list of nodes, splitting out its links.
+
+    Args:
+        text (str): The plain text run, already free of images.
+        nodes (list): The list of TextNode objects to append to.
+    """
+
+    pos = 0
+
+    for match in link_pattern.finditer(text):
+        if pos < match.start():
+            nodes.append(TextNode(text[pos : match.start()], text_type_text))
+
+        nodes.append(TextNode(match.group(1), text_type_link, match.group(2)))
+        pos = match.end()
+
+    if pos == 0:
+        nodes.append(TextNode(text, text_type_text))
+    elif pos < len(text):
+        nodes.append(TextNode(text[pos:], text_type_text))
+
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     """
     Splits TextNode objects by a specified delimiter.
@@ -182,7 +367,7 @@ def extract_markdown_images(text):
         list: A list of tuples, each containing the alt text and URL of an image.
     """
 
-    return re.findall(r"!\[([^\]]+)\]\(([^)]+)\)", text)
+    return image_pattern.findall(text)
 
 
 def extract_markdown_links(text):
@@ -196,7 +381,7 @@ def extract_markdown_links(text):
         list: A list of tuples, each containing the link text and URL of a link.
     """
 
-    return re.findall(r"(?<!!)\[([^\]]+)\]\(([^)]+)\)", text)
+    return link_pattern.findall(text)
 
 
 def extract_title(markdown):
@@ -213,7 +398,7 @@ def extract_title(markdown):
         ValueError: If a title is not found in the markdown.
     """
 
-    title = re.search(r"^#\s+(.+)$", markdown, re.MULTILINE)
+    title = title_pattern.search(markdown)
 
     if not title:
         raise ValueError("Title not found")
@@ -1,3 +1,23 @@
+import contextlib
+import hashlib
+import mmap
+import os
+import tempfile
+
+from manifest import hash_file
+
+read_mode_text = "text"
+read_mode_mmap = "mmap"
+read_mode_stream = "stream"
+
+# Sources from this size are mapped into memory instead of being copied into a str.
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+# Pages rendered to be checked against their recorded digest are kept in memory up
+# to this size, so a changed page is written without being rendered again.
+CHECK_BUFFER_SIZE = 1024 * 1024
+
+
 def read_file(file_path):
     """
     Reads the contents of a file and returns it as a string.
@@ -20,3 +40,303 @@ def read_file(file_path):
         return None
     except Exception as e:
         raise e
+
+
+def read_mode(file_path, stream_threshold=None, mmap_threshold=None):
+    """
+    Chooses how a markdown source is read from its size: small files are read
+    into a str, large ones are memory-mapped, and the largest are streamed.
+
+    Args:
+        file_path (str): The path to the file.
+        stream_threshold (int, optional): The size in bytes from which the file is streamed. Defaults to None.
+        mmap_threshold (int, optional): The size in bytes from which the file is mapped. Defaults to MMAP_THRESHOLD.
+
+    Returns:
+        str: read_mode_text, read_mode_mmap or read_mode_stream.
+    """
+
+    if mmap_threshold is None:
+        mmap_threshold = MMAP_THRESHOLD
+
+    size = os.path.getsize(file_path)
+
+    if stream_threshold is not None and size >= stream_threshold:
+        return read_mode_stream
+
+    if size >= mmap_threshold:
+        return read_mode_mmap
+
+    return read_mode_text
+
+
+@contextlib.contextmanager
+def map_file(file_path):
+    """
+    Maps a file read-only into memory, so its bytes can be scanned in place
+    without copying them into Python objects.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Yields:
+        mmap.mmap: The mapped file, or empty bytes for an empty file, which cannot be mapped.
+    """
+
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b""
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+@contextlib.contextmanager
+def read_source(file_path, mode=read_mode_text):
+    """
+    Opens a markdown source in the given read mode.
+
+    Args:
+        file_path (str): The path to the file.
+        mode (str, optional): The read mode chosen by read_mode. Defaults to read_mode_text.
+
+    Yields:
+        str or mmap.mmap: The contents of the file, its mapping, or None when it is streamed.
+    """
+
+    if mode == read_mode_mmap:
+        with map_file(file_path) as mapped:
+            yield mapped
+    elif mode == read_mode_stream:
+        yield None
+    else:
+        yield read_file(file_path)
+
+
+def iter_lines(data):
+    """
+    Splits UTF-8 encoded bytes, such as a mapped file, into lines, decoding
+    one line at a time as it is consumed.
+
+    Args:
+        data (bytes-like): The encoded text.
+
+    Yields:
+        str: The lines of the text, without their newlines.
+    """
+
+    start = 0
+    end = len(data)
+
+    while start < end:
+        stop = data.find(b"\n", start)
+
+        if stop < 0:
+            stop = end
+
+        yield data[start:stop].decode("utf-8")
+        start = stop + 1
+
+
+class DigestWriter:
+    """
+    DigestWriter encodes text written to it as UTF-8 into a binary file while
+    computing the digest and size of the written bytes.
+
+    Attributes:
+        file (io.BufferedWriter): The binary file written to.
+        size (int): The number of bytes written so far.
+    """
+
+    def __init__(self, file):
+        """
+        Initializes a DigestWriter.
+
+        Args:
+            file (io.BufferedWriter): The binary file to write to.
+        """
+
+        self.file = file
+        self.size = 0
+        self._digest = hashlib.sha256()
+
+    def write(self, text):
+        """
+        Writes text to the file.
+
+        Args:
+            text (str): The text to write.
+
+        Returns:
+            int: The number of characters written.
+        """
+
+        data = text.encode("utf-8")
+        self._digest.update(data)
+        self.file.write(data)
+        self.size += len(data)
+        return len(text)
+
+    def writelines(self, lines):
+        """
+        Writes a sequence of text fragments, joining them into large writes so
+        small fragments do not each cost an encode and a hash update.
+
+        Args:
+            lines (iterable): The text fragments to write.
+        """
+
+        batch = []
+        length = 0
+
+        for line in lines:
+            batch.append(line)
+            length += len(line)
+
+            if length >= 1 << 16:
+                self.write("".join(batch))
+                batch = []
+                length = 0
+
+        if batch:
+            self.write("".join(batch))
+
+    def hexdigest(self):
+        """
+        Returns the digest of the bytes written so far.
+
+        Returns:
+            str: The hexadecimal SHA-256 digest.
+        """
+
+        return self._digest.hexdigest()
+
+
+class BoundedBuffer:
+    """
+    BoundedBuffer is a binary sink that keeps the bytes written to it until they
+    outgrow a limit, then only counts them.
+
+    Attributes:
+        chunks (list): The bytes written so far, or None past the limit.
+        limit (int): The maximum number of bytes kept.
+    """
+
+    def __init__(self, limit):
+        """
+        Initializes an empty BoundedBuffer.
+
+        Args:
+            limit (int): The maximum number of bytes kept.
+        """
+
+        self.chunks = []
+        self.limit = limit
+        self._size = 0
+
+    def write(self, data):
+        """
+        Keeps bytes while under the limit.
+
+        Args:
+            data (bytes): The bytes written.
+        """
+
+        if self.chunks is None:
+            return
+
+        self._size += len(data)
+
+        if self._size > self.limit:
+            self.chunks = None
+        else:
+            self.chunks.append(data)
+
+
+def write_if_changed(file_path, write, previous_digest=None):
+    """
+    Writes a file atomically through a temporary file and a rename, and leaves
+    the existing file untouched, mtime included, when the new bytes are the same.
+    With a recorded digest, the contents are first only hashed, so an unchanged
+    file costs no write at all.
+
+    Args:
+        file_path (str): The path of the file.
+        write (callable): Called with a text stream to write the contents to. It
+            may be called twice for large files that changed.
+        previous_digest (str, optional): The recorded digest of the existing file.
+            Defaults to hashing the existing file when its size matches.
+
+    Returns:
+        tuple: The digest and size of the contents, and True if the file was replaced.
+    """
+
+    try:
+        existing = os.stat(file_path)
+    except FileNotFoundError:
+        existing = None
+
+    # mkstemp creates the file readable by its owner only.
+    mode = existing.st_mode & 0o777 if existing is not None else 0o644
+
+    if previous_digest is not None and existing is not None:
+        buffer = BoundedBuffer(CHECK_BUFFER_SIZE)
+        stream = DigestWriter(buffer)
+        write(stream)
+        digest = stream.hexdigest()
+
+        if digest == previous_digest and stream.size == existing.st_size:
+            return digest, stream.size, False
+
+        if buffer.chunks is not None:
+            replace_file(file_path, b"".join(buffer.chunks), mode)
+            return digest, stream.size, True
+
+    directory = os.path.dirname(file_path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, "wb") as file:
+            stream = DigestWriter(file)
+            write(stream)
+
+        digest = stream.hexdigest()
+
+        if existing is not None and existing.st_size == stream.size:
+            if previous_digest is None:
+                previous_digest = hash_file(file_path)
+
+            if previous_digest == digest:
+                return digest, stream.size, False
+
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, file_path)
+        return digest, stream.size, True
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def replace_file(file_path, data, mode=0o644):
+    """
+    Writes bytes to a file atomically through a temporary file and a rename.
+
+    Args:
+        file_path (str): The path of the file.
+        data (bytes): The contents of the file.
+        mode (int, optional): The permissions of the file. Defaults to 0o644.
+    """
+
+    directory = os.path.dirname(file_path) or "."
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
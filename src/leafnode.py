@@ -1,5 +1,10 @@
 from htmlnode import HTMLNode
 
+SHARED_LEAF_MAX_LENGTH = 16
+SHARED_LEAF_MAX_COUNT = 4096
+
+_shared_leaves = {}
+
 
 class LeafNode(HTMLNode):
     """
@@ -12,6 +17,8 @@ class LeafNode(HTMLNode):
         props (dict): A dictionary of HTML attributes and their values.
     """
 
+    __slots__ = ()
+
     def __init__(self, tag=None, value=None, props=None):
         """
         Initializes a LeafNode instance with the given tag, value, and properties.
@@ -34,3 +41,42 @@ class LeafNode(HTMLNode):
 
         props_html = f" {self.props_to_html()}" if self.props else ""
         return f"<{self.tag}{props_html}>{self.value}</{self.tag}>"
+
+    def html_parts(self):
+        """
+        Returns the LeafNode as a single fragment without children.
+
+        Returns:
+            tuple: The HTML string representation of the LeafNode, no children and no closing fragment.
+        """
+
+        return (self.to_html(), None, None)
+
+
+def shared_leaf(tag, value):
+    """
+    Returns a flyweight LeafNode shared by every caller asking for the same short
+    leaf without attributes, such as the whitespace between inline elements.
+    Shared leaves must not be mutated.
+
+    Args:
+        tag (str): The tag name of the HTML element.
+        value (str): The inner text of the element.
+
+    Returns:
+        LeafNode: The shared LeafNode, or a new one if the value is too long to share.
+    """
+
+    if len(value) > SHARED_LEAF_MAX_LENGTH:
+        return LeafNode(tag, value)
+
+    key = (tag, value)
+    leaf = _shared_leaves.get(key)
+
+    if leaf is None:
+        leaf = LeafNode(tag, value)
+
+        if len(_shared_leaves) < SHARED_LEAF_MAX_COUNT:
+            _shared_leaves[key] = leaf
+
+    return leaf
@@ -0,0 +1,179 @@
+import json
+import os
+import queue
+import threading
+import urllib.parse
+
+# The path of the Server-Sent Events endpoint.
+EVENTS_PATH = "/__livereload"
+
+# Characters browsers leave unencoded in location.pathname and URL.pathname,
+# besides letters, digits and "-._~".
+PATH_SAFE = "/!$&'()*+,;=:@[]^|"
+
+# Seconds between the comments keeping an idle event stream open.
+KEEPALIVE_INTERVAL = 15
+
+# Reloads the page when it, or a stylesheet, script or image it uses, changed.
+CLIENT_SCRIPT = (
+    b"""<script>
+(function () {
+  function normalize(path) {
+    return path.endsWith("/") ? path + "index.html" : path;
+  }
+  var source = new EventSource("%s");
+  source.onmessage = function (event) {
+    var changed = new Set(JSON.parse(event.data).map(normalize));
+    var used = [normalize(location.pathname)];
+    document.querySelectorAll("link[href], script[src], img[src]").forEach(
+      function (element) {
+        var url = new URL(element.href || element.src, location.href);
+        if (url.origin === location.origin) used.push(normalize(url.pathname));
+      }
+    );
+    if (used.some(function (path) { return changed.has(path); })) {
+      source.close();
+      location.reload();
+    }
+  };
+})();
+</script>
+"""
+    % EVENTS_PATH.encode()
+)
+
+
+class LiveReload:
+    """
+    LiveReload pushes the URL paths of the files changed by each incremental
+    rebuild to every connected browser, so only the tabs showing one of them
+    reload.
+
+    Attributes:
+        directory (str): The directory of the generated site.
+    """
+
+    def __init__(self, directory):
+        """
+        Initializes a LiveReload without clients.
+
+        Args:
+            directory (str): The directory of the generated site.
+        """
+
+        self.directory = directory
+        self._clients = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """
+        Registers a client.
+
+        Returns:
+            queue.Queue: The queue receiving the events of the client.
+        """
+
+        events = queue.Queue()
+
+        with self._lock:
+            self._clients.add(events)
+
+        return events
+
+    def unsubscribe(self, events):
+        """
+        Unregisters a client.
+
+        Args:
+            events (queue.Queue): The queue of the client.
+        """
+
+        with self._lock:
+            self._clients.discard(events)
+
+    def publish(self, outputs):
+        """
+        Sends the URL paths of changed output files to every client.
+
+        Args:
+            outputs (iterable): The paths of the output files that were written or removed.
+
+        Returns:
+            list: The URL paths that were sent.
+        """
+
+        paths = sorted({self.url_path(output) for output in outputs})
+
+        if paths:
+            self._broadcast(paths)
+
+        return paths
+
+    def close(self):
+        """
+        Ends the event streams of every client.
+        """
+
+        self._broadcast(None)
+
+    def _broadcast(self, event):
+        """
+        Queues an event for every client.
+
+        Args:
+            event (list): The URL paths to send, or None to end the streams.
+        """
+
+        with self._lock:
+            clients = list(self._clients)
+
+        for events in clients:
+            events.put(event)
+
+    def url_path(self, output):
+        """
+        Maps a path under the output directory to its URL path.
+
+        Args:
+            output (str): The path of the output file.
+
+        Returns:
+            str: The URL path of the file, percent-encoded as browsers report it.
+        """
+
+        relative = os.path.relpath(output, self.directory)
+        return "/" + urllib.parse.quote(relative.replace(os.sep, "/"), PATH_SAFE)
+
+
+def inject_client(html):
+    """
+    Inserts the live reload client script into a page, before its closing body
+    tag or at its end.
+
+    Args:
+        html (bytes): The page.
+
+    Returns:
+        bytes: The page with the client script.
+    """
+
+    index = html.lower().rfind(b"</body")
+
+    if index < 0:
+        return html + CLIENT_SCRIPT
+
+    return html[:index] + CLIENT_SCRIPT + html[index:]
+
+
+def format_event(paths):
+    """
+    Formats the URL paths of changed files as a Server-Sent Event.
+
+    Args:
+        paths (list): The URL paths.
+
+    Returns:
+        bytes: The encoded event.
+    """
+
+    return f"data: {json.dumps(paths)}\n\n".encode("utf-8")
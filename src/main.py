@@ -1,22 +1,500 @@
+import argparse
+import contextlib
+import functools
 import os
-import shutil
 import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-from inline_markdown import extract_title
-from io_utils import read_file
-from markdown_blocks import markdown_to_html_node
+from cache import FragmentCache
+from compress import precompress, prune_compressed
+from io_utils import (
+    iter_lines,
+    map_file,
+    read_file,
+    read_mode,
+    read_mode_mmap,
+    read_mode_stream,
+    read_mode_text,
+    read_source,
+    write_if_changed,
+)
+from manifest import (
+    BuildManifest,
+    OutputManifest,
+    hash_bytes,
+    hash_file,
+    hash_text,
+)
+from markdown_blocks import (
+    markdown_file_to_html_node,
+    markdown_outline,
+    markdown_title,
+    markdown_to_html_node,
+)
+from outline import Outline
+from pipeline import BoundedWriter, prefetch
+from plan import create_plan, scan_files
+from profiling import NULL_PROFILER, Profiler
+from sync import is_unchanged, link_modes, prune_files, sync_files
+from template import Template
 
+CONTENT_DIR = "content"
+STATIC_DIR = "static"
+PUBLIC_DIR = "public"
+TEMPLATE_PATH = "template.html"
+MANIFEST_PATH = ".sitegenie/manifest.json"
+TRACE_PATH = ".sitegenie/trace.json"
+CACHE_DIR = ".sitegenie/cache"
+OUTPUTS_PATH = ".sitegenie/outputs.json"
+SHARDS_DIR = ".sitegenie/shards"
 
-def main():
+
+class BuildError(Exception):
+    """
+    BuildError is raised when a page cannot be generated. The message always
+    names the markdown source that failed, even when raised inside a worker process.
+    """
+
+
+def main(argv=None):
     """
     Main function to copy static files and generate HTML pages from markdown files.
+
+    Args:
+        argv (list, optional): The command line arguments. Defaults to sys.argv.
+    """
+
+    args = parse_args(argv)
+
+    if args.command == "serve":
+        from serve import serve
+
+        serve(args)
+        return
+
+    if args.command == "daemon":
+        from daemon import run_daemon
+
+        run_daemon(args)
+        return
+
+    if args.command == "merge":
+        from shard import merge
+
+        merge(args)
+        return
+
+    build(args)
+
+
+def build(args, cache=None):
+    """
+    Runs a full build: synchronizes the static files and generates every stale page.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+        cache (FragmentCache or MemoryCache, optional): The cache of parsed sources.
+            Defaults to the one requested on the command line.
+
+    Returns:
+        BuildManifest: The manifest of the build, already saved to disk.
     """
 
-    copy_files("static", "public")
-    generate_pages_from_directory("content", "template.html", "public")
+    profiler = Profiler() if args.profile else NULL_PROFILER
+
+    if cache is None:
+        cache = open_cache(args)
+    stream_threshold = stream_threshold_bytes(args)
+
+    public, manifest_path, outputs_path = build_paths(args.shard)
+
+    with profiler.stage("build"):
+        manifest = BuildManifest.load(manifest_path)
+        manifest.use_template(hash_file(TEMPLATE_PATH))
+
+        with profiler.stage("plan"):
+            plan = create_plan(CONTENT_DIR, STATIC_DIR, public)
+
+            if args.shard is not None:
+                plan = plan.shard(*args.shard)
+
+        print(f"Planned {plan.page_count} pages and {len(plan.assets)} static files")
+
+        if args.dry_run:
+            dry_run(plan, manifest, args.checksum, stream_threshold)
+            return manifest
+
+        output_manifest = OutputManifest.load(outputs_path)
+
+        with profiler.stage("copy_files"):
+            copy_files(
+                STATIC_DIR,
+                public,
+                manifest,
+                checksum=args.checksum,
+                link_mode=args.link,
+                files=plan.assets,
+                output_manifest=output_manifest,
+                stats=plan.stats,
+            )
 
+        generate_pages(
+            plan.pages,
+            TEMPLATE_PATH,
+            manifest,
+            jobs=args.jobs,
+            profiler=profiler,
+            cache=cache,
+            io_threads=args.io_threads,
+            stream_threshold=stream_threshold,
+            output_manifest=output_manifest,
+        )
 
-def generate_pages_from_directory(directory, template_path, target_directory):
+        for output in prune_files(manifest.prune(), public):
+            print(f"Removed {output}")
+
+        outputs = [entry["output"] for entry in manifest.pages.values()]
+        outputs.extend(manifest.assets)
+        siblings = set()
+
+        if args.precompress:
+            with profiler.stage("precompress"):
+                siblings = precompress(
+                    output_manifest,
+                    outputs,
+                    min_size=args.compress_min_size,
+                    level=args.compress_level,
+                )
+
+        prune_compressed(output_manifest, siblings)
+        output_manifest.retain(outputs + sorted(siblings))
+        manifest.save()
+        output_manifest.save()
+        print(
+            f"{len(output_manifest.changed)} output files changed, "
+            f"{len(output_manifest.removed)} removed"
+        )
+
+    if profiler.enabled:
+        print(profiler.report(args.profile_top))
+        profiler.write_trace(args.profile_trace)
+        print(f"Trace written to {args.profile_trace}")
+
+    return manifest
+
+
+def build_paths(shard=None):
+    """
+    Computes where a build writes its output and its manifests. Each shard of
+    a sharded build gets its own directory, combined later by the merge command.
+
+    Args:
+        shard (tuple, optional): The (index, count) of the shard. Defaults to an unsharded build.
+
+    Returns:
+        tuple: The output directory, the path of the build manifest and the path of the output manifest.
+    """
+
+    if shard is None:
+        return PUBLIC_DIR, MANIFEST_PATH, OUTPUTS_PATH
+
+    directory = shard_directory(*shard)
+    return (
+        os.path.join(directory, PUBLIC_DIR),
+        os.path.join(directory, "manifest.json"),
+        os.path.join(directory, "outputs.json"),
+    )
+
+
+def shard_directory(index, count, directory=SHARDS_DIR):
+    """
+    Computes the directory of a shard of a sharded build.
+
+    Args:
+        index (int): The shard, from 1 to count.
+        count (int): The number of shards.
+        directory (str, optional): The directory holding the shards. Defaults to .sitegenie/shards.
+
+    Returns:
+        str: The directory holding the output and manifests of the shard.
+    """
+
+    return os.path.join(directory, f"{index}-of-{count}")
+
+
+def parse_shard(value):
+    """
+    Parses the value of --shard.
+
+    Args:
+        value (str): The shard as I/N, such as 2/4.
+
+    Returns:
+        tuple: The (index, count) of the shard.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a valid shard.
+    """
+
+    index, separator, count = value.partition("/")
+
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        separator = None
+
+    if not separator or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(
+            f"invalid shard {value!r}, expected I/N with 1 <= I <= N"
+        )
+
+    return index, count
+
+
+def dry_run(plan, manifest, checksum=False, stream_threshold=None):
+    """
+    Reports what a build would write and remove, without touching the output.
+
+    Args:
+        plan (BuildPlan): The plan of the build.
+        manifest (BuildManifest): The manifest of the previous build.
+        checksum (bool, optional): Compare static files by content hash instead of size and mtime. Defaults to False.
+        stream_threshold (int, optional): The size in bytes from which sources are streamed. Defaults to None.
+
+    Returns:
+        list: The output paths that would be written or removed.
+    """
+
+    changes = []
+
+    for from_path, to_path in plan.pages:
+        output = output_path(from_path, to_path)
+
+        source_hash = hash_source(from_path, stream_threshold)
+
+        if not manifest.is_fresh(from_path, source_hash, output):
+            print(f"Would generate {output} from {from_path}")
+            changes.append(output)
+
+    for source_path, target_path in plan.assets:
+        if not is_unchanged(
+            source_path, target_path, checksum, plan.stats.get(source_path)
+        ):
+            print(f"Would copy {source_path} to {target_path}")
+            changes.append(target_path)
+
+    sources = {from_path for from_path, _ in plan.pages}
+    targets = {target_path for _, target_path in plan.assets}
+    removed = [
+        entry["output"]
+        for source, entry in manifest.pages.items()
+        if source not in sources
+    ]
+    removed.extend(asset for asset in manifest.assets if asset not in targets)
+
+    for output in removed:
+        print(f"Would remove {output}")
+
+    return changes + removed
+
+
+def open_cache(args):
+    """
+    Opens the on-disk cache of parsed sources requested on the command line.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+
+    Returns:
+        FragmentCache: The cache, or None when it is disabled.
+    """
+
+    if args.cache_size <= 0:
+        return None
+
+    return FragmentCache(CACHE_DIR, args.cache_size * 1024 * 1024)
+
+
+def stream_threshold_bytes(args):
+    """
+    Converts the --stream-threshold requested on the command line into bytes.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+
+    Returns:
+        int: The size in bytes from which sources are streamed, or None when
+            streaming is disabled.
+    """
+
+    if args.stream_threshold <= 0:
+        return None
+
+    return args.stream_threshold * 1024 * 1024
+
+
+def parse_args(argv=None):
+    """
+    Parses the command line arguments of the build.
+
+    Args:
+        argv (list, optional): The command line arguments. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+
+    parser = argparse.ArgumentParser(prog="sitegenie")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=("build", "serve", "daemon", "merge"),
+        default="build",
+        help="build the site once (default), build and serve it, keep it built"
+        " in a daemon answering src/client.py, or merge the shards of a sharded"
+        " build",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes used to generate pages (0 uses every CPU core)",
+    )
+    parser.add_argument(
+        "--io-threads",
+        type=int,
+        default=0,
+        help="overlap reading and writing pages with parsing using this many threads"
+        " each (0 disables the pipeline)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="build only the I-th of N deterministic shards of the site into"
+        f" {SHARDS_DIR}/I-of-N, to be combined by the merge command",
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="compare static files by content hash instead of size and mtime",
+    )
+    parser.add_argument(
+        "--link",
+        choices=link_modes,
+        default="copy",
+        help="how changed static files are transferred into the output",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        help="size cap in MiB of the cache of parsed sources (0 disables it)",
+    )
+    parser.add_argument(
+        "--stream-threshold",
+        type=int,
+        default=64,
+        help="size in MiB from which markdown sources are parsed and written block by"
+        " block instead of being loaded whole (0 disables streaming)",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write compressed siblings such as .gz next to the HTML and text files"
+        " of the output",
+    )
+    parser.add_argument(
+        "--compress-min-size",
+        type=int,
+        default=1024,
+        help="size in bytes below which --precompress leaves files uncompressed",
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        default=9,
+        help="compression level used by --precompress, clamped to the range of each"
+        " codec",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="print the time spent per stage and the slowest pages, and write a trace",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        help="number of slowest pages listed by --profile",
+    )
+    parser.add_argument(
+        "--profile-trace",
+        default=TRACE_PATH,
+        help="path of the Chrome trace-event file written by --profile",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="list the pages and static files a build would write or remove, and stop",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="when serving, rebuild the affected pages and assets on every change",
+    )
+    parser.add_argument(
+        "--on-demand",
+        action="store_true",
+        help="serve without building, rendering each page when it is first requested",
+    )
+    parser.add_argument(
+        "--page-cache-size",
+        type=int,
+        default=64,
+        help="size cap in MiB of the pages kept in memory by --on-demand and the"
+        " build daemon",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=9999,
+        help="port used by the serve command",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.jobs < 0:
+        parser.error("--jobs must be zero or a positive number")
+
+    if args.io_threads < 0:
+        parser.error("--io-threads must be zero or a positive number")
+
+    if args.shard is not None and args.command != "build":
+        parser.error("--shard only applies to the build command")
+
+    if args.compress_min_size < 0:
+        parser.error("--compress-min-size must be zero or a positive number")
+
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+
+    return args
+
+
+def generate_pages_from_directory(
+    directory,
+    template_path,
+    target_directory,
+    manifest=None,
+    jobs=1,
+    profiler=NULL_PROFILER,
+    cache=None,
+    io_threads=0,
+    stream_threshold=None,
+    output_manifest=None,
+):
     """
     Recursively generates HTML pages from markdown files in a directory.
 
@@ -24,21 +502,420 @@ def generate_pages_from_directory(directory, template_path, target_directory):
         directory (str): The directory containing markdown files.
         template_path (str): The path to the HTML template file.
         target_directory (str): The directory to save the generated HTML files.
+        manifest (BuildManifest, optional): The manifest used to skip unchanged pages. Defaults to None.
+        jobs (int, optional): The number of worker processes. Defaults to 1.
+        profiler (Profiler, optional): The profiler recording the build. Defaults to no profiling.
+        cache (FragmentCache, optional): The cache of parsed sources. Defaults to None.
+        io_threads (int, optional): The number of I/O threads of the pipelined mode. Defaults to 0.
+        stream_threshold (int, optional): The size in bytes from which sources are streamed. Defaults to None.
+        output_manifest (OutputManifest, optional): Records the digest of every page. Defaults to None.
+
+    Returns:
+        list: The paths of the HTML files that were written.
     """
 
-    for file in os.listdir(directory):
-        if os.path.isdir(os.path.join(directory, file)):
-            generate_pages_from_directory(
-                os.path.join(directory, file),
-                template_path,
-                os.path.join(target_directory, file),
-            )
-        elif file.endswith(".md"):
-            from_path = os.path.join(directory, file)
-            generate_page(from_path, template_path, target_directory)
+    with profiler.stage("collect_pages"):
+        pages = collect_pages(directory, target_directory)
+
+    return generate_pages(
+        pages,
+        template_path,
+        manifest,
+        jobs,
+        profiler,
+        cache,
+        io_threads,
+        stream_threshold,
+        output_manifest,
+    )
 
 
-def generate_page(from_path, template_path, to_path):
+def collect_pages(directory, target_directory):
+    """
+    Recursively collects the markdown files in a directory along with their target directories.
+
+    Args:
+        directory (str): The directory containing markdown files.
+        target_directory (str): The directory to save the generated HTML files.
+
+    Returns:
+        list: A list of (source path, target directory) tuples.
+    """
+
+    return [
+        (entry.path, os.path.dirname(target_path))
+        for entry, target_path in scan_files(directory, target_directory)
+        if entry.name.endswith(".md")
+    ]
+
+
+def generate_pages(
+    pages,
+    template_path,
+    manifest=None,
+    jobs=1,
+    profiler=NULL_PROFILER,
+    cache=None,
+    io_threads=0,
+    stream_threshold=None,
+    output_manifest=None,
+):
+    """
+    Generates HTML pages for a list of markdown files, optionally across several
+    processes or with reads and writes overlapped with parsing.
+
+    Args:
+        pages (list): A list of (source path, target directory) tuples.
+        template_path (str): The path to the HTML template file.
+        manifest (BuildManifest, optional): The manifest used to skip unchanged pages. Defaults to None.
+        jobs (int, optional): The number of worker processes. Defaults to 1.
+        profiler (Profiler, optional): The profiler recording the build. Defaults to no profiling.
+        cache (FragmentCache, optional): The cache of parsed sources. Defaults to None.
+        io_threads (int, optional): The number of reader and writer threads of the
+            pipelined mode, used when jobs is 1. Defaults to 0, which disables it.
+        stream_threshold (int, optional): The size in bytes from which sources are
+            streamed block by block. Defaults to None, which never streams.
+        output_manifest (OutputManifest, optional): Records the digest of every page
+            and is used to skip rewriting unchanged ones. Defaults to None.
+
+    Returns:
+        list: The paths of the HTML files that were written.
+
+    Raises:
+        BuildError: If a page cannot be generated.
+    """
+
+    with profiler.stage("compile_template"):
+        template = Template.from_file(template_path)
+
+    with profiler.stage("make_directories"):
+        for directory in sorted({to_path for _, to_path in pages}):
+            os.makedirs(directory, exist_ok=True)
+
+    if jobs <= 1 and io_threads > 0:
+        return _generate_pages_pipelined(
+            pages,
+            template_path,
+            template,
+            manifest,
+            profiler,
+            cache,
+            io_threads,
+            stream_threshold,
+            output_manifest,
+        )
+
+    if jobs <= 1:
+        options = {
+            "manifest": manifest,
+            "template": template,
+            "profiler": profiler,
+            "cache": cache,
+            "make_directory": False,
+            "stream_threshold": stream_threshold,
+            "output_manifest": output_manifest,
+        }
+        outputs = [
+            _generate_page_job((from_path, template_path, to_path, options))
+            for from_path, to_path in pages
+        ]
+        return [output for output in outputs if output is not None]
+
+    stale = []
+
+    for from_path, to_path in pages:
+        source_hash = None
+
+        if manifest is not None:
+            source_hash = hash_source(from_path, stream_threshold)
+            output = output_path(from_path, to_path)
+
+            if manifest.is_fresh(from_path, source_hash, output):
+                if output_manifest is not None:
+                    output_manifest.refresh(output)
+
+                continue
+
+        stale.append((from_path, to_path, source_hash))
+
+    if not stale:
+        return []
+
+    chunksize = max(1, len(stale) // (jobs * 4))
+    options = {
+        "template": template,
+        "cache": cache,
+        "make_directory": False,
+        "stream_threshold": stream_threshold,
+    }
+    job_args = []
+
+    for from_path, to_path, _ in stale:
+        file = output_path(from_path, to_path)
+        digest = output_manifest.digest(file) if output_manifest is not None else None
+        job_args.append((from_path, template_path, to_path, options, digest))
+
+    job = functools.partial(_generate_page_worker_job, profile=profiler.enabled)
+    outputs = []
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = pool.map(job, job_args, chunksize=chunksize)
+
+        for (from_path, _, source_hash), result in zip(stale, results):
+            output, files, changed, records, nodes = result
+            profiler.merge(records, nodes)
+
+            if output_manifest is not None:
+                output_manifest.merge(files, changed)
+
+            if manifest is not None:
+                manifest.record(from_path, source_hash, output)
+
+            outputs.append(output)
+
+    return outputs
+
+
+def _generate_pages_pipelined(
+    pages,
+    template_path,
+    template,
+    manifest,
+    profiler,
+    cache,
+    io_threads,
+    stream_threshold=None,
+    output_manifest=None,
+):
+    """
+    Generates HTML pages while reader threads prefetch the next sources and a
+    bounded writer pool saves the finished pages, so parsing never waits on disk.
+    The target directories must already exist.
+
+    Args:
+        pages (list): A list of (source path, target directory) tuples.
+        template_path (str): The path to the HTML template file.
+        template (Template): The compiled template.
+        manifest (BuildManifest): The manifest used to skip unchanged pages, or None.
+        profiler (Profiler): The profiler recording the build.
+        cache (FragmentCache): The cache of parsed sources, or None.
+        io_threads (int): The number of reader threads and of writer threads.
+        stream_threshold (int, optional): The size in bytes from which sources are
+            streamed. Defaults to None. Mapped and streamed sources are generated
+            directly instead of being prefetched.
+        output_manifest (OutputManifest, optional): Records the digest of every page. Defaults to None.
+
+    Returns:
+        list: The paths of the HTML files that were written.
+
+    Raises:
+        BuildError: If a page cannot be generated.
+    """
+
+    def read(page):
+        if read_mode(page[0], stream_threshold) != read_mode_text:
+            return None
+
+        with profiler.stage("read_file", page[0]):
+            return read_file(page[0])
+
+    depth = io_threads * 4
+    writer = BoundedWriter(io_threads, depth)
+    written = []
+    direct = []
+
+    try:
+        with ThreadPoolExecutor(io_threads, thread_name_prefix="reader") as readers:
+            for (from_path, to_path), markdown in prefetch(read, pages, readers, depth):
+                if markdown is None:
+                    output = _generate_page_job(
+                        (
+                            from_path,
+                            template_path,
+                            to_path,
+                            {
+                                "manifest": manifest,
+                                "template": template,
+                                "profiler": profiler,
+                                "make_directory": False,
+                                "stream_threshold": stream_threshold,
+                                "output_manifest": output_manifest,
+                            },
+                        )
+                    )
+
+                    if output is not None:
+                        direct.append(output)
+                    continue
+
+                file = output_path(from_path, to_path)
+                source_hash = None
+
+                try:
+                    with profiler.stage("page", from_path):
+                        if manifest is not None or cache is not None:
+                            source_hash = hash_text(markdown)
+
+                        if manifest is not None and manifest.is_fresh(
+                            from_path, source_hash, file
+                        ):
+                            if output_manifest is not None:
+                                output_manifest.refresh(file)
+
+                            continue
+
+                        print(
+                            f"Generating page from {from_path} to {to_path} "
+                            f"using {template_path}"
+                        )
+                        values = render_page(
+                            from_path, markdown, source_hash, profiler, cache
+                        )
+                except Exception as e:
+                    raise BuildError(
+                        f"Failed to generate page from {from_path}: {e!r}"
+                    ) from e
+
+                digest = None
+
+                if output_manifest is not None:
+                    digest = output_manifest.digest(file)
+
+                future = writer.submit(
+                    _write_page_job, from_path, file, template, values, profiler, digest
+                )
+                written.append((future, from_path, source_hash, file))
+    finally:
+        writer.close()
+
+    outputs = []
+
+    for future, from_path, source_hash, file in written:
+        digest, size, changed = future.result()
+
+        if output_manifest is not None:
+            output_manifest.record(file, digest, size, changed)
+
+        if manifest is not None:
+            manifest.record(from_path, source_hash, file)
+
+        outputs.append(file)
+
+    return outputs + direct
+
+
+def _write_page_job(from_path, file, template, values, profiler, previous_digest):
+    """
+    Writes a single page, reporting the failing source in the error message.
+    Runs in the writer threads of a pipelined build.
+
+    Args:
+        from_path (str): The path to the markdown file.
+        file (str): The path of the HTML file.
+        template (Template): The compiled template.
+        values (dict): The Title, Content and Toc values of the page.
+        profiler (Profiler): The profiler recording the build.
+        previous_digest (str): The recorded digest of the existing page, or None.
+
+    Returns:
+        tuple: The digest and size of the page, and True if the file was replaced.
+
+    Raises:
+        BuildError: If the page cannot be written.
+    """
+
+    try:
+        with profiler.stage("write", from_path):
+            return write_page(file, template, values, previous_digest)
+    except Exception as e:
+        raise BuildError(f"Failed to generate page from {from_path}: {e!r}") from e
+
+
+def _generate_page_job(args):
+    """
+    Generates a single page, reporting the failing source in the error message.
+    Runs in the worker processes of a parallel build.
+
+    Args:
+        args (tuple): The source path, template path and target directory of the page,
+            followed by a dict of the other keyword arguments of generate_page.
+
+    Returns:
+        str: The path of the HTML file, or None if the page was up to date.
+
+    Raises:
+        BuildError: If the page cannot be generated.
+    """
+
+    from_path, template_path, to_path, options = args
+
+    try:
+        return generate_page(from_path, template_path, to_path, **options)
+    except Exception as e:
+        raise BuildError(f"Failed to generate page from {from_path}: {e!r}") from e
+
+
+def _generate_page_worker_job(args, profile=False):
+    """
+    Generates a single page in a worker process, collecting what the parent
+    process needs to merge: the digest of the page and, when profiling, the
+    measurements of the worker.
+
+    Args:
+        args (tuple): The arguments of _generate_page_job, followed by the recorded
+            digest of the existing page or None.
+        profile (bool, optional): Profile the page. Defaults to False.
+
+    Returns:
+        tuple: The path of the HTML file, the files and changed paths of its output
+            manifest, the stage records and the node counts.
+
+    Raises:
+        BuildError: If the page cannot be generated.
+    """
+
+    from_path, template_path, to_path, options, digest = args
+    profiler = Profiler() if profile else NULL_PROFILER
+    output_manifest = OutputManifest()
+    file = output_path(from_path, to_path)
+
+    if digest is not None:
+        output_manifest.files[file] = {"digest": digest, "size": None}
+
+    options = dict(options, profiler=profiler, output_manifest=output_manifest)
+    output = _generate_page_job((from_path, template_path, to_path, options))
+    records = profiler.records if profile else []
+    nodes = profiler.nodes if profile else {}
+    return output, output_manifest.files, output_manifest.changed, records, nodes
+
+
+def output_path(from_path, to_path):
+    """
+    Computes the path of the HTML file generated from a markdown file.
+
+    Args:
+        from_path (str): The path to the markdown file.
+        to_path (str): The directory to save the generated HTML file.
+
+    Returns:
+        str: The path of the HTML file.
+    """
+
+    return os.path.join(to_path, from_path.split("/")[-1]).replace(".md", ".html")
+
+
+def generate_page(
+    from_path,
+    template_path,
+    to_path,
+    manifest=None,
+    template=None,
+    profiler=NULL_PROFILER,
+    cache=None,
+    make_directory=True,
+    stream_threshold=None,
+    output_manifest=None,
+):
     """
     Generates an HTML page from a markdown file.
 
@@ -46,55 +923,300 @@ def generate_page(from_path, template_path, to_path):
         from_path (str): The path to the markdown file.
         template_path (str): The path to the HTML template file.
         to_path (str): The directory to save the generated HTML file.
+        manifest (BuildManifest, optional): The manifest used to skip unchanged pages. Defaults to None.
+        template (Template, optional): The already compiled template. Defaults to compiling template_path.
+        profiler (Profiler, optional): The profiler recording the build. Defaults to no profiling.
+        cache (FragmentCache, optional): The cache of parsed sources. Defaults to None.
+        make_directory (bool, optional): Create the target directory if needed. Defaults to True.
+        stream_threshold (int, optional): The size in bytes from which the source is
+            parsed and written block by block. Defaults to None. Mapped and streamed
+            sources bypass the cache, which would hold their whole content.
+        output_manifest (OutputManifest, optional): Records the digest of the page and
+            is used to skip rewriting it when its bytes did not change. Defaults to None.
+
+    Returns:
+        str: The path of the HTML file, or None if the page was up to date.
     """
 
-    print(f"Generating page from {from_path} to {to_path} using {template_path}")
+    with profiler.stage("page", from_path):
+        file = output_path(from_path, to_path)
+        source_hash = None
+        mode = read_mode(from_path, stream_threshold)
 
-    markdown = read_file(from_path)
-    html = markdown_to_html_node(markdown).to_html()
-    title = extract_title(markdown)
-    template = (
-        read_file(template_path)
-        .replace("{{ Title }}", title)
-        .replace("{{ Content }}", html)
-    )
+        if mode != read_mode_text:
+            cache = None
+
+        with contextlib.ExitStack() as source:
+            with profiler.stage("read_file", from_path):
+                markdown = source.enter_context(read_source(from_path, mode))
+
+            if mode == read_mode_stream:
+                if manifest is not None:
+                    source_hash = hash_file(from_path)
+            elif manifest is not None or cache is not None:
+                if mode == read_mode_mmap:
+                    source_hash = hash_bytes(markdown)
+                else:
+                    source_hash = hash_text(markdown)
+
+            if manifest is not None and manifest.is_fresh(from_path, source_hash, file):
+                if output_manifest is not None:
+                    output_manifest.refresh(file)
+
+                return None
+
+            print(
+                f"Generating page from {from_path} to {to_path} using {template_path}"
+            )
+
+            # The parsed tree and cached fragments only hold decoded text, so a
+            # mapped source can be released before the page is written.
+            if mode == read_mode_stream:
+                values = stream_page(from_path, profiler)
+            else:
+                values = render_page(from_path, markdown, source_hash, profiler, cache)
+
+        if template is None:
+            template = Template.from_file(template_path)
+
+        with profiler.stage("write", from_path):
+            if make_directory:
+                os.makedirs(to_path, exist_ok=True)
+
+            digest = None
+
+            if output_manifest is not None:
+                digest = output_manifest.digest(file)
+
+            digest, size, changed = write_page(file, template, values, digest)
+
+        if output_manifest is not None:
+            output_manifest.record(file, digest, size, changed)
+
+        if manifest is not None:
+            manifest.record(from_path, source_hash, file)
+
+        return file
+
+
+def render_page(
+    from_path, markdown, source_hash=None, profiler=NULL_PROFILER, cache=None
+):
+    """
+    Parses a markdown source into the template values of its page: the title,
+    the content fragment and the table of contents. The title and the headings
+    are collected by the block parser, without another pass over the source.
+
+    Args:
+        from_path (str): The path to the markdown file.
+        markdown (str): The contents of the markdown file.
+        source_hash (str, optional): The hash of the contents, required with a cache. Defaults to None.
+        profiler (Profiler, optional): The profiler recording the build. Defaults to no profiling.
+        cache (FragmentCache, optional): The cache of parsed sources. Defaults to None.
+
+    Returns:
+        dict: The Title, Content and Toc values, the last two as callables returning
+            an iterator over their fragment.
+    """
+
+    cached = None
+
+    if cache is not None:
+        with profiler.stage("cache_get", from_path):
+            cached = cache.get(source_hash)
+
+    if cached is not None:
+        title, html, toc = cached
+        return {"Title": title, "Content": (html,).__iter__, "Toc": (toc,).__iter__}
+
+    outline = Outline()
+
+    with profiler.stage("markdown_to_html_node", from_path):
+        node = markdown_to_html_node(markdown, outline)
+
+    title = outline.require_title()
+    profiler.count_nodes(from_path, node)
+
+    # Profiled pages are rendered ahead of the write, so the two stages are
+    # timed separately.
+    if not profiler.enabled:
+        toc = outline.to_html()
+        content = node.iter_html
+
+        if cache is not None:
+            content = _tee_to_cache(cache, source_hash, title, content, toc)
+
+        return {"Title": title, "Content": content, "Toc": lambda: iter((toc,))}
+
+    with profiler.stage("to_html", from_path):
+        html = node.to_html()
+        toc = outline.to_html()
+
+    if cache is not None:
+        with profiler.stage("cache_put", from_path):
+            cache.put(source_hash, title, html, toc)
+
+    return {"Title": title, "Content": (html,).__iter__, "Toc": (toc,).__iter__}
+
+
+def _tee_to_cache(cache, source_hash, title, content, toc):
+    """
+    Wraps the content of a page so its fragments are stored in the cache as they
+    are streamed to the writer, instead of rendering the page ahead of the write.
+    The entry is stored once the content was streamed whole, and fragments stop
+    being collected when they outgrow the size cap of the cache.
+
+    Args:
+        cache (FragmentCache): The cache of parsed sources.
+        source_hash (str): The hash of the markdown source.
+        title (str): The title of the page.
+        content (callable): Returns an iterator over the content fragments.
+        toc (str): The rendered table of contents.
+
+    Returns:
+        callable: Returns an iterator over the content fragments.
+    """
+
+    stored = False
+
+    def tee():
+        nonlocal stored
+        fragments = [] if not stored else None
+        size = 0
+
+        for fragment in content():
+            if fragments is not None:
+                fragments.append(fragment)
+                size += len(fragment)
+
+                if size > cache.max_size:
+                    fragments = None
+
+            yield fragment
+
+        if fragments is not None:
+            cache.put(source_hash, title, "".join(fragments), toc)
+            stored = True
+
+    return tee
+
+
+def stream_page(from_path, profiler=NULL_PROFILER):
+    """
+    Prepares a page whose source is too large to load whole. The source is
+    memory-mapped: the title is found by a block scan that stops at the first
+    level 1 heading, and the content is decoded, parsed and rendered one block at
+    a time while it is written. The table of
+    contents needs the headings before the content is parsed, so it is collected
+    by a separate pass, only when the template uses it.
+
+    Args:
+        from_path (str): The path to the markdown file.
+        profiler (Profiler, optional): The profiler recording the build. Defaults to no profiling.
+
+    Returns:
+        dict: The Title, Content and Toc values of the page.
+    """
+
+    with profiler.stage("extract_title", from_path):
+        with map_file(from_path) as mapped:
+            title = markdown_title(iter_lines(mapped))
 
-    if not os.path.isdir(to_path):
-        os.makedirs(to_path)
+    def content():
+        with map_file(from_path) as mapped:
+            yield from markdown_file_to_html_node(iter_lines(mapped)).iter_html()
 
-    file = os.path.join(to_path, from_path.split("/")[-1]).replace(".md", ".html")
+    def toc():
+        with map_file(from_path) as mapped:
+            yield markdown_outline(iter_lines(mapped)).to_html()
 
-    with open(file, "w") as file:
-        file.write(template)
+    return {"Title": title, "Content": content, "Toc": toc}
 
 
-def copy_files(source, target):
+def hash_source(from_path, stream_threshold=None):
     """
-    Copies all files and directories from the source to the target directory.
+    Hashes a markdown source the same way generate_page does: the decoded text of
+    small sources, and the bytes of mapped and streamed ones, read in chunks.
+
+    Args:
+        from_path (str): The path to the markdown file.
+        stream_threshold (int, optional): The size in bytes from which sources are streamed. Defaults to None.
+
+    Returns:
+        str: The hash of the source.
+    """
+
+    if read_mode(from_path, stream_threshold) == read_mode_text:
+        return hash_text(read_file(from_path))
+
+    return hash_file(from_path)
+
+
+def write_page(file, template, values, previous_digest=None):
+    """
+    Writes a page by filling the template with its values. The file is replaced
+    atomically, and only when the rendered bytes differ from the existing ones.
+
+    Args:
+        file (str): The path of the HTML file.
+        template (Template): The compiled template.
+        values (dict): The Title, Content and Toc values of the page.
+        previous_digest (str, optional): The recorded digest of the existing file. Defaults to None.
+
+    Returns:
+        tuple: The digest and size of the page, and True if the file was replaced.
+    """
+
+    return write_if_changed(
+        file, lambda stream: template.write(stream, values), previous_digest
+    )
+
+
+def copy_files(
+    source,
+    target,
+    manifest=None,
+    checksum=False,
+    link_mode="copy",
+    files=None,
+    output_manifest=None,
+    stats=None,
+):
+    """
+    Synchronizes the files and directories of the source into the target directory.
+    Only changed files are transferred, and files whose source was removed are
+    pruned when a manifest is given. Generated pages are left untouched.
 
     Args:
         source (str): The source directory.
         target (str): The target directory.
+        manifest (BuildManifest, optional): The manifest recording the copied files. Defaults to None.
+        checksum (bool, optional): Compare files by content hash instead of size and mtime. Defaults to False.
+        link_mode (str, optional): How files are transferred: copy, hardlink or reflink. Defaults to copy.
+        files (list, optional): The (source path, target path) tuples planned for
+            the source. Defaults to scanning it.
+        output_manifest (OutputManifest, optional): Records the digest of every copied file. Defaults to None.
+        stats (dict, optional): The mtime and size of the planned files. Defaults to
+            reading the status of each source.
     """
 
     logging.info("Copying files from %s to %s", source, target)
 
-    shutil.rmtree(target, ignore_errors=True)
+    synced, transferred = sync_files(source, target, checksum, link_mode, files, stats)
 
-    def helper(src, dst):
-        entries = os.listdir(src)
+    logging.info("Copied %d of %d files", len(transferred), len(synced))
 
-        for entry in entries:
-            source_path = os.path.join(src, entry)
-            target_path = os.path.join(dst, entry)
+    if output_manifest is not None:
+        for target_path in transferred:
+            size = os.path.getsize(target_path)
+            output_manifest.record(target_path, hash_file(target_path), size)
 
-            if os.path.isdir(source_path):
-                os.makedirs(target_path, exist_ok=True)
-                helper(source_path, target_path)
-            else:
-                shutil.copy(source_path, target_path)
+        for target_path in synced.difference(transferred):
+            output_manifest.refresh(target_path)
 
-    helper(source, target)
+    if manifest is not None:
+        for removed in prune_files(manifest.update_assets(synced), target):
+            logging.info("Removed %s", removed)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,443 @@
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+
+
+def hash_text(text):
+    """
+    Computes the content hash of a string.
+
+    Args:
+        text (str): The text to hash.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest of the UTF-8 encoded text.
+    """
+
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def hash_bytes(data):
+    """
+    Computes the content hash of bytes, such as a memory-mapped file.
+
+    Args:
+        data (bytes-like): The bytes to hash.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest of the bytes, the same as hash_file of the file.
+    """
+
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(file_path):
+    """
+    Computes the content hash of a file without loading it all at once.
+
+    Args:
+        file_path (str): The path to the file to hash.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest of the file contents.
+    """
+
+    digest = hashlib.sha256()
+
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 16), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    BuildManifest records what was generated by the previous build so unchanged
+    pages can be skipped on the next one.
+
+    Attributes:
+        path (str): The path of the manifest file on disk.
+        template_hash (str): The hash of the template used by the previous build.
+        pages (dict): Maps each source path to its content hash and output path.
+        assets (list): The static files copied into the output by the previous build.
+    """
+
+    def __init__(self, path, template_hash=None, pages=None, assets=None):
+        """
+        Initializes a BuildManifest instance.
+
+        Args:
+            path (str): The path of the manifest file on disk.
+            template_hash (str, optional): The hash of the previous template. Defaults to None.
+            pages (dict, optional): The previously recorded pages. Defaults to None.
+            assets (list, optional): The previously copied static files. Defaults to None.
+        """
+
+        self.path = path
+        self.template_hash = template_hash
+        self.pages = pages or {}
+        self.assets = assets or []
+        self.template_changed = False
+        self._seen = set()
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a manifest from disk, starting from an empty one if it is missing or unreadable.
+
+        Args:
+            path (str): The path of the manifest file.
+
+        Returns:
+            BuildManifest: The loaded manifest.
+        """
+
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return cls(path)
+
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+
+        return cls(path, data.get("template"), data.get("pages"), data.get("assets"))
+
+    def use_template(self, template_hash):
+        """
+        Registers the template hash of the current build. Every page is considered
+        stale when it differs from the one recorded by the previous build.
+
+        Args:
+            template_hash (str): The hash of the current template.
+        """
+
+        self.template_changed = template_hash != self.template_hash
+        self.template_hash = template_hash
+
+    def is_fresh(self, source, source_hash, output):
+        """
+        Checks whether a page can be skipped because none of its inputs changed.
+
+        Args:
+            source (str): The path of the markdown source.
+            source_hash (str): The hash of the current source contents.
+            output (str): The path of the HTML output.
+
+        Returns:
+            bool: True if the recorded output is still up to date, False otherwise.
+        """
+
+        self._seen.add(source)
+
+        if self.template_changed:
+            return False
+
+        entry = self.pages.get(source)
+
+        return (
+            entry is not None
+            and entry["hash"] == source_hash
+            and entry["output"] == output
+            and os.path.isfile(output)
+        )
+
+    def record(self, source, source_hash, output):
+        """
+        Records a freshly generated page.
+
+        Args:
+            source (str): The path of the markdown source.
+            source_hash (str): The hash of the source contents.
+            output (str): The path of the HTML output.
+        """
+
+        self._seen.add(source)
+        previous = self.pages.get(source)
+
+        if previous and previous["output"] != output:
+            _remove_file(previous["output"])
+
+        self.pages[source] = {"hash": source_hash, "output": output}
+
+    def remove(self, source):
+        """
+        Forgets a source that was removed. Its output is deleted by the caller
+        with sync.prune_files, like the static files returned by update_assets.
+
+        Args:
+            source (str): The path of the markdown source.
+
+        Returns:
+            str: The path of the stale output, or None if the source was unknown.
+        """
+
+        entry = self.pages.pop(source, None)
+
+        if entry is None:
+            return None
+
+        return entry["output"]
+
+    def prune(self):
+        """
+        Forgets the sources that were not seen during the current build. Their
+        outputs are deleted by the caller with sync.prune_files, like the static
+        files returned by update_assets.
+
+        Returns:
+            list: The stale output paths.
+        """
+
+        stale = [source for source in self.pages if source not in self._seen]
+        return [self.pages.pop(source)["output"] for source in stale]
+
+    def update_assets(self, assets):
+        """
+        Replaces the recorded static files with the ones copied by the current build.
+
+        Args:
+            assets (iterable): The target paths of the copied static files.
+
+        Returns:
+            list: The previously copied files that no longer have a source.
+        """
+
+        current = set(assets)
+        stale = [asset for asset in self.assets if asset not in current]
+        self.assets = sorted(current)
+        return stale
+
+    def save(self):
+        """
+        Writes the manifest to disk, creating its directory when needed.
+        """
+
+        directory = os.path.dirname(self.path)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        data = {
+            "version": MANIFEST_VERSION,
+            "template": self.template_hash,
+            "pages": self.pages,
+            "assets": self.assets,
+        }
+
+        with open(self.path, "w") as file:
+            json.dump(data, file, indent=2, sort_keys=True)
+
+
+class OutputManifest:
+    """
+    OutputManifest records the digest and size of every file of the output, and
+    which of them the current build changed or removed, so a deploy step can
+    upload only the files that truly changed.
+
+    Attributes:
+        path (str): The path of the output manifest file on disk, or None.
+        files (dict): Maps each output path to its digest and size.
+        changed (set): The output paths written with new contents by the current build.
+        removed (set): The output paths removed by the current build.
+        mtime (int): The mtime in nanoseconds of the file when it was last loaded or
+            saved, or None.
+    """
+
+    def __init__(self, path=None, files=None, mtime=None):
+        """
+        Initializes an OutputManifest instance.
+
+        Args:
+            path (str, optional): The path of the output manifest file on disk. Defaults to None.
+            files (dict, optional): The previously recorded files. Defaults to None.
+            mtime (int, optional): The mtime in nanoseconds of the file. Defaults to None.
+        """
+
+        self.path = path
+        self.files = files or {}
+        self.changed = set()
+        self.removed = set()
+        self.mtime = mtime
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads an output manifest from disk, starting from an empty one if it is missing or unreadable.
+
+        Args:
+            path (str): The path of the output manifest file.
+
+        Returns:
+            OutputManifest: The loaded output manifest.
+        """
+
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return cls(path)
+
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+
+        return cls(path, data.get("files"), os.stat(path).st_mtime_ns)
+
+    def digest(self, output):
+        """
+        Looks up the recorded digest of an output file.
+
+        Args:
+            output (str): The path of the output file.
+
+        Returns:
+            str: The recorded digest, or None if the file is unknown.
+        """
+
+        entry = self.files.get(output)
+        return entry["digest"] if entry is not None else None
+
+    def record(self, output, digest, size, changed=True, source=None):
+        """
+        Records the contents of an output file.
+
+        Args:
+            output (str): The path of the output file.
+            digest (str): The hash of the file contents.
+            size (int): The size of the file in bytes.
+            changed (bool, optional): Whether the current build changed the file. Defaults to True.
+            source (str, optional): The fingerprint of the file a derived output,
+                such as a compressed sibling, was made from. Defaults to None.
+        """
+
+        self.files[output] = {"digest": digest, "size": size}
+
+        if source is not None:
+            self.files[output]["source"] = source
+
+        if changed:
+            self.changed.add(output)
+            self.removed.discard(output)
+
+    def is_current(self, output):
+        """
+        Checks whether the recorded entry of an output file still describes it:
+        the file has the recorded size and was not modified since the output
+        manifest was last loaded or saved.
+
+        Args:
+            output (str): The path of the output file.
+
+        Returns:
+            bool: True if the entry can be trusted without hashing the file.
+        """
+
+        entry = self.files.get(output)
+
+        if entry is None or entry["size"] is None or self.mtime is None:
+            return False
+
+        try:
+            stat = os.stat(output)
+        except FileNotFoundError:
+            return False
+
+        return stat.st_size == entry["size"] and stat.st_mtime_ns <= self.mtime
+
+    def refresh(self, output):
+        """
+        Records an output file again when its entry is missing or out of date,
+        such as a page rewritten by a tool that did not update the manifest.
+
+        Args:
+            output (str): The path of the output file.
+        """
+
+        if self.is_current(output):
+            return
+
+        digest = hash_file(output)
+        changed = digest != self.digest(output)
+        self.record(output, digest, os.path.getsize(output), changed)
+
+    def forget(self, output):
+        """
+        Forgets an output file that was removed.
+
+        Args:
+            output (str): The path of the output file.
+        """
+
+        if self.files.pop(output, None) is not None:
+            self.changed.discard(output)
+            self.removed.add(output)
+
+    def merge(self, files, changed):
+        """
+        Adds the records of another output manifest, such as one of a worker process.
+
+        Args:
+            files (dict): The files of the other output manifest.
+            changed (set): The changed files of the other output manifest.
+        """
+
+        self.files.update(files)
+        self.changed.update(changed)
+
+    def retain(self, outputs):
+        """
+        Forgets the files that are no longer part of the output.
+
+        Args:
+            outputs (iterable): The paths of every current output file.
+
+        Returns:
+            list: The paths that were forgotten.
+        """
+
+        current = set(outputs)
+        removed = [output for output in self.files if output not in current]
+
+        for output in removed:
+            self.forget(output)
+
+        return removed
+
+    def save(self):
+        """
+        Writes the output manifest to disk, creating its directory when needed.
+        """
+
+        directory = os.path.dirname(self.path)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        data = {
+            "version": MANIFEST_VERSION,
+            "files": self.files,
+            "changed": sorted(self.changed),
+            "removed": sorted(self.removed),
+        }
+
+        with open(self.path, "w") as file:
+            json.dump(data, file, indent=2, sort_keys=True)
+
+        self.mtime = os.stat(self.path).st_mtime_ns
+
+
+def _remove_file(file_path):
+    """
+    Removes a file, ignoring it if it is already gone.
+
+    Args:
+        file_path (str): The path of the file to remove.
+    """
+
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
@@ -1,7 +1,10 @@
 import re
 
 from inline_markdown import text_to_textnodes
+from io_utils import iter_lines
+from outline import Outline
 from parentnode import ParentNode
+from textnode import TextNode, text_type_text
 
 block_type_paragraph = "paragraph"
 block_type_heading = "heading"
@@ -10,28 +13,144 @@ block_type_quota = "quota"
 block_type_unordered_list = "unordered_list"
 block_type_ordered_list = "ordered_list"
 
+heading_tags = ("h1", "h2", "h3", "h4", "h5", "h6")
 
-def markdown_to_block(markdown):
+
+line_type_blank = "blank"
+line_type_fence = "fence"
+
+heading_pattern = re.compile(r"#{1,6}\s")
+ordered_list_pattern = re.compile(r"\d+\.\s")
+
+# Line types that continue the open block when they follow a line of the same type.
+continued_types = (
+    block_type_paragraph,
+    block_type_quota,
+    block_type_unordered_list,
+    block_type_ordered_list,
+)
+
+
+def classify_line(line):
     """
-    Splits a markdown string into individual blocks based on newlines.
+    Determines the type of a stripped line by looking at its first characters.
 
     Args:
-        markdown (str): The input markdown string.
+        line (str): The line, without surrounding whitespace.
 
     Returns:
-        list: A list of blocks (strings) from the markdown.
+        str: The block type the line belongs to, line_type_blank or line_type_fence.
     """
 
-    fragments = markdown.split("\n")
-    blocks = []
+    if not line:
+        return line_type_blank
 
-    for fragment in fragments:
-        if fragment == "":
+    first = line[0]
+
+    if first == "#" and heading_pattern.match(line):
+        return block_type_heading
+
+    if first == "`" and line.startswith("```"):
+        return line_type_fence
+
+    if first == ">":
+        return block_type_quota
+
+    if (first == "*" or first == "-") and line[1:2].isspace():
+        return block_type_unordered_list
+
+    if first.isdigit() and ordered_list_pattern.match(line):
+        return block_type_ordered_list
+
+    return block_type_paragraph
+
+
+def iter_blocks(lines):
+    """
+    Groups lines into blocks with a state machine that classifies each line once.
+    Consecutive paragraph, quote and list lines form a single block, a blank line
+    closes the open block, and a fence opens a code block that runs until the
+    closing fence.
+
+    Args:
+        lines (iterable): The lines of the markdown text.
+
+    Yields:
+        tuple: The type of each block and the block itself, its lines joined by newlines.
+    """
+
+    block_type = None
+    block = []
+    fence_indent = 0
+
+    for raw_line in lines:
+        line = raw_line.strip()
+
+        if block_type == block_type_code:
+            if line.startswith("```"):
+                block.append("```")
+                yield block_type, "\n".join(block)
+                block_type = None
+                block = []
+                continue
+
+            # Code keeps its own indentation, relative to the opening fence.
+            raw_line = raw_line.rstrip()
+            indent = min(fence_indent, len(raw_line) - len(raw_line.lstrip()))
+            block.append(raw_line[indent:])
+            continue
+
+        line_type = classify_line(line)
+
+        if line_type == block_type and line_type in continued_types:
+            block.append(line)
             continue
 
-        blocks.append(fragment.strip())
+        if block:
+            yield block_type, "\n".join(block)
 
-    return blocks
+        block_type = None
+        block = []
+
+        if line_type == line_type_blank:
+            continue
+
+        if line_type == line_type_fence:
+            if len(line) >= 6 and line.endswith("```"):
+                yield block_type_code, line
+                continue
+
+            block_type = block_type_code
+            block = [line]
+            fence_indent = len(raw_line) - len(raw_line.lstrip())
+            continue
+
+        if line_type == block_type_heading:
+            yield line_type, line
+            continue
+
+        block_type = line_type
+        block = [line]
+
+    if block_type == block_type_code:
+        block.append("```")
+
+    if block:
+        yield block_type, "\n".join(block)
+
+
+def markdown_to_block(markdown):
+    """
+    Splits a markdown string into individual blocks.
+
+    Args:
+        markdown (str): The input markdown string.
+
+    Returns:
+        list: A list of blocks (strings) from the markdown.
+    """
+
+    return [block for _, block in iter_blocks(markdown.split("\n"))]
 
 
 def block_to_block_type(block):
@@ -45,61 +164,157 @@ def block_to_block_type(block):
         str: The type of the block.
     """
 
-    if re.match(r"^\s*#{1,6}\s", block):
-        return block_type_heading
+    block_type = classify_line(block.split("\n", 1)[0].strip())
 
-    if block.startswith("```") and block.endswith("```"):
-        return block_type_code
+    if block_type == line_type_fence:
+        if len(block) >= 6 and block.endswith("```"):
+            return block_type_code
 
-    if block.startswith(">"):
-        return block_type_quota
+        return block_type_paragraph
 
-    if re.match(r"^[*-]\s", block):
-        return block_type_unordered_list
-
-    if re.match(r"^\d+\.\s", block):
-        return block_type_ordered_list
+    if block_type == line_type_blank:
+        return block_type_paragraph
 
-    return block_type_paragraph
+    return block_type
 
 
-def markdown_to_html_node(markdown):
+def markdown_to_html_node(markdown, outline=None):
     """
-    Converts markdown text to a hierarchical structure of HTML nodes.
+    Converts markdown text to a hierarchical structure of HTML nodes. UTF-8
+    encoded markdown, such as a memory-mapped file, is split into lines in place
+    and decoded one line at a time.
 
     Args:
-        markdown (str): The markdown text to be converted.
+        markdown (str or bytes-like): The markdown text to be converted.
+        outline (Outline, optional): Collects the title and headings of the document. Defaults to a new one.
 
     Returns:
         ParentNode: The root node containing the HTML structure.
     """
 
-    blocks = markdown_to_block(markdown)
-    i = 0
-    children = []
+    if outline is None:
+        outline = Outline()
+
+    if isinstance(markdown, str):
+        lines = markdown.split("\n")
+    else:
+        lines = iter_lines(markdown)
+
+    return ParentNode("div", list(iter_block_nodes(lines, outline)))
 
-    while i < len(blocks):
-        block = blocks[i]
-        block_type = block_to_block_type(block)
 
-        if block_type == block_type_paragraph:
-            children.append(paragraph_to_html_node(block))
-        elif block_type == block_type_heading:
-            children.append(heading_to_html_node(block))
-        elif block_type == block_type_code:
-            children.append(code_to_html_node(block))
-        elif block_type == block_type_quota:
-            children.append(quote_to_html_node(block))
-        elif block_type == block_type_unordered_list:
-            i, ul = ul_to_html_node(i, blocks)
-            children.append(ul)
-        elif block_type == block_type_ordered_list:
-            i, ol = ol_to_html_node(i, blocks)
-            children.append(ol)
+def markdown_file_to_html_node(file, outline=None):
+    """
+    Converts a markdown file to a root node whose children are parsed lazily,
+    one block at a time, while the node is rendered with iter_html or write_html.
+    Only the block being parsed is held in memory, so the node can be rendered
+    only once and the file must stay open until then.
+
+    Args:
+        file (iterable): The open markdown file, or any other iterable of lines.
+        outline (Outline, optional): Collects the title and headings as they are
+            parsed. Defaults to a new one.
+
+    Returns:
+        ParentNode: The root node streaming the HTML structure.
+    """
+
+    if outline is None:
+        outline = Outline()
+
+    return ParentNode("div", iter_block_nodes(file, outline))
+
+
+def markdown_outline(lines):
+    """
+    Collects the title and headings of a document without building its other blocks.
+
+    Args:
+        lines (iterable): The lines of the markdown text.
+
+    Returns:
+        Outline: The outline of the document.
+    """
+
+    outline = Outline()
+
+    for block_type, block in iter_blocks(lines):
+        if block_type == block_type_heading:
+            heading_to_html_node(block, outline)
+
+    return outline
+
+
+def markdown_title(lines):
+    """
+    Finds the title of a document without parsing it whole: the blocks are
+    grouped as for parsing, so a heading inside a code block is skipped, and the
+    scan stops at the first level 1 heading.
+
+    Args:
+        lines (iterable): The lines of the markdown text.
+
+    Returns:
+        str: The markdown text of the first level 1 heading, as recorded by Outline.
+
+    Raises:
+        ValueError: If the document has no level 1 heading.
+    """
+
+    for block_type, block in iter_blocks(lines):
+        if block_type == block_type_heading:
+            level, text = split_heading(block)
+
+            if level == 1:
+                return text
+
+    raise ValueError("Title not found")
 
-        i += 1
 
-    return ParentNode("div", children)
+def iter_block_nodes(lines, outline=None):
+    """
+    Converts markdown lines to HTML nodes, yielding each block node as soon as
+    its block closes.
+
+    Args:
+        lines (iterable): The lines of the markdown text.
+        outline (Outline, optional): Collects the title and headings. Defaults to None.
+
+    Yields:
+        ParentNode: The HTML node of each block.
+    """
+
+    for block_type, block in iter_blocks(lines):
+        yield block_to_html_node(block, block_type, outline)
+
+
+def block_to_html_node(block, block_type, outline=None):
+    """
+    Converts a classified block into its HTML node.
+
+    Args:
+        block (str): The markdown block.
+        block_type (str): The type of the block.
+        outline (Outline, optional): Collects the title and headings. Defaults to None.
+
+    Returns:
+        ParentNode: The HTML node representing the block.
+    """
+
+    if block_type == block_type_paragraph:
+        return paragraph_to_html_node(block)
+    if block_type == block_type_heading:
+        return heading_to_html_node(block, outline)
+    if block_type == block_type_code:
+        return code_to_html_node(block)
+    if block_type == block_type_quota:
+        return quote_to_html_node(block)
+    if block_type == block_type_unordered_list:
+        return ul_to_html_node(block)
+    if block_type == block_type_ordered_list:
+        return ol_to_html_node(block)
+
+    raise ValueError(f"Invalid block type: {block_type}")
 
 
 def text_to_children(text):
@@ -117,61 +332,49 @@ def text_to_children(text):
     children = []
 
     for text_node in text_nodes:
-        children.append(text_node.to_html_node())
+        children.append(text_node.to_html_node(shared=True))
 
     return children
 
 
-def ol_to_html_node(i, blocks):
+def ol_to_html_node(block):
     """
-    Converts ordered list blocks into an HTML ordered list node.
+    Converts an ordered list block into an HTML ordered list node.
 
     Args:
-        i (int): The current index in the list of blocks.
-        blocks (list): The list of markdown blocks.
+        block (str): The markdown block representing the list, one item per line.
 
     Returns:
-        tuple: The updated index and the HTML node representing the ordered list.
+        ParentNode: The HTML node representing the ordered list.
     """
 
     html_elements = []
-    pattern = re.compile(r"^\d+\.\s")
 
-    while i < len(blocks) and pattern.match(blocks[i]):
-        block = blocks[i]
-        children = text_to_children(block[2:].strip())
-        li = ParentNode("li", children)
-        html_elements.append(li)
-        i += 1
+    for line in block.split("\n"):
+        children = text_to_children(line.split(".", 1)[1].strip())
+        html_elements.append(ParentNode("li", children))
 
-    i -= 1
-    return (i, ParentNode("ol", html_elements))
+    return ParentNode("ol", html_elements)
 
 
-def ul_to_html_node(i, blocks):
+def ul_to_html_node(block):
     """
-    Converts unordered list blocks into an HTML unordered list node.
+    Converts an unordered list block into an HTML unordered list node.
 
     Args:
-        i (int): The current index in the list of blocks.
-        blocks (list): The list of markdown blocks.
+        block (str): The markdown block representing the list, one item per line.
 
     Returns:
-        tuple: The updated index and the HTML node representing the unordered list.
+        ParentNode: The HTML node representing the unordered list.
     """
 
     html_elements = []
-    pattern = re.compile(r"^[*]\s")
 
-    while i < len(blocks) and pattern.match(blocks[i]):
-        block = blocks[i]
-        children = text_to_children(block[2:].strip())
-        li = ParentNode("li", children)
-        html_elements.append(li)
-        i += 1
+    for line in block.split("\n"):
+        children = text_to_children(line[2:].strip())
+        html_elements.append(ParentNode("li", children))
 
-    i -= 1
-    return (i, ParentNode("ul", html_elements))
+    return ParentNode("ul", html_elements)
 
 
 def quote_to_html_node(block):
@@ -210,27 +413,55 @@ def code_to_html_node(block):
         ParentNode: The HTML node representing the pre/code.
     """
 
-    text = block[4:-3]
-    children = text_to_children(text)
-    code = ParentNode("code", children)
+    _, newline, text = block.partition("\n")
+
+    # A fenced block keeps a trailing newline, a single-line one is just its text.
+    text = text[:-3] if newline else block[3:-3]
+
+    # Code is not inline markdown, so its text becomes a single leaf.
+    code = ParentNode("code", [TextNode(text, text_type_text).to_html_node()])
     return ParentNode("pre", [code])
 
 
-def heading_to_html_node(block):
+def heading_to_html_node(block, outline=None):
     """
     Converts a heading block into an HTML heading node.
 
     Args:
         block (str): The markdown block representing the heading.
+        outline (Outline, optional): Records the heading, which then gets an id
+            anchor for the table of contents. Defaults to None.
 
     Returns:
         ParentNode: The HTML node representing the heading.
     """
 
-    level = len(re.match(r"^\s*#{1,6}\s", block).group().strip())
-    text = block[level + 1 :].strip()
-    children = text_to_children(text)
-    return ParentNode(f"h{level}", children)
+    level, text = split_heading(block)
+    text_nodes = text_to_textnodes(text)
+    children = [text_node.to_html_node(shared=True) for text_node in text_nodes]
+
+    if outline is None:
+        return ParentNode(heading_tags[level - 1], children)
+
+    plain_text = "".join(text_node.text for text_node in text_nodes)
+    anchor = outline.add(level, plain_text, text)
+    return ParentNode(heading_tags[level - 1], children, {"id": anchor})
+
+
+def split_heading(block):
+    """
+    Splits a heading block into its level and its markdown text.
+
+    Args:
+        block (str): The markdown block representing the heading.
+
+    Returns:
+        tuple: The level of the heading, from 1 to 6, and its text without the
+            leading hashes and surrounding whitespace.
+    """
+
+    level = len(block) - len(block.lstrip("#"))
+    return level, block[level + 1 :].strip()
 
 
 def paragraph_to_html_node(block):
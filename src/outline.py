@@ -0,0 +1,131 @@
+import re
+
+from leafnode import LeafNode
+from parentnode import ParentNode
+
+anchor_invalid_pattern = re.compile(r"[^\w\s-]")
+anchor_separator_pattern = re.compile(r"[\s-]+")
+
+
+class Outline:
+    """
+    Outline collects the headings of a document while its blocks are parsed, so
+    the title and the table of contents are known without another pass over the
+    markdown.
+
+    Attributes:
+        title (str): The markdown text of the first level 1 heading, or None.
+        headings (list): One (level, text, anchor) tuple per heading, in document order.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty Outline.
+        """
+
+        self.title = None
+        self.headings = []
+        self._anchors = {}
+
+    def add(self, level, text, source):
+        """
+        Records a heading and assigns it an anchor that is unique in the document.
+
+        Args:
+            level (int): The level of the heading, from 1 to 6.
+            text (str): The plain text of the heading.
+            source (str): The markdown text of the heading.
+
+        Returns:
+            str: The anchor of the heading, used as its id attribute.
+        """
+
+        if level == 1 and self.title is None:
+            self.title = source
+
+        anchor = slugify(text)
+        count = self._anchors.get(anchor, 0)
+        self._anchors[anchor] = count + 1
+
+        if count:
+            anchor = f"{anchor}-{count}"
+
+        self.headings.append((level, text, anchor))
+        return anchor
+
+    def require_title(self):
+        """
+        Returns the title of the document.
+
+        Returns:
+            str: The markdown text of the first level 1 heading.
+
+        Raises:
+            ValueError: If the document has no level 1 heading.
+        """
+
+        if self.title is None:
+            raise ValueError("Title not found")
+
+        return self.title
+
+    def to_html_node(self):
+        """
+        Converts the headings into a table of contents of nested lists of links.
+
+        Returns:
+            ParentNode: The root list of the table of contents, or None without headings.
+        """
+
+        if not self.headings:
+            return None
+
+        # Each entry holds an open list, the level of its items and the item the
+        # next deeper list is nested into.
+        root = []
+        stack = [(root, self.headings[0][0], None)]
+
+        for level, text, anchor in self.headings:
+            while level < stack[-1][1] and len(stack) > 1:
+                stack.pop()
+
+            items, items_level, last = stack[-1]
+
+            if level > items_level and last is not None:
+                nested = []
+                last.children.append(ParentNode("ul", nested))
+                stack.append((nested, level, None))
+                items = nested
+
+            item = ParentNode("li", [LeafNode("a", text, {"href": f"#{anchor}"})])
+            items.append(item)
+            stack[-1] = (items, stack[-1][1], item)
+
+        return ParentNode("ul", root)
+
+    def to_html(self):
+        """
+        Renders the table of contents.
+
+        Returns:
+            str: The HTML of the table of contents, or an empty string without headings.
+        """
+
+        node = self.to_html_node()
+        return node.to_html() if node is not None else ""
+
+
+def slugify(text):
+    """
+    Converts the text of a heading into an anchor.
+
+    Args:
+        text (str): The plain text of the heading.
+
+    Returns:
+        str: The lowercase anchor, with words separated by hyphens.
+    """
+
+    slug = anchor_invalid_pattern.sub("", text.lower()).strip()
+    slug = anchor_separator_pattern.sub("-", slug).strip("-")
+    return slug or "section"
@@ -12,6 +12,8 @@ class ParentNode(HTMLNode):
         props (dict, optional): A dictionary of HTML attributes and their values. Defaults to None.
     """
 
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         """
         Initializes a ParentNode instance with the given children, tag, and properties.
@@ -24,12 +26,12 @@ class ParentNode(HTMLNode):
 
         super().__init__(tag, None, children, props)
 
-    def to_html(self):
+    def html_parts(self):
         """
-        Converts the ParentNode to an HTML string representation.
+        Splits the ParentNode into the pieces rendered around its children.
 
         Returns:
-            str: The HTML string representation of the ParentNode.
+            tuple: The opening tag, the list of children and the closing tag.
 
         Raises:
             ValueError: If the ParentNode does not have a tag.
@@ -42,6 +44,8 @@ class ParentNode(HTMLNode):
         if not self.children:
             raise ValueError("ParentNode must have children")
 
-        children_html = "".join([child.to_html() for child in self.children])
-
-        return f"<{self.tag} {self.props_to_html()}>{children_html}</{self.tag}>"
+        return (
+            f"<{self.tag} {self.props_to_html()}>",
+            self.children,
+            f"</{self.tag}>",
+        )
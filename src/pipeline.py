@@ -0,0 +1,93 @@
+import collections
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def prefetch(function, items, pool, depth):
+    """
+    Calls a function on every item from a thread pool, keeping up to depth calls
+    running ahead of the consumer, and yields the results in order.
+
+    Args:
+        function (callable): The function to call on each item.
+        items (iterable): The items to process.
+        pool (ThreadPoolExecutor): The pool running the calls.
+        depth (int): The maximum number of calls running ahead.
+
+    Yields:
+        tuple: Each item along with the result of the function.
+    """
+
+    items = iter(items)
+    pending = collections.deque(
+        (item, pool.submit(function, item)) for item in itertools.islice(items, depth)
+    )
+
+    try:
+        while pending:
+            item, future = pending.popleft()
+
+            for next_item in itertools.islice(items, 1):
+                pending.append((next_item, pool.submit(function, next_item)))
+
+            yield item, future.result()
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+
+class BoundedWriter:
+    """
+    BoundedWriter runs write jobs on a thread pool. Once max_pending jobs are
+    queued or running, submitting another one blocks until a job finishes, so
+    a slow disk throttles the producer instead of buffering every page in memory.
+
+    Attributes:
+        threads (int): The number of writer threads.
+        max_pending (int): The maximum number of jobs queued or running.
+    """
+
+    def __init__(self, threads, max_pending):
+        """
+        Initializes a BoundedWriter and starts its thread pool.
+
+        Args:
+            threads (int): The number of writer threads.
+            max_pending (int): The maximum number of jobs queued or running.
+        """
+
+        self.threads = threads
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(threads, thread_name_prefix="writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, function, *args):
+        """
+        Queues a write job, waiting for a free slot first.
+
+        Args:
+            function (callable): The job to run.
+            *args: The arguments of the job.
+
+        Returns:
+            Future: The future of the job.
+        """
+
+        self._slots.acquire()
+
+        try:
+            future = self._pool.submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def close(self):
+        """
+        Waits for the queued jobs to finish and stops the thread pool.
+        """
+
+        self._pool.shutdown(wait=True)
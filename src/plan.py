@@ -0,0 +1,199 @@
+import hashlib
+import os
+
+# Fraction by which a shard may exceed the average load before files pass on
+# to their next choice of shard.
+LOAD_SLACK = 0.25
+MASK_64 = (1 << 64) - 1
+
+
+class BuildPlan:
+    """
+    BuildPlan lists every input of a build and where it goes, gathered by a single
+    scan of the content and static directories before any work starts.
+
+    Attributes:
+        pages (list): (source path, target directory) tuples of the markdown files.
+        assets (list): (source path, target path) tuples of the static files.
+        stats (dict): Maps each source path to its (mtime in nanoseconds, size) tuple.
+    """
+
+    def __init__(self, pages=None, assets=None, stats=None):
+        """
+        Initializes a BuildPlan.
+
+        Args:
+            pages (list, optional): The planned markdown files. Defaults to None.
+            assets (list, optional): The planned static files. Defaults to None.
+            stats (dict, optional): The mtime and size of each source. Defaults to None.
+        """
+
+        self.pages = pages or []
+        self.assets = assets or []
+        self.stats = stats or {}
+
+    @property
+    def page_count(self):
+        """
+        int: The number of pages of the build.
+        """
+
+        return len(self.pages)
+
+    def shard(self, index, count):
+        """
+        Restricts the plan to one shard of a build split across several
+        processes or machines. Pages and assets are partitioned separately, so
+        no shard renders or copies much more than the average number of bytes.
+
+        Args:
+            index (int): The shard to keep, from 1 to count.
+            count (int): The number of shards.
+
+        Returns:
+            BuildPlan: The plan of the shard.
+        """
+
+        pages = partition(self.pages, self.stats, count)[index - 1]
+        assets = partition(self.assets, self.stats, count)[index - 1]
+        stats = {path: self.stats[path] for path, _ in pages + assets}
+        return BuildPlan(pages, assets, stats)
+
+
+def stable_hash(path):
+    """
+    Hashes a path the same way in every process and on every machine, unlike
+    the built-in hash of strings.
+
+    Args:
+        path (str): The path, relative to the root of the site.
+
+    Returns:
+        int: The hash of the path.
+    """
+
+    normalized = path.replace(os.sep, "/").encode("utf-8")
+    return int.from_bytes(hashlib.sha256(normalized).digest()[:8], "big")
+
+
+def partition(items, stats, count):
+    """
+    Splits planned files into shards by rendezvous hashing. Each file ranks the
+    shards by a stable hash of its path and the shard, and goes to the first
+    one it prefers. Sizes only bound the result: a file passes on to its next
+    choice when the shard would exceed the average load by more than
+    LOAD_SLACK. Files are placed in the order of the stable hash of their path,
+    so the split depends only on the files, and resizing, adding or removing a
+    file moves only a few others.
+
+    Args:
+        items (list): (source path, target) tuples of the planned files.
+        stats (dict): Maps each source path to its (mtime in nanoseconds, size) tuple.
+        count (int): The number of shards.
+
+    Returns:
+        list: The (source path, target) tuples of each shard, sorted by source path.
+    """
+
+    def weight(path):
+        # Every file counts for at least one byte, so empty files spread out too.
+        return max(stats[path][1] if path in stats else 0, 1)
+
+    ordered = sorted((stable_hash(item[0]), item) for item in items)
+    capacity = (1 + LOAD_SLACK) * sum(weight(path) for _, (path, _) in ordered) / count
+    shards = [[] for _ in range(count)]
+    loads = [0] * count
+
+    for key, item in ordered:
+        size = weight(item[0])
+        ranked = sorted(range(count), key=lambda shard: _mix(key, shard), reverse=True)
+        # A file too large for the room left anywhere goes to the least loaded shard.
+        choice = next(
+            (shard for shard in ranked if loads[shard] + size <= capacity),
+            min(ranked, key=loads.__getitem__),
+        )
+        shards[choice].append(item)
+        loads[choice] += size
+
+    return [sorted(shard) for shard in shards]
+
+
+def _mix(key, shard):
+    """
+    Scores a shard for a file in rendezvous hashing, with the finalizer of
+    SplitMix64, so every shard gets an independent score from one path hash.
+
+    Args:
+        key (int): The stable hash of the path of the file.
+        shard (int): The shard.
+
+    Returns:
+        int: The score of the shard, a 64-bit integer.
+    """
+
+    value = (key + (shard + 1) * 0x9E3779B97F4A7C15) & MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return value ^ (value >> 31)
+
+
+def scan_files(directory, target_directory):
+    """
+    Recursively lists the files of a directory with os.scandir, using the file
+    type cached by each directory entry instead of a stat call per entry.
+
+    Args:
+        directory (str): The directory to scan.
+        target_directory (str): The directory mirroring it in the output.
+
+    Yields:
+        tuple: The os.DirEntry of each file and its path under the target directory.
+    """
+
+    stack = [(directory, target_directory)]
+
+    while stack:
+        source, target = stack.pop()
+
+        with os.scandir(source) as entries:
+            subdirectories = []
+
+            for entry in entries:
+                target_path = os.path.join(target, entry.name)
+
+                if entry.is_dir():
+                    subdirectories.append((entry.path, target_path))
+                else:
+                    yield entry, target_path
+
+        stack.extend(reversed(subdirectories))
+
+
+def create_plan(content, static, public):
+    """
+    Scans the content and static directories once and plans the whole build.
+
+    Args:
+        content (str): The directory containing markdown files.
+        static (str): The directory containing static files.
+        public (str): The directory of the generated site.
+
+    Returns:
+        BuildPlan: The plan of the build.
+    """
+
+    plan = BuildPlan()
+
+    for entry, target_path in scan_files(content, public):
+        if entry.name.endswith(".md"):
+            plan.pages.append((entry.path, os.path.dirname(target_path)))
+            stat = entry.stat()
+            plan.stats[entry.path] = (stat.st_mtime_ns, stat.st_size)
+
+    if os.path.isdir(static):
+        for entry, target_path in scan_files(static, public):
+            plan.assets.append((entry.path, target_path))
+            stat = entry.stat()
+            plan.stats[entry.path] = (stat.st_mtime_ns, stat.st_size)
+
+    return plan
@@ -0,0 +1,232 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+
+class NullProfiler:
+    """
+    NullProfiler is used when profiling is off. Its stages are a shared no-op
+    context manager, so instrumented code pays almost nothing.
+    """
+
+    enabled = False
+
+    _context = contextlib.nullcontext()
+
+    def stage(self, name, page=None):
+        """
+        Returns a context manager that records nothing.
+
+        Args:
+            name (str): The name of the stage.
+            page (str, optional): The page being processed. Defaults to None.
+
+        Returns:
+            contextlib.nullcontext: The no-op context manager.
+        """
+
+        return self._context
+
+    def count_nodes(self, page, node):
+        """
+        Ignores the node count of a page.
+
+        Args:
+            page (str): The page being processed.
+            node (HTMLNode): The root of the page tree.
+        """
+
+    def merge(self, records, nodes):
+        """
+        Ignores the measurements of another profiler.
+
+        Args:
+            records (list): The stage records of the other profiler.
+            nodes (dict): The node counts of the other profiler.
+        """
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class Profiler:
+    """
+    Profiler records the wall and CPU time of each build stage and page, and the
+    number of HTML nodes created for each page.
+
+    Attributes:
+        records (list): One (name, page, start, wall, cpu, pid, tid) tuple per
+            finished stage, with times in nanoseconds.
+        nodes (dict): Maps each page to the number of HTML nodes of its tree.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        """
+        Initializes an empty Profiler.
+        """
+
+        self.records = []
+        self.nodes = {}
+
+    @contextlib.contextmanager
+    def stage(self, name, page=None):
+        """
+        Measures the wall and CPU time spent inside the context.
+
+        Args:
+            name (str): The name of the stage.
+            page (str, optional): The page being processed. Defaults to None.
+        """
+
+        start = time.perf_counter_ns()
+        cpu = time.thread_time_ns()
+
+        try:
+            yield
+        finally:
+            self.records.append(
+                (
+                    name,
+                    page,
+                    start,
+                    time.perf_counter_ns() - start,
+                    time.thread_time_ns() - cpu,
+                    os.getpid(),
+                    threading.get_native_id(),
+                )
+            )
+
+    def count_nodes(self, page, node):
+        """
+        Records the number of HTML nodes in the tree of a page.
+
+        Args:
+            page (str): The page being processed.
+            node (HTMLNode): The root of the page tree.
+        """
+
+        self.nodes[page] = sum(1 for _ in node.walk())
+
+    def merge(self, records, nodes):
+        """
+        Adds the measurements of another profiler, such as one of a worker process.
+
+        Args:
+            records (list): The stage records of the other profiler.
+            nodes (dict): The node counts of the other profiler.
+        """
+
+        self.records.extend(records)
+        self.nodes.update(nodes)
+
+    def stages(self):
+        """
+        Aggregates the records by stage.
+
+        Returns:
+            dict: Maps each stage name to its count, wall time and CPU time in nanoseconds.
+        """
+
+        stages = {}
+
+        for name, _, _, wall, cpu, _, _ in self.records:
+            stage = stages.setdefault(name, {"count": 0, "wall": 0, "cpu": 0})
+            stage["count"] += 1
+            stage["wall"] += wall
+            stage["cpu"] += cpu
+
+        return stages
+
+    def slowest_pages(self, top=10):
+        """
+        Finds the pages that took the longest to generate.
+
+        Args:
+            top (int, optional): The number of pages to return. Defaults to 10.
+
+        Returns:
+            list: (page, wall, cpu, nodes) tuples, slowest first, with times in nanoseconds.
+        """
+
+        pages = [
+            (page, wall, cpu, self.nodes.get(page, 0))
+            for name, page, _, wall, cpu, _, _ in self.records
+            if name == "page"
+        ]
+
+        return sorted(pages, key=lambda page: page[1], reverse=True)[:top]
+
+    def report(self, top=10):
+        """
+        Formats a human readable timing report.
+
+        Args:
+            top (int, optional): The number of slowest pages to list. Defaults to 10.
+
+        Returns:
+            str: The report.
+        """
+
+        lines = [f"{'stage':<24}{'count':>8}{'wall ms':>12}{'cpu ms':>12}"]
+
+        for name, stage in sorted(
+            self.stages().items(), key=lambda item: item[1]["wall"], reverse=True
+        ):
+            lines.append(
+                f"{name:<24}{stage['count']:>8}"
+                f"{stage['wall'] / 1e6:>12.2f}{stage['cpu'] / 1e6:>12.2f}"
+            )
+
+        lines.append(f"nodes created: {sum(self.nodes.values())}")
+        lines.append("")
+        lines.append(f"{'slowest pages':<48}{'wall ms':>12}{'cpu ms':>12}{'nodes':>8}")
+
+        for page, wall, cpu, nodes in self.slowest_pages(top):
+            lines.append(f"{page:<48}{wall / 1e6:>12.2f}{cpu / 1e6:>12.2f}{nodes:>8}")
+
+        return "\n".join(lines)
+
+    def write_trace(self, trace_path):
+        """
+        Writes the records as a Chrome trace-event JSON file, which can be opened
+        in chrome://tracing or Perfetto.
+
+        Args:
+            trace_path (str): The path of the trace file.
+        """
+
+        events = []
+
+        for name, page, start, wall, cpu, pid, tid in self.records:
+            args = {"cpu_ms": cpu / 1e6}
+
+            if page is not None:
+                args["page"] = page
+
+                if name == "page" and page in self.nodes:
+                    args["nodes"] = self.nodes[page]
+
+            events.append(
+                {
+                    "name": name,
+                    "cat": "page" if name == "page" else "stage",
+                    "ph": "X",
+                    "ts": start / 1e3,
+                    "dur": wall / 1e3,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": args,
+                }
+            )
+
+        directory = os.path.dirname(trace_path)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(trace_path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
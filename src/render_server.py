@@ -0,0 +1,400 @@
+import collections
+import functools
+import os
+import posixpath
+import threading
+import urllib.parse
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from io_utils import read_file
+from main import CONTENT_DIR, STATIC_DIR, TEMPLATE_PATH, open_cache, render_page
+from manifest import hash_text
+from template import Template
+
+
+class PageCache:
+    """
+    PageCache keeps rendered pages in memory, keyed by their source path. Each
+    entry remembers the stat and hash of the source it was rendered from,
+    and the least recently used entries are evicted once the rendered pages grow
+    beyond the size cap.
+
+    Attributes:
+        max_size (int): The maximum total size of the rendered pages, in bytes.
+        size (int): The current total size of the rendered pages, in bytes.
+    """
+
+    def __init__(self, max_size=64 * 1024 * 1024):
+        """
+        Initializes an empty PageCache.
+
+        Args:
+            max_size (int, optional): The maximum total size of the rendered pages, in bytes. Defaults to 64 MiB.
+        """
+
+        self.max_size = max_size
+        self.size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """
+        Returns the number of cached pages.
+
+        Returns:
+            int: The number of cached pages.
+        """
+
+        return len(self._entries)
+
+    def get(self, source):
+        """
+        Looks up the rendered page of a source and marks it as recently used.
+
+        Args:
+            source (str): The path of the markdown source.
+
+        Returns:
+            tuple: The stat key and hash of the source the page was rendered
+                from, and the rendered page, or None on a miss.
+        """
+
+        with self._lock:
+            entry = self._entries.get(source)
+
+            if entry is not None:
+                self._entries.move_to_end(source)
+
+            return entry
+
+    def put(self, source, stat, source_hash, body):
+        """
+        Stores the rendered page of a source and evicts the least recently used pages.
+
+        Args:
+            source (str): The path of the markdown source.
+            stat (tuple): The key checked against the source, such as its mtime and size.
+            source_hash (str): The hash of the source contents.
+            body (bytes): The rendered page.
+        """
+
+        if len(body) > self.max_size:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(source, None)
+
+            if previous is not None:
+                self.size -= len(previous[2])
+
+            self._entries[source] = (stat, source_hash, body)
+            self.size += len(body)
+
+            while self.size > self.max_size:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        """
+        Drops every cached page.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class PageRenderer:
+    """
+    PageRenderer maps request paths back to their markdown sources and renders
+    them on demand, so a page can be served without building the whole site.
+
+    Attributes:
+        content (str): The directory containing markdown files.
+        static (str): The directory containing static files.
+        template_path (str): The path to the HTML template file.
+        pages (PageCache): The cache of rendered pages.
+        cache (FragmentCache): The on-disk cache of parsed sources, or None.
+    """
+
+    def __init__(
+        self,
+        content=CONTENT_DIR,
+        static=STATIC_DIR,
+        template_path=TEMPLATE_PATH,
+        pages=None,
+        cache=None,
+    ):
+        """
+        Initializes a PageRenderer.
+
+        Args:
+            content (str, optional): The directory containing markdown files. Defaults to content.
+            static (str, optional): The directory containing static files. Defaults to static.
+            template_path (str, optional): The path to the HTML template file. Defaults to template.html.
+            pages (PageCache, optional): The cache of rendered pages. Defaults to a new PageCache.
+            cache (FragmentCache, optional): The on-disk cache of parsed sources. Defaults to None.
+        """
+
+        self.content = content
+        self.static = static
+        self.template_path = template_path
+        self.pages = pages if pages is not None else PageCache()
+        self.cache = cache
+        self._template = None
+        self._template_stat = None
+        self._template_lock = threading.Lock()
+
+    def source_path(self, url_path):
+        """
+        Maps a request path to the markdown source of its page, following the
+        layout of a build: /blog/post.html comes from content/blog/post.md, and
+        a directory is served by its index page. Extensionless paths are
+        accepted as well.
+
+        Args:
+            url_path (str): The path of the request, without its query string.
+
+        Returns:
+            str: The path of the markdown source, or None if no source matches.
+        """
+
+        relative = self._relative_path(url_path)
+
+        if relative is None:
+            return None
+
+        if relative == "" or url_path.endswith("/"):
+            candidates = [posixpath.join(relative, "index.md")]
+        elif relative.endswith(".html"):
+            candidates = [relative[: -len(".html")] + ".md"]
+        elif posixpath.splitext(relative)[1] == "":
+            candidates = [relative + ".md", posixpath.join(relative, "index.md")]
+        else:
+            return None
+
+        for candidate in candidates:
+            path = os.path.join(self.content, *candidate.split("/"))
+
+            if os.path.isfile(path):
+                return path
+
+        return None
+
+    def static_path(self, url_path):
+        """
+        Maps a request path to a file of the static directory.
+
+        Args:
+            url_path (str): The path of the request, without its query string.
+
+        Returns:
+            str: The path of the static file, or None if it does not exist.
+        """
+
+        relative = self._relative_path(url_path)
+
+        if not relative:
+            return None
+
+        path = os.path.join(self.static, *relative.split("/"))
+        return path if os.path.isfile(path) else None
+
+    def _relative_path(self, url_path):
+        """
+        Normalizes a request path, rejecting any path escaping the site root.
+
+        Args:
+            url_path (str): The path of the request.
+
+        Returns:
+            str: The path relative to the site root, or None if it escapes it.
+        """
+
+        path = posixpath.normpath(urllib.parse.unquote(url_path)).lstrip("/")
+
+        if path == ".":
+            return ""
+
+        if path == ".." or path.startswith("../") or "\\" in path:
+            return None
+
+        return path
+
+    def template(self):
+        """
+        Returns the compiled template, compiling it again and dropping every
+        rendered page when the template file changed.
+
+        Returns:
+            tuple: The compiled template and the (mtime in nanoseconds, size) of its file.
+        """
+
+        stat = os.stat(self.template_path)
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._template_lock:
+            if key != self._template_stat:
+                self._template = Template.from_file(self.template_path)
+                self._template_stat = key
+                self.pages.clear()
+
+            return self._template, key
+
+    def render(self, source):
+        """
+        Renders the page of a markdown source, from the page cache when the source
+        is unchanged. A source whose mtime changed but whose contents did not keeps
+        its cached page.
+
+        Args:
+            source (str): The path of the markdown source.
+
+        Returns:
+            bytes: The rendered page.
+        """
+
+        template, template_stat = self.template()
+        stat = os.stat(source)
+        # Pages rendered concurrently with a template change may be stored
+        # after the cache was cleared, so entries also carry the template stat.
+        key = (stat.st_mtime_ns, stat.st_size, template_stat)
+        entry = self.pages.get(source)
+
+        if entry is not None and entry[0] == key:
+            return entry[2]
+
+        markdown = read_file(source)
+        source_hash = hash_text(markdown)
+
+        if (
+            entry is not None
+            and entry[0][2] == template_stat
+            and entry[1] == source_hash
+        ):
+            body = entry[2]
+        else:
+            values = render_page(source, markdown, source_hash, cache=self.cache)
+            body = template.render(values).encode("utf-8")
+
+        self.pages.put(source, key, source_hash, body)
+        return body
+
+
+class RenderingRequestHandler(SimpleHTTPRequestHandler):
+    """
+    RenderingRequestHandler serves the pages rendered by a PageRenderer, and the
+    files of the static directory for every other path.
+
+    Attributes:
+        renderer (PageRenderer): The renderer of the pages.
+    """
+
+    def __init__(self, *args, renderer, **kwargs):
+        """
+        Initializes a RenderingRequestHandler serving the static directory.
+
+        Args:
+            renderer (PageRenderer): The renderer of the pages.
+        """
+
+        self.renderer = renderer
+        super().__init__(*args, directory=renderer.static, **kwargs)
+
+    def do_GET(self):
+        """
+        Serves a rendered page, or falls back to the static files.
+        """
+
+        if not self._send_page(head=False):
+            super().do_GET()
+
+    def do_HEAD(self):
+        """
+        Serves the headers of a rendered page, or falls back to the static files.
+        """
+
+        if not self._send_page(head=True):
+            super().do_HEAD()
+
+    def _send_page(self, head):
+        """
+        Renders and sends the page of the requested path, if it has a source.
+
+        Args:
+            head (bool): Send the headers only.
+
+        Returns:
+            bool: True if a page was sent.
+        """
+
+        url_path = urllib.parse.urlsplit(self.path).path
+
+        if self.renderer.static_path(url_path) is not None:
+            return False
+
+        source = self.renderer.source_path(url_path)
+
+        if source is None:
+            return False
+
+        try:
+            body = self.renderer.render(source)
+        except (OSError, ValueError) as e:
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{source}: {e}")
+            return True
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if not head:
+            self.wfile.write(body)
+
+        return True
+
+
+def start_rendering_server(renderer, port):
+    """
+    Serves pages rendered on demand from a background thread.
+
+    Args:
+        renderer (PageRenderer): The renderer of the pages.
+        port (int): The port to listen on.
+
+    Returns:
+        ThreadingHTTPServer: The running server.
+    """
+
+    handler = functools.partial(RenderingRequestHandler, renderer=renderer)
+    server = ThreadingHTTPServer(("", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def serve_on_demand(args):
+    """
+    Serves the site without building it: each page is rendered from its source
+    on its first request and kept in memory until its source or the template
+    changes, so the first page is served at once whatever the size of the site.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+    """
+
+    renderer = PageRenderer(
+        pages=PageCache(args.page_cache_size * 1024 * 1024),
+        cache=open_cache(args),
+    )
+    server = start_rendering_server(renderer, args.port)
+    print(f"Rendering {CONTENT_DIR} on demand on http://localhost:{args.port}")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
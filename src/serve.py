@@ -0,0 +1,466 @@
+import functools
+import logging
+import os
+import threading
+from http.server import ThreadingHTTPServer
+
+from main import (
+    BuildError,
+    CONTENT_DIR,
+    OUTPUTS_PATH,
+    PUBLIC_DIR,
+    STATIC_DIR,
+    TEMPLATE_PATH,
+    build,
+    open_cache,
+    collect_pages,
+    generate_page,
+    generate_pages,
+    stream_threshold_bytes,
+)
+from compress import update_compressed
+from livereload import LiveReload
+from manifest import OutputManifest, hash_file
+from static_server import OutputIndex, StaticRequestHandler
+from sync import is_unchanged, prune_files, transfer_file
+from template import Template
+from watch import create_watcher, watch
+
+
+class IncrementalBuildError(BuildError):
+    """
+    IncrementalBuildError is raised once a whole batch of changes was applied,
+    when some of its paths failed. The other paths of the batch were applied,
+    and the failed ones are retried with the next batch.
+
+    Attributes:
+        errors (list): The error of each failed path.
+        outputs (list): The output paths that were written or removed anyway.
+    """
+
+    def __init__(self, errors, outputs):
+        """
+        Initializes an IncrementalBuildError.
+
+        Args:
+            errors (list): The error of each failed path.
+            outputs (list): The output paths that were written or removed anyway.
+        """
+
+        super().__init__("\n".join(str(error) for error in errors))
+        self.errors = errors
+        self.outputs = outputs
+
+
+class IncrementalBuilder:
+    """
+    IncrementalBuilder applies batches of changed source paths to an already
+    built site, regenerating only the affected pages and assets.
+
+    Attributes:
+        manifest (BuildManifest): The manifest of the current build.
+        content (str): The directory containing markdown files.
+        static (str): The directory containing static files.
+        template_path (str): The path to the HTML template file.
+        public (str): The directory of the generated site.
+        checksum (bool): Compare static files by content hash instead of size and mtime.
+        link_mode (str): How static files are transferred: copy, hardlink or reflink.
+        cache (FragmentCache): The cache of parsed sources, or None.
+        output_manifest (OutputManifest): Records the digest of every output file, or None.
+        jobs (int): The number of worker processes used when every page is regenerated.
+        stream_threshold (int): The size in bytes from which sources are streamed, or None.
+        compress (dict): The min_size and level of --precompress, or None when the
+            outputs are not precompressed.
+        failed (set): The source paths that failed and are retried with the next batch.
+    """
+
+    def __init__(
+        self,
+        manifest,
+        content=CONTENT_DIR,
+        static=STATIC_DIR,
+        template_path=TEMPLATE_PATH,
+        public=PUBLIC_DIR,
+        checksum=False,
+        link_mode="copy",
+        cache=None,
+        output_manifest=None,
+        jobs=1,
+        stream_threshold=None,
+        compress=None,
+    ):
+        """
+        Initializes an IncrementalBuilder and compiles the template.
+
+        Args:
+            manifest (BuildManifest): The manifest of the current build.
+            content (str, optional): The directory containing markdown files. Defaults to content.
+            static (str, optional): The directory containing static files. Defaults to static.
+            template_path (str, optional): The path to the HTML template file. Defaults to template.html.
+            public (str, optional): The directory of the generated site. Defaults to public.
+            checksum (bool, optional): Compare static files by content hash. Defaults to False.
+            link_mode (str, optional): How static files are transferred. Defaults to copy.
+            cache (FragmentCache, optional): The cache of parsed sources. Defaults to None.
+            output_manifest (OutputManifest, optional): Records the digest of every
+                output file, and is saved with each batch. Defaults to None.
+            jobs (int, optional): The number of worker processes used when every page
+                is regenerated. Defaults to 1.
+            stream_threshold (int, optional): The size in bytes from which sources are
+                streamed. Defaults to None, which never streams.
+            compress (dict, optional): The min_size and level keyword arguments of
+                update_compressed, which keeps the compressed siblings of the touched
+                outputs up to date. Requires output_manifest. Defaults to None.
+        """
+
+        self.manifest = manifest
+        self.content = os.path.normpath(content)
+        self.static = os.path.normpath(static)
+        self.template_path = os.path.normpath(template_path)
+        self.public = public
+        self.checksum = checksum
+        self.link_mode = link_mode
+        self.cache = cache
+        self.output_manifest = output_manifest
+        self.jobs = jobs
+        self.stream_threshold = stream_threshold
+        self.compress = compress
+        self.failed = set()
+        self.template = Template.from_file(template_path)
+
+    @classmethod
+    def from_args(cls, manifest, args, cache=None):
+        """
+        Creates an IncrementalBuilder applying the options of the command line,
+        which records the outputs in the output manifest of the build.
+
+        Args:
+            manifest (BuildManifest): The manifest of the current build.
+            args (argparse.Namespace): The parsed command line arguments.
+            cache (FragmentCache or MemoryCache, optional): The cache of parsed
+                sources. Defaults to the one requested on the command line.
+
+        Returns:
+            IncrementalBuilder: The builder.
+        """
+
+        compress = None
+
+        if cache is None:
+            cache = open_cache(args)
+
+        if args.precompress:
+            compress = {
+                "min_size": args.compress_min_size,
+                "level": args.compress_level,
+            }
+
+        return cls(
+            manifest,
+            checksum=args.checksum,
+            link_mode=args.link,
+            cache=cache,
+            output_manifest=OutputManifest.load(OUTPUTS_PATH),
+            jobs=args.jobs,
+            stream_threshold=stream_threshold_bytes(args),
+            compress=compress,
+        )
+
+    def _target(self, path, root):
+        """
+        Maps a path under a source directory to the matching path under the output.
+
+        Args:
+            path (str): The source path.
+            root (str): The source directory the path belongs to.
+
+        Returns:
+            str: The matching path under the output directory.
+        """
+
+        relative = os.path.relpath(path, root)
+        return os.path.normpath(os.path.join(self.public, relative))
+
+    def _is_under(self, path, root):
+        """
+        Checks whether a path is inside a directory.
+
+        Args:
+            path (str): The path to check.
+            root (str): The directory.
+
+        Returns:
+            bool: True if the path is inside the directory.
+        """
+
+        return path == root or path.startswith(root + os.sep)
+
+    def rebuild_pages(self):
+        """
+        Regenerates every page, used when the template changes.
+
+        Returns:
+            list: The paths of the HTML files that were written.
+        """
+
+        template_hash = hash_file(self.template_path)
+        self.template = Template.from_file(self.template_path)
+        self.manifest.use_template(template_hash)
+
+        outputs = generate_pages(
+            collect_pages(self.content, self.public),
+            self.template_path,
+            self.manifest,
+            jobs=self.jobs,
+            cache=self.cache,
+            stream_threshold=self.stream_threshold,
+            output_manifest=self.output_manifest,
+        )
+
+        # Every page now uses the new template, so later single-page updates
+        # must not be treated as template changes again.
+        self.manifest.use_template(template_hash)
+        return outputs
+
+    def apply(self, changed):
+        """
+        Regenerates the pages and assets affected by a batch of changed paths,
+        along with the paths that failed in the previous batch. A failing path
+        does not stop the batch: every other path is applied and the manifest
+        saved before the errors are raised together.
+
+        Args:
+            changed (iterable): The source paths that were created, modified or removed.
+
+        Returns:
+            list: The output paths that were written or removed.
+
+        Raises:
+            IncrementalBuildError: If some paths failed.
+        """
+
+        changed = {os.path.normpath(path) for path in changed} | self.failed
+        changed = sorted(changed)
+        self.failed = set()
+
+        if self.output_manifest is not None:
+            # The changed and removed files are reported per batch.
+            self.output_manifest.changed = set()
+            self.output_manifest.removed = set()
+        outputs = []
+        errors = []
+        rebuilt = self.template_path in changed or self.content in changed
+
+        if rebuilt:
+            try:
+                outputs.extend(self.rebuild_pages())
+            except (BuildError, OSError, ValueError) as e:
+                self.failed.add(self.template_path)
+                errors.append(e)
+                rebuilt = False
+
+        if self.static in changed:
+            changed = [path for path in changed if path != self.static]
+            for root, _, files in os.walk(self.static):
+                changed.extend(os.path.join(root, file) for file in files)
+
+        for path in changed:
+            try:
+                if self._is_under(path, self.content) and path.endswith(".md"):
+                    if rebuilt and os.path.isfile(path):
+                        continue
+
+                    outputs.extend(self._apply_page(path))
+                elif self._is_under(path, self.static):
+                    outputs.extend(self._apply_asset(path))
+            except (BuildError, OSError) as e:
+                self.failed.add(path)
+                errors.append(e)
+
+        if self.compress is not None and self.output_manifest is not None:
+            try:
+                update_compressed(self.output_manifest, outputs, **self.compress)
+            except OSError as e:
+                errors.append(e)
+
+        self.manifest.save()
+
+        if self.output_manifest is not None:
+            self.output_manifest.save()
+
+        if errors:
+            raise IncrementalBuildError(errors, outputs)
+
+        return outputs
+
+    def _apply_page(self, path):
+        """
+        Regenerates or removes the page of a single markdown file.
+
+        Args:
+            path (str): The path of the markdown file.
+
+        Returns:
+            list: The output paths that were written or removed.
+        """
+
+        if not os.path.isfile(path):
+            removed = self.manifest.remove(path)
+
+            if removed is None:
+                return []
+
+            prune_files([removed], self.public)
+            self._forget([removed])
+            return [removed]
+
+        to_path = os.path.dirname(self._target(path, self.content))
+
+        try:
+            output = generate_page(
+                path,
+                self.template_path,
+                to_path,
+                self.manifest,
+                self.template,
+                cache=self.cache,
+                stream_threshold=self.stream_threshold,
+                output_manifest=self.output_manifest,
+            )
+        except Exception as e:
+            raise BuildError(f"Failed to generate page from {path}: {e!r}") from e
+
+        return [output] if output else []
+
+    def _apply_asset(self, path):
+        """
+        Copies or prunes a single static file.
+
+        Args:
+            path (str): The path of the static file.
+
+        Returns:
+            list: The output paths that were written or removed.
+        """
+
+        target_path = self._target(path, self.static)
+
+        if not os.path.isfile(path):
+            self.manifest.assets = [
+                asset for asset in self.manifest.assets if asset != target_path
+            ]
+            removed = prune_files([target_path], self.public)
+            self._forget(removed)
+            return removed
+
+        if is_unchanged(path, target_path, self.checksum):
+            return []
+
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        transfer_file(path, target_path, self.link_mode)
+
+        if self.output_manifest is not None:
+            size = os.path.getsize(target_path)
+            self.output_manifest.record(target_path, hash_file(target_path), size)
+
+        if target_path not in self.manifest.assets:
+            self.manifest.assets = sorted(self.manifest.assets + [target_path])
+
+        return [target_path]
+
+    def _forget(self, outputs):
+        """
+        Removes output files that were deleted from the output manifest.
+
+        Args:
+            outputs (list): The paths of the deleted output files.
+        """
+
+        if self.output_manifest is not None:
+            for output in outputs:
+                self.output_manifest.forget(output)
+
+
+def start_server(directory, port, outputs_path=OUTPUTS_PATH, live_reload=None):
+    """
+    Serves a directory over HTTP from a background thread, with validators
+    taken from the output manifest of the build.
+
+    Args:
+        directory (str): The directory to serve.
+        port (int): The port to listen on.
+        outputs_path (str, optional): The path of the output manifest. Defaults to .sitegenie/outputs.json.
+        live_reload (LiveReload, optional): The live reload channel. Defaults to None.
+
+    Returns:
+        ThreadingHTTPServer: The running server.
+    """
+
+    handler = functools.partial(
+        StaticRequestHandler,
+        directory=directory,
+        index=OutputIndex(outputs_path),
+        live_reload=live_reload,
+    )
+    server = ThreadingHTTPServer(("", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def serve(args):
+    """
+    Builds the site, serves it and, with --watch, keeps rebuilding the affected
+    pages and assets in-process whenever the sources change and tells the open
+    pages which outputs changed, so they reload when affected. With --on-demand,
+    pages are rendered when requested instead.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+    """
+
+    if args.on_demand:
+        from render_server import serve_on_demand
+
+        serve_on_demand(args)
+        return
+
+    manifest = build(args)
+    live_reload = LiveReload(PUBLIC_DIR) if args.watch else None
+    server = start_server(PUBLIC_DIR, args.port, live_reload=live_reload)
+    print(f"Serving {PUBLIC_DIR} on http://localhost:{args.port}")
+
+    if not args.watch:
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.shutdown()
+        return
+
+    builder = IncrementalBuilder.from_args(manifest, args)
+    watcher = create_watcher([CONTENT_DIR, STATIC_DIR, TEMPLATE_PATH])
+
+    def on_change(changed):
+        try:
+            outputs = builder.apply(changed)
+        except IncrementalBuildError as e:
+            logging.error("%s", e)
+            outputs = e.outputs
+        except (BuildError, OSError) as e:
+            logging.error("%s", e)
+            return
+
+        for output in outputs:
+            print(f"Updated {output}")
+
+        live_reload.publish(outputs)
+
+    try:
+        watch(watcher, on_change)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        live_reload.close()
+        server.shutdown()
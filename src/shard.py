@@ -0,0 +1,161 @@
+import os
+import re
+
+from main import (
+    BuildError,
+    MANIFEST_PATH,
+    OUTPUTS_PATH,
+    PUBLIC_DIR,
+    SHARDS_DIR,
+    shard_directory,
+)
+from manifest import BuildManifest, OutputManifest
+from sync import prune_files, transfer_file
+
+shard_name_pattern = re.compile(r"(\d+)-of-(\d+)")
+
+
+def find_shards(directory=SHARDS_DIR):
+    """
+    Lists the directories of the shards of a sharded build, checking that every
+    shard is present and complete.
+
+    Args:
+        directory (str, optional): The directory holding the shards. Defaults to .sitegenie/shards.
+
+    Returns:
+        list: The directories of the shards, in order.
+
+    Raises:
+        BuildError: If no shards are found, if shards of builds with different
+            shard counts are mixed, or if a shard is missing.
+    """
+
+    builds = {}
+
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            match = shard_name_pattern.fullmatch(name)
+
+            if match is not None:
+                index, count = int(match[1]), int(match[2])
+                builds.setdefault(count, set()).add(index)
+
+    if not builds:
+        raise BuildError(f"No shards found in {directory}")
+
+    if len(builds) > 1:
+        counts = ", ".join(str(count) for count in sorted(builds))
+        raise BuildError(
+            f"Shards of builds split {counts} ways found in {directory}, remove the"
+            " stale ones"
+        )
+
+    count, indexes = builds.popitem()
+    shards = [shard_directory(index, count, directory) for index in range(1, count + 1)]
+    missing = [
+        shard
+        for index, shard in enumerate(shards, 1)
+        if index not in indexes
+        or not os.path.isfile(os.path.join(shard, "outputs.json"))
+    ]
+
+    if missing:
+        raise BuildError(f"Missing or unfinished shards: {', '.join(missing)}")
+
+    return shards
+
+
+def merge_shards(
+    shards,
+    public=PUBLIC_DIR,
+    manifest_path=MANIFEST_PATH,
+    outputs_path=OUTPUTS_PATH,
+    link_mode="copy",
+):
+    """
+    Combines the outputs and manifests of the shards of a build into a single
+    site, as if it had been built in one go. Files whose recorded digest did not
+    change since the previous merge are not transferred again, and files no
+    shard produces anymore are removed.
+
+    Args:
+        shards (list): The directories of the shards.
+        public (str, optional): The directory of the combined site. Defaults to public.
+        manifest_path (str, optional): The path of the combined build manifest. Defaults to .sitegenie/manifest.json.
+        outputs_path (str, optional): The path of the combined output manifest. Defaults to .sitegenie/outputs.json.
+        link_mode (str, optional): How files are transferred: copy, hardlink or reflink. Defaults to copy.
+
+    Returns:
+        OutputManifest: The combined output manifest, already saved to disk.
+
+    Raises:
+        BuildError: If the shards used different templates or produced different
+            contents for the same file.
+    """
+
+    manifest = BuildManifest(manifest_path)
+    output_manifest = OutputManifest.load(outputs_path)
+    files = {}
+
+    for shard in shards:
+        shard_public = os.path.join(shard, PUBLIC_DIR)
+        shard_manifest = BuildManifest.load(os.path.join(shard, "manifest.json"))
+        shard_outputs = OutputManifest.load(os.path.join(shard, "outputs.json"))
+
+        def target(path):
+            return os.path.join(public, os.path.relpath(path, shard_public))
+
+        if manifest.template_hash is None:
+            manifest.template_hash = shard_manifest.template_hash
+        elif manifest.template_hash != shard_manifest.template_hash:
+            raise BuildError(f"{shard} was built with a different template")
+
+        for source, entry in shard_manifest.pages.items():
+            manifest.pages[source] = {
+                "hash": entry["hash"],
+                "output": target(entry["output"]),
+            }
+
+        manifest.assets.extend(target(asset) for asset in shard_manifest.assets)
+
+        for path, entry in shard_outputs.files.items():
+            output = target(path)
+            previous = files.get(output)
+
+            if previous is not None and previous[1]["digest"] != entry["digest"]:
+                raise BuildError(f"Shards produced different contents for {output}")
+
+            files[output] = (path, entry)
+
+    for output, (path, entry) in sorted(files.items()):
+        if output_manifest.digest(output) == entry["digest"] and os.path.isfile(output):
+            continue
+
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        transfer_file(path, output, link_mode)
+        output_manifest.record(
+            output, entry["digest"], entry["size"], source=entry.get("source")
+        )
+
+    prune_files(output_manifest.retain(files), public)
+    manifest.assets = sorted(set(manifest.assets))
+    manifest.save()
+    output_manifest.save()
+    return output_manifest
+
+
+def merge(args):
+    """
+    Combines every shard of the last sharded build into the output directory.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+    """
+
+    shards = find_shards()
+    output_manifest = merge_shards(shards, link_mode=args.link)
+    print(
+        f"Merged {len(shards)} shards: {len(output_manifest.changed)} output files"
+        f" changed, {len(output_manifest.removed)} removed"
+    )
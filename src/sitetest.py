@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+
+class SiteTestCase(unittest.TestCase):
+    """
+    SiteTestCase runs each test against a site in its own temporary directory,
+    removed once the test ends.
+
+    Attributes:
+        root (str): The temporary directory of the site.
+        content (str): The directory of the markdown sources.
+        static (str): The directory of the static files.
+        public (str): The output directory.
+        template (str): The path of the template.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "public")
+        self.template = os.path.join(self.root, "template.html")
+
+    def write(self, path, text):
+        """
+        Writes a text file, creating its directory when needed.
+
+        Args:
+            path (str): The path of the file.
+            text (str): The contents of the file.
+        """
+
+        directory = os.path.dirname(path)
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(path, "w") as file:
+            file.write(text)
+
+    def read(self, path):
+        """
+        Reads a text file.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            str: The contents of the file.
+        """
+
+        with open(path) as file:
+            return file.read()
+
+    def read_tree(self, directory):
+        """
+        Reads every file under a directory.
+
+        Args:
+            directory (str): The directory to read.
+
+        Returns:
+            dict: Maps the path of each file, relative to the directory, to its bytes.
+        """
+
+        files = {}
+
+        for root, _, names in os.walk(directory):
+            for name in names:
+                path = os.path.join(root, name)
+
+                with open(path, "rb") as file:
+                    files[os.path.relpath(path, directory)] = file.read()
+
+        return files
+
+    def write_site(self, pages, assets=None, template=TEMPLATE):
+        """
+        Writes the sources of the site.
+
+        Args:
+            pages (dict): Maps the paths of the markdown sources, relative to
+                content, to their text.
+            assets (dict, optional): Maps the paths of the static files, relative
+                to static, to their text. Defaults to no static directory.
+            template (str, optional): The template. Defaults to TEMPLATE.
+        """
+
+        os.makedirs(self.content, exist_ok=True)
+
+        for path, text in pages.items():
+            self.write(os.path.join(self.content, path), text)
+
+        if assets is not None:
+            os.makedirs(self.static, exist_ok=True)
+
+            for path, text in assets.items():
+                self.write(os.path.join(self.static, path), text)
+
+        self.write(self.template, template)
@@ -0,0 +1,425 @@
+import email.utils
+import io
+import os
+import queue
+import threading
+import urllib.parse
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler
+
+from livereload import EVENTS_PATH, KEEPALIVE_INTERVAL, format_event, inject_client
+from manifest import OutputManifest
+
+# Compressed siblings written by --precompress, in order of preference.
+ENCODINGS = (("br", ".br"), ("zstd", ".zst"), ("gzip", ".gz"))
+
+# Files from this size are sent with sendfile instead of being copied through Python.
+SENDFILE_THRESHOLD = 64 * 1024
+
+
+class OutputIndex:
+    """
+    OutputIndex provides strong validators for the files of the output from the
+    digests recorded by the last build. A file modified after the output
+    manifest was written, such as one updated by --watch, is not trusted and
+    gets a weak validator from its mtime and size instead.
+
+    Attributes:
+        path (str): The path of the output manifest file.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes an OutputIndex. The manifest is loaded on first use and
+        loaded again whenever a build rewrites it.
+
+        Args:
+            path (str): The path of the output manifest file.
+        """
+
+        self.path = path
+        self._files = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """
+        Loads the output manifest again if it changed on disk.
+
+        Returns:
+            tuple: The recorded files, keyed by normalized path, and the mtime
+                in nanoseconds of the manifest, or None if it is missing.
+        """
+
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        with self._lock:
+            if mtime != self._mtime:
+                manifest = OutputManifest.load(self.path)
+                self._files = {
+                    os.path.normpath(path): entry
+                    for path, entry in manifest.files.items()
+                }
+                self._mtime = mtime
+
+            return self._files, self._mtime
+
+    def etag(self, path, stat):
+        """
+        Computes the entity tag of an output file.
+
+        Args:
+            path (str): The path of the file.
+            stat (os.stat_result): The status of the file.
+
+        Returns:
+            str: The strong entity tag from the recorded digest, or a weak one from
+                the mtime and size when the file is unknown or changed since.
+        """
+
+        files, mtime = self._load()
+        entry = files.get(os.path.normpath(path))
+
+        if (
+            entry is not None
+            and mtime is not None
+            and stat.st_mtime_ns <= mtime
+            and stat.st_size == entry["size"]
+        ):
+            return f'"{entry["digest"]}"'
+
+        return f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+class StaticRequestHandler(SimpleHTTPRequestHandler):
+    """
+    StaticRequestHandler serves the output of a build over persistent HTTP/1.1
+    connections. Responses carry entity tags and modification dates, so clients
+    revalidate with conditional requests and get 304 responses for unchanged
+    files. Compressed siblings are sent to clients accepting their encoding, and
+    large files are sent with sendfile. With live reload, pages get its client
+    script and the server streams the changed paths to them.
+
+    Attributes:
+        index (OutputIndex): The validators of the output files, or None.
+        live_reload (LiveReload): The live reload channel, or None.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, *args, index=None, live_reload=None, **kwargs):
+        """
+        Initializes a StaticRequestHandler.
+
+        Args:
+            index (OutputIndex, optional): The validators of the output files.
+                Defaults to weak validators only.
+            live_reload (LiveReload, optional): The live reload channel, which
+                also injects its client into pages. Defaults to None.
+        """
+
+        self.index = index
+        self.live_reload = live_reload
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        """
+        Serves the live reload event stream, or a file.
+        """
+
+        if self.live_reload is not None and self._is_events_request():
+            self._send_events()
+            return
+
+        super().do_GET()
+
+    def send_head(self):
+        """
+        Sends the headers of a file, or a 304 response when the client already
+        has it. Directories and missing files are handled as by the base class.
+
+        Returns:
+            file: The open file to send as the body, or None.
+        """
+
+        path = self.translate_path(self.path)
+
+        if os.path.isdir(path):
+            if not urllib.parse.urlsplit(self.path).path.endswith("/"):
+                return super().send_head()
+
+            for index in ("index.html", "index.htm"):
+                if os.path.isfile(os.path.join(path, index)):
+                    path = os.path.join(path, index)
+                    break
+            else:
+                return super().send_head()
+
+        if path.endswith("/") or not os.path.isfile(path):
+            return super().send_head()
+
+        content_type = self.guess_type(path)
+        live = self.live_reload is not None and content_type == "text/html"
+
+        # Pages get the live reload client, so they are sent uncompressed.
+        if live:
+            file_path, encoding, variants = path, None, False
+        else:
+            file_path, encoding, variants = self._select_variant(path)
+
+        try:
+            file = open(file_path, "rb")
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        try:
+            stat = os.fstat(file.fileno())
+            etag = self._etag(file_path, stat)
+            last_modified = self.date_time_string(int(stat.st_mtime))
+            length = stat.st_size
+
+            if live:
+                etag = etag[:-1] + '-livereload"'
+
+            if self._is_not_modified(etag, stat):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self._send_validators(etag, last_modified, variants)
+                self.end_headers()
+                file.close()
+                return None
+
+            if live:
+                with file:
+                    body = inject_client(file.read())
+
+                file = io.BytesIO(body)
+                length = len(body)
+
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(length))
+
+            if encoding is not None:
+                self.send_header("Content-Encoding", encoding)
+
+            self._send_validators(etag, last_modified, variants)
+            self.end_headers()
+            return file
+        except BaseException:
+            file.close()
+            raise
+
+    def _is_events_request(self):
+        """
+        Checks whether the request is for the live reload event stream.
+
+        Returns:
+            bool: True for the event stream.
+        """
+
+        return urllib.parse.urlsplit(self.path).path == EVENTS_PATH
+
+    def _send_events(self):
+        """
+        Streams the changed paths pushed by the live reload channel as
+        Server-Sent Events until the client disconnects or the server stops.
+        """
+
+        events = self.live_reload.subscribe()
+        self.close_connection = True
+
+        try:
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(b"retry: 1000\n\n")
+
+            while True:
+                try:
+                    paths = events.get(timeout=KEEPALIVE_INTERVAL)
+                except queue.Empty:
+                    self.wfile.write(b": keep-alive\n\n")
+                    continue
+
+                if paths is None:
+                    break
+
+                self.wfile.write(format_event(paths))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.live_reload.unsubscribe(events)
+
+    def _select_variant(self, path):
+        """
+        Picks the compressed sibling of a file preferred by the client, ignoring
+        siblings older than the file itself.
+
+        Args:
+            path (str): The path of the requested file.
+
+        Returns:
+            tuple: The path of the file to send, its content encoding or None, and
+                whether the file has compressed siblings.
+        """
+
+        accepted = accepted_encodings(self.headers.get("Accept-Encoding", ""))
+        mtime = os.stat(path).st_mtime_ns
+        variants = False
+
+        for encoding, extension in ENCODINGS:
+            try:
+                sibling = os.stat(path + extension)
+            except FileNotFoundError:
+                continue
+
+            if sibling.st_mtime_ns < mtime:
+                continue
+
+            variants = True
+
+            if encoding in accepted or "*" in accepted:
+                return path + extension, encoding, True
+
+        return path, None, variants
+
+    def _etag(self, path, stat):
+        """
+        Computes the entity tag of a file.
+
+        Args:
+            path (str): The path of the file.
+            stat (os.stat_result): The status of the file.
+
+        Returns:
+            str: The entity tag.
+        """
+
+        if self.index is not None:
+            return self.index.etag(path, stat)
+
+        return f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+    def _is_not_modified(self, etag, stat):
+        """
+        Evaluates the conditional headers of the request. If-Modified-Since is
+        only considered without If-None-Match.
+
+        Args:
+            etag (str): The entity tag of the file.
+            stat (os.stat_result): The status of the file.
+
+        Returns:
+            bool: True if the client copy is current.
+        """
+
+        if_none_match = self.headers.get("If-None-Match")
+
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or _opaque_tag(etag) in map(_opaque_tag, tags)
+
+        if_modified_since = self.headers.get("If-Modified-Since")
+
+        if if_modified_since is None:
+            return False
+
+        try:
+            since = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+
+        return since.timestamp() >= int(stat.st_mtime)
+
+    def _send_validators(self, etag, last_modified, variants):
+        """
+        Sends the caching headers shared by full and 304 responses.
+
+        Args:
+            etag (str): The entity tag of the file.
+            last_modified (str): The formatted modification date of the file.
+            variants (bool): Whether the file has compressed siblings.
+        """
+
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.send_header("Cache-Control", "no-cache")
+
+        if variants:
+            self.send_header("Vary", "Accept-Encoding")
+
+    def copyfile(self, source, outputfile):
+        """
+        Sends a file to the client, with sendfile for large files so their bytes
+        do not go through Python.
+
+        Args:
+            source (file): The open file.
+            outputfile (file): The stream of the connection.
+        """
+
+        try:
+            size = os.fstat(source.fileno()).st_size
+        except OSError:
+            # In-memory bodies, such as pages with the live reload client.
+            size = 0
+
+        if size < SENDFILE_THRESHOLD:
+            super().copyfile(source, outputfile)
+            return
+
+        outputfile.flush()
+        self.connection.sendfile(source)
+
+
+def accepted_encodings(header):
+    """
+    Parses an Accept-Encoding header.
+
+    Args:
+        header (str): The value of the header.
+
+    Returns:
+        set: The content codings accepted by the client, without those with q=0.
+    """
+
+    accepted = set()
+
+    for item in header.split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+
+        for param in params:
+            name, _, value = param.partition("=")
+
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        if coding and quality > 0:
+            accepted.add(coding)
+
+    return accepted
+
+
+def _opaque_tag(tag):
+    """
+    Strips the weakness indicator of an entity tag, for weak comparison.
+
+    Args:
+        tag (str): The entity tag.
+
+    Returns:
+        str: The opaque part of the tag.
+    """
+
+    return tag[2:] if tag.startswith("W/") else tag
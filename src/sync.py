@@ -0,0 +1,214 @@
+import os
+import shutil
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from manifest import hash_file
+from plan import scan_files
+
+link_mode_copy = "copy"
+link_mode_hardlink = "hardlink"
+link_mode_reflink = "reflink"
+
+link_modes = (link_mode_copy, link_mode_hardlink, link_mode_reflink)
+
+# ioctl request that clones a file's extents on copy-on-write filesystems
+# such as btrfs and XFS (see ioctl_ficlone(2)).
+FICLONE = 0x40049409
+
+
+def sync_files(
+    source, target, checksum=False, link_mode=link_mode_copy, files=None, stats=None
+):
+    """
+    Mirrors the files of the source directory into the target directory, only
+    transferring the files that changed since the last sync.
+
+    Args:
+        source (str): The source directory.
+        target (str): The target directory.
+        checksum (bool, optional): Compare contents by hash instead of size and mtime. Defaults to False.
+        link_mode (str, optional): How files are transferred: copy, hardlink or reflink. Defaults to copy.
+        files (list, optional): The (source path, target path) tuples of an already
+            scanned source, such as the assets of a BuildPlan. Defaults to scanning it.
+        stats (dict, optional): Maps source paths to their (mtime in nanoseconds, size)
+            tuple recorded by the scan, so they are not stat again. Defaults to None.
+
+    Returns:
+        tuple: The set of every target file path and the list of the target paths that were transferred.
+
+    Raises:
+        ValueError: If the link mode is unknown.
+    """
+
+    if link_mode not in link_modes:
+        raise ValueError(f"Invalid link mode: {link_mode}")
+
+    if files is None:
+        files = []
+
+        if os.path.isdir(source):
+            files = [(entry.path, path) for entry, path in scan_files(source, target)]
+
+    if stats is None:
+        stats = {}
+
+    synced = set()
+    transferred = []
+    directories = set()
+
+    if files or os.path.isdir(source):
+        os.makedirs(target, exist_ok=True)
+        directories.add(target)
+
+    for source_path, target_path in files:
+        directory = os.path.dirname(target_path)
+
+        if directory not in directories:
+            os.makedirs(directory, exist_ok=True)
+            directories.add(directory)
+
+        synced.add(target_path)
+
+        source_stat = stats.get(source_path)
+
+        if not is_unchanged(source_path, target_path, checksum, source_stat):
+            transfer_file(source_path, target_path, link_mode)
+            transferred.append(target_path)
+
+    return synced, transferred
+
+
+def is_unchanged(source_path, target_path, checksum=False, source_stat=None):
+    """
+    Checks whether a target file is already up to date with its source.
+
+    Args:
+        source_path (str): The path of the source file.
+        target_path (str): The path of the target file.
+        checksum (bool, optional): Compare contents by hash instead of mtime. Defaults to False.
+        source_stat (tuple, optional): The (mtime in nanoseconds, size) of the source
+            recorded by a BuildPlan. Defaults to reading the status of the source.
+
+    Returns:
+        bool: True if the target does not need to be transferred again.
+    """
+
+    try:
+        target_stat = os.stat(target_path)
+    except FileNotFoundError:
+        return False
+
+    if source_stat is None or checksum:
+        stat = os.stat(source_path)
+
+        # A hard link to the source is up to date without hashing it.
+        if (stat.st_dev, stat.st_ino) == (target_stat.st_dev, target_stat.st_ino):
+            return True
+
+        source_stat = (stat.st_mtime_ns, stat.st_size)
+
+    mtime, size = source_stat
+
+    if size != target_stat.st_size:
+        return False
+
+    if checksum:
+        return hash_file(source_path) == hash_file(target_path)
+
+    return mtime == target_stat.st_mtime_ns
+
+
+def transfer_file(source_path, target_path, link_mode=link_mode_copy):
+    """
+    Transfers a single file, falling back to a plain copy when linking is not possible.
+
+    Args:
+        source_path (str): The path of the source file.
+        target_path (str): The path of the target file.
+        link_mode (str, optional): How the file is transferred: copy, hardlink or reflink. Defaults to copy.
+    """
+
+    if os.path.lexists(target_path):
+        os.remove(target_path)
+
+    if link_mode == link_mode_hardlink:
+        try:
+            os.link(source_path, target_path)
+            return
+        except OSError:
+            pass
+
+    if link_mode == link_mode_reflink and _reflink(source_path, target_path):
+        return
+
+    shutil.copy2(source_path, target_path)
+
+
+def _reflink(source_path, target_path):
+    """
+    Clones a file with a copy-on-write reflink.
+
+    Args:
+        source_path (str): The path of the source file.
+        target_path (str): The path of the target file.
+
+    Returns:
+        bool: True if the clone succeeded, False if the filesystem does not support it.
+    """
+
+    if fcntl is None:
+        return False
+
+    with open(source_path, "rb") as src, open(target_path, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            cloned = False
+        else:
+            cloned = True
+
+    if not cloned:
+        os.remove(target_path)
+        return False
+
+    shutil.copystat(source_path, target_path)
+    return True
+
+
+def prune_files(paths, root):
+    """
+    Removes files that no longer have a source, along with the directories they leave empty.
+
+    Args:
+        paths (iterable): The paths of the files to remove.
+        root (str): The directory above which empty directories are kept.
+
+    Returns:
+        list: The paths that were removed.
+    """
+
+    removed = []
+    root = os.path.normpath(root)
+
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+
+        removed.append(path)
+        directory = os.path.dirname(path)
+
+        while directory and os.path.normpath(directory) != root:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+
+            directory = os.path.dirname(directory)
+
+    return removed
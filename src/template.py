@@ -0,0 +1,111 @@
+import re
+
+from io_utils import read_file
+
+placeholder_pattern = re.compile(r"{{\s*(\w+)\s*}}")
+
+
+class Template:
+    """
+    Template is an HTML template compiled once into literal segments and
+    placeholder slots such as {{ Title }} and {{ Content }}.
+
+    Attributes:
+        pieces (list): The literal segments and slots, in document order. Slots are
+            stored as (name, original text) tuples, literals as plain strings.
+        placeholders (set): The names of the placeholders used by the template.
+    """
+
+    def __init__(self, source):
+        """
+        Compiles a template string.
+
+        Args:
+            source (str): The template text.
+        """
+
+        self.pieces = []
+        self.placeholders = set()
+        pos = 0
+
+        for match in placeholder_pattern.finditer(source):
+            if pos < match.start():
+                self.pieces.append(source[pos : match.start()])
+
+            self.pieces.append((match.group(1), match.group()))
+            self.placeholders.add(match.group(1))
+            pos = match.end()
+
+        if pos < len(source):
+            self.pieces.append(source[pos:])
+
+    @classmethod
+    def from_file(cls, template_path):
+        """
+        Reads and compiles a template file.
+
+        Args:
+            template_path (str): The path to the HTML template file.
+
+        Returns:
+            Template: The compiled template.
+
+        Raises:
+            FileNotFoundError: If the template file does not exist.
+        """
+
+        source = read_file(template_path)
+
+        if source is None:
+            raise FileNotFoundError(template_path)
+
+        return cls(source)
+
+    def iter_render(self, values):
+        """
+        Yields the fragments of the rendered document. Placeholders without a value
+        are left untouched.
+
+        Args:
+            values (dict): Maps placeholder names to their text, or to a callable
+                returning an iterable of text fragments that is streamed in place.
+
+        Yields:
+            str: The fragments of the rendered document.
+        """
+
+        for piece in self.pieces:
+            if isinstance(piece, str):
+                yield piece
+            else:
+                name, original = piece
+                value = values.get(name, original)
+
+                if callable(value):
+                    yield from value()
+                else:
+                    yield value
+
+    def render(self, values):
+        """
+        Renders the template into a single string.
+
+        Args:
+            values (dict): Maps placeholder names to their text or fragment callables.
+
+        Returns:
+            str: The rendered document.
+        """
+
+        return "".join(self.iter_render(values))
+
+    def write(self, stream, values):
+        """
+        Streams the rendered document to a file or buffer without building it in memory.
+
+        Args:
+            stream (io.TextIOBase): The text stream to write to.
+            values (dict): Maps placeholder names to their text or fragment callables.
+        """
+
+        stream.writelines(self.iter_render(values))
@@ -0,0 +1,161 @@
+import os
+import pickle
+import shutil
+import time
+import unittest
+from unittest import mock
+
+from cache import FragmentCache, MemoryCache
+from main import generate_pages_from_directory, render_page
+from manifest import hash_text
+from profiling import Profiler
+from sitetest import SiteTestCase
+
+
+class TestFragmentCache(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = os.path.join(self.root, "cache")
+
+    def test_put_and_get(self):
+        cache = FragmentCache(self.directory)
+        self.assertIsNone(cache.get("abc"))
+
+        cache.put("abc", "Title", "<div >html</div>", "<ul >toc</ul>")
+
+        self.assertEqual(
+            ("Title", "<div >html</div>", "<ul >toc</ul>"), cache.get("abc")
+        )
+        self.assertEqual(
+            ("Title", "<div >html</div>", "<ul >toc</ul>"),
+            FragmentCache(self.directory).get("abc"),
+        )
+
+    def test_parser_version_is_part_of_the_key(self):
+        cache = FragmentCache(self.directory)
+        cache.put("abc", "Title", "html")
+
+        cache.version = "another parser"
+
+        self.assertIsNone(cache.get("abc"))
+
+    def test_evicts_least_recently_used(self):
+        cache = FragmentCache(self.directory, max_size=300)
+        cache.put("a", "A", "x" * 100)
+        cache.put("b", "B", "x" * 100)
+
+        # Make sure the entries get distinct access times.
+        time.sleep(0.01)
+        cache.get("a")
+        cache.put("c", "C", "x" * 100)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_tracks_the_total_size(self):
+        cache = FragmentCache(self.directory)
+        cache.put("a", "A", "x" * 100)
+        cache.put("b", "B", "x" * 100)
+        cache.put("a", "A", "x" * 10)
+
+        sizes = cache._index()
+        self.assertEqual(sum(sizes.values()), cache._total)
+        self.assertEqual(sizes, FragmentCache(self.directory)._index())
+
+    def test_template_change_skips_parsing(self):
+        self.write_site({"index.md": "# Home\n\n* a\n* b"})
+
+        cache = FragmentCache(self.directory)
+        generate_pages_from_directory(
+            self.content, self.template, self.public, cache=cache
+        )
+        first = self.read(os.path.join(self.public, "index.html"))
+
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        profiler = Profiler()
+        generate_pages_from_directory(
+            self.content, self.template, self.public, profiler=profiler, cache=cache
+        )
+
+        self.assertNotIn("markdown_to_html_node", profiler.stages())
+        second = self.read(os.path.join(self.public, "index.html"))
+
+        self.assertEqual(
+            first.replace("<title>", "<h1>").replace("</title>", "</h1>"), second
+        )
+
+    def test_streamed_content_is_stored_once_written(self):
+        cache = FragmentCache(self.directory)
+        markdown = "# Home\n\nSome *text*"
+        source_hash = hash_text(markdown)
+
+        values = render_page("index.md", markdown, source_hash, cache=cache)
+        self.assertIsNone(cache.get(source_hash))
+
+        html = "".join(values["Content"]())
+
+        self.assertEqual(
+            ("Home", html, "".join(values["Toc"]())), cache.get(source_hash)
+        )
+
+    def test_mapped_sources_bypass_the_cache(self):
+        self.write_site({"index.md": "# Home\n\nText"}, template="{{ Content }}")
+
+        cache = FragmentCache(self.directory)
+
+        with mock.patch("io_utils.MMAP_THRESHOLD", 1):
+            generate_pages_from_directory(
+                self.content, self.template, self.public, cache=cache
+            )
+
+        self.assertFalse(os.path.exists(self.directory))
+
+
+class TestMemoryCache(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = os.path.join(self.root, "cache")
+
+    def test_serves_pages_from_memory(self):
+        backing = FragmentCache(self.directory)
+        cache = MemoryCache(backing)
+        cache.put("abc", "Title", "html", "toc")
+
+        with mock.patch.object(backing, "get") as get:
+            self.assertEqual(("Title", "html", "toc"), cache.get("abc"))
+            get.assert_not_called()
+
+        self.assertEqual(("Title", "html", "toc"), backing.get("abc"))
+
+    def test_loads_pages_from_disk_once(self):
+        FragmentCache(self.directory).put("abc", "Title", "html")
+        cache = MemoryCache(FragmentCache(self.directory))
+
+        self.assertEqual(("Title", "html", ""), cache.get("abc"))
+        shutil.rmtree(self.directory)
+        self.assertEqual(("Title", "html", ""), cache.get("abc"))
+
+    def test_evicts_least_recently_used(self):
+        cache = MemoryCache(memory_size=250)
+        cache.put("a", "A", "x" * 99)
+        cache.put("b", "B", "x" * 99)
+        cache.get("a")
+        cache.put("c", "C", "x" * 99)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(200, cache.size)
+
+    def test_workers_get_an_empty_copy(self):
+        cache = MemoryCache(FragmentCache(self.directory))
+        cache.put("abc", "Title", "html")
+
+        copy = pickle.loads(pickle.dumps(cache))
+
+        self.assertEqual(0, copy.size)
+        self.assertEqual(("Title", "html", ""), copy.get("abc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
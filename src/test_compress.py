@@ -0,0 +1,76 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from compress import available_codecs, precompress, prune_compressed
+from manifest import OutputManifest, hash_file
+
+
+class TestCompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.manifest = OutputManifest()
+        self.outputs = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.root, name)
+
+        with open(path, "wb") as file:
+            file.write(data)
+
+        self.manifest.record(path, hash_file(path), len(data))
+        self.outputs.append(path)
+        return path
+
+    def test_precompress(self):
+        page = self.write("index.html", b"<p>text</p>" * 200)
+        small = self.write("small.css", b"p {}")
+        image = self.write("image.png", b"\x89PNG" * 1000)
+
+        siblings = precompress(self.manifest, self.outputs, min_size=64, threads=2)
+
+        self.assertIn(page + ".gz", siblings)
+        self.assertEqual(len(available_codecs()), len(siblings))
+        self.assertFalse(os.path.exists(small + ".gz"))
+        self.assertFalse(os.path.exists(image + ".gz"))
+
+        with gzip.open(page + ".gz", "rb") as file:
+            self.assertEqual(b"<p>text</p>" * 200, file.read())
+
+        entry = self.manifest.files[page + ".gz"]
+        self.assertEqual(hash_file(page + ".gz"), entry["digest"])
+        self.assertIn(page + ".gz", self.manifest.changed)
+
+    def test_precompress_skips_unchanged(self):
+        page = self.write("index.html", b"<p>text</p>" * 200)
+        precompress(self.manifest, self.outputs, min_size=64)
+        mtime = os.stat(page + ".gz").st_mtime_ns
+
+        manifest = OutputManifest(files=self.manifest.files)
+        precompress(manifest, self.outputs, min_size=64)
+
+        self.assertEqual(mtime, os.stat(page + ".gz").st_mtime_ns)
+        self.assertEqual(set(), manifest.changed)
+
+        precompress(manifest, self.outputs, min_size=64, level=1)
+        self.assertIn(page + ".gz", manifest.changed)
+
+    def test_prune_compressed(self):
+        page = self.write("index.html", b"<p>text</p>" * 200)
+        siblings = precompress(self.manifest, self.outputs, min_size=64)
+
+        self.assertEqual([], prune_compressed(self.manifest, siblings))
+        self.assertEqual(
+            sorted(siblings), sorted(prune_compressed(self.manifest, set()))
+        )
+        self.assertFalse(os.path.exists(page + ".gz"))
+        self.assertTrue(os.path.exists(page))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import threading
+import unittest
+
+from client import main as client_main
+from client import send_request
+from daemon import BuildDaemon, bind_socket
+from main import BuildError, parse_args
+from sitetest import SiteTestCase
+
+
+class TestBuildDaemon(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.root)
+
+        self.write_site(
+            {"index.md": "# Home", "blog/post.md": "# Post"}, {"index.css": "body {}"}
+        )
+
+        self.daemon = BuildDaemon(parse_args(["daemon", "--cache-size", "0"]))
+        self.daemon.start()
+
+    def tearDown(self):
+        self.daemon.close()
+
+    def test_incremental_build(self):
+        self.assertTrue(os.path.isfile(os.path.join("public", "index.html")))
+        self.assertListEqual([], self.daemon.handle({"command": "build"})["outputs"])
+
+        self.write(os.path.join("content", "blog", "post.md"), "# Edited")
+        response = self.daemon.handle({"command": "build"})
+
+        output = os.path.join("public", "blog", "post.html")
+        self.assertTrue(response["ok"])
+        self.assertListEqual([output], response["outputs"])
+        self.assertIn("<title>Edited</title>", self.read(output))
+
+    def test_full_build_and_status(self):
+        response = self.daemon.handle({"command": "build", "full": True})
+        self.assertTrue(response["ok"])
+
+        status = self.daemon.handle({"command": "status"})
+        self.assertEqual(2, status["pages"])
+        self.assertEqual(2, status["builds"])
+
+        self.assertFalse(self.daemon.handle({"command": "other"})["ok"])
+        self.assertTrue(self.daemon.handle({"command": "stop"})["ok"])
+        self.assertTrue(self.daemon.stopped)
+
+    def test_socket(self):
+        path = os.path.join(self.root, "daemon.sock")
+        server = bind_socket(path)
+        server.daemon = self.daemon
+
+        def serve():
+            while not self.daemon.stopped:
+                server.handle_request()
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+
+        try:
+            with self.assertRaises(BuildError):
+                bind_socket(path)
+
+            self.write(os.path.join("content", "index.md"), "# Changed")
+            response = send_request({"command": "build"}, path)
+            self.assertListEqual(
+                [os.path.join("public", "index.html")], response["outputs"]
+            )
+
+            self.assertEqual(0, client_main(["stop", "--socket", path]))
+        finally:
+            self.daemon.stopped = True
+            thread.join(5)
+            server.server_close()
+
+        self.assertEqual(1, client_main(["status", "--socket", path]))
+
+
+if __name__ == "__main__":
+    unittest.main()
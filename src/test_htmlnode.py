@@ -14,3 +14,11 @@ class TestHTMLNode(unittest.TestCase):
     def test_to_html(self):
         node1 = HTMLNode(tag="div", props={"class": "container"}, value="Hello, World!")
         self.assertEqual(node1.to_html(), '<div class="container">Hello, World!</div>')
+
+    def test_walk(self):
+        leaf1 = HTMLNode(tag="b", value="1")
+        leaf2 = HTMLNode(tag="i", value="2")
+        inner = HTMLNode(tag="p", children=[leaf1])
+        root = HTMLNode(tag="div", children=[inner, leaf2])
+
+        self.assertListEqual([root, inner, leaf1, leaf2], list(root.walk()))
@@ -17,6 +17,7 @@ from textnode import (
     text_type_image,
     text_type_link,
     text_type_italic,
+    text_type_code,
 )
 
 
@@ -185,6 +186,58 @@ class TestInlineMarkdown(unittest.TestCase):
             nodes,
         )
 
+    def test_text_to_textnodes_code_and_nested_delimiters(self):
+        text = "**bold *star* inside** then `co*de [x](y)` and *it*"
+        self.assertListEqual(
+            [
+                TextNode("", text_type_text),
+                TextNode("bold *star* inside", text_type_bold),
+                TextNode(" then ", text_type_text),
+                TextNode("co*de [x](y)", text_type_code),
+                TextNode(" and ", text_type_text),
+                TextNode("it", text_type_italic),
+                TextNode("", text_type_text),
+            ],
+            text_to_textnodes(text),
+        )
+
+    def test_text_to_textnodes_matches_chained_passes(self):
+        texts = [
+            "",
+            "plain",
+            "`a``b`",
+            "**a*** b*",
+            "[a ![b](c)",
+            "![i](u)[l](v)!x",
+            "*[l](v)* ![i](u) [l](v)",
+            "[x](y![a](b))",
+            "see [note] and *it*",
+            "**a** *b* `c` [d](e)",
+            "**a***b*",
+            "!![a](b) ![](u)[l](v)",
+        ]
+
+        for text in texts:
+            nodes = [TextNode(text, text_type_text)]
+            nodes = split_nodes_delimiter(nodes, "`", text_type_code)
+            nodes = split_nodes_delimiter(nodes, "**", text_type_bold)
+            nodes = split_nodes_delimiter(nodes, "*", text_type_italic)
+            nodes = split_nodes_image(nodes)
+            nodes = split_nodes_link(nodes)
+            self.assertListEqual(nodes, text_to_textnodes(text), text)
+
+    def test_text_to_textnodes_invalid(self):
+        for text in [
+            "`code",
+            "**bold",
+            "*italic",
+            "**a `x` b**",
+            "*a **b** c*",
+            "*a***b**",
+        ]:
+            with self.assertRaisesRegex(ValueError, "Invalid markdown"):
+                text_to_textnodes(text)
+
     def test_extract_title(self):
         text1 = "# This is a heading"
         self.assertEqual("This is a heading", extract_title(text1))
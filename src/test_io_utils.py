@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from io_utils import (
+    iter_lines,
+    map_file,
+    read_mode,
+    read_mode_mmap,
+    read_mode_stream,
+    read_mode_text,
+    read_source,
+    write_if_changed,
+)
+from manifest import hash_text
+
+
+class TestIOUtils(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "page.md")
+
+        with open(self.path, "wb") as file:
+            file.write("# Café\n\ntext\n".encode("utf-8"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_read_mode(self):
+        self.assertEqual(read_mode_text, read_mode(self.path))
+        self.assertEqual(read_mode_mmap, read_mode(self.path, mmap_threshold=4))
+        self.assertEqual(
+            read_mode_stream, read_mode(self.path, stream_threshold=4, mmap_threshold=1)
+        )
+
+    def test_read_source(self):
+        with read_source(self.path) as text:
+            self.assertEqual("# Café\n\ntext\n", text)
+
+        with read_source(self.path, read_mode_mmap) as mapped:
+            self.assertEqual(b"# Caf\xc3\xa9\n\ntext\n", mapped[:])
+
+        with read_source(self.path, read_mode_stream) as streamed:
+            self.assertIsNone(streamed)
+
+    def test_map_empty_file(self):
+        open(self.path, "w").close()
+
+        with map_file(self.path) as mapped:
+            self.assertEqual(b"", mapped)
+
+    def test_iter_lines(self):
+        self.assertListEqual(
+            ["# Café", "", "text"],
+            list(iter_lines("# Café\n\ntext\n".encode("utf-8"))),
+        )
+        self.assertListEqual(["a", "b"], list(iter_lines(b"a\nb")))
+        self.assertListEqual([], list(iter_lines(b"")))
+
+    def test_write_if_changed(self):
+        path = os.path.join(self.tmp.name, "page.html")
+
+        digest, size, changed = write_if_changed(path, lambda f: f.write("é"))
+        self.assertEqual((hash_text("é"), 2, True), (digest, size, changed))
+        self.assertEqual(0o644, os.stat(path).st_mode & 0o777)
+
+        os.utime(path, ns=(1, 1))
+        self.assertFalse(write_if_changed(path, lambda f: f.write("é"))[2])
+        self.assertFalse(write_if_changed(path, lambda f: f.write("é"), digest)[2])
+        self.assertEqual(1, os.stat(path).st_mtime_ns)
+
+        self.assertTrue(write_if_changed(path, lambda f: f.writelines(["a", "b"]))[2])
+
+        with open(path) as file:
+            self.assertEqual("ab", file.read())
+
+        self.assertListEqual(
+            ["page.html", "page.md"], sorted(os.listdir(self.tmp.name))
+        )
+
+    def test_write_if_changed_hashes_before_writing(self):
+        path = os.path.join(self.tmp.name, "page.html")
+        digest = write_if_changed(path, lambda f: f.write("page"))[0]
+        calls = []
+
+        def write(stream):
+            calls.append(stream)
+            stream.write("page")
+
+        with mock.patch("tempfile.mkstemp") as mkstemp:
+            self.assertFalse(write_if_changed(path, write, digest)[2])
+
+        mkstemp.assert_not_called()
+        self.assertEqual(1, len(calls))
+
+        # A changed page is written from the buffer of the first pass.
+        self.assertTrue(write_if_changed(path, lambda f: f.write("edited"), digest)[2])
+
+        with open(path) as file:
+            self.assertEqual("edited", file.read())
+
+        # Past the buffer size, it is rendered again into the file.
+        calls = []
+
+        def write_large(stream):
+            calls.append(stream)
+            stream.write("large")
+
+        with mock.patch("io_utils.CHECK_BUFFER_SIZE", 1):
+            self.assertTrue(write_if_changed(path, write_large, hash_text("edited"))[2])
+
+        self.assertEqual(2, len(calls))
+
+        with open(path) as file:
+            self.assertEqual("large", file.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 
-from leafnode import LeafNode
+from leafnode import SHARED_LEAF_MAX_LENGTH, LeafNode, shared_leaf
 
 
 class TestLeafNode(unittest.TestCase):
@@ -14,3 +14,14 @@ class TestLeafNode(unittest.TestCase):
     def test_to_html(self):
         node = LeafNode("a", "Click me", {"href": "https://www.example.com", "target": "_blank"})
         self.assertEqual(node.to_html(), '<a href="https://www.example.com" target="_blank">Click me</a>')
+
+    def test_slots(self):
+        node = LeafNode("b", "bold")
+        self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_shared_leaf(self):
+        self.assertIs(shared_leaf(None, " "), shared_leaf(None, " "))
+        self.assertEqual(shared_leaf("b", "and").to_html(), "<b>and</b>")
+
+        long_value = "x" * (SHARED_LEAF_MAX_LENGTH + 1)
+        self.assertIsNot(shared_leaf(None, long_value), shared_leaf(None, long_value))
@@ -0,0 +1,59 @@
+import os
+import unittest
+
+from livereload import CLIENT_SCRIPT, LiveReload, format_event, inject_client
+
+
+class TestLiveReload(unittest.TestCase):
+    def test_publish(self):
+        live_reload = LiveReload("public")
+        events = live_reload.subscribe()
+
+        paths = live_reload.publish(
+            [
+                os.path.join("public", "index.css"),
+                os.path.join("public", "blog", "post.html"),
+                os.path.join("public", "index.css"),
+            ]
+        )
+
+        self.assertListEqual(["/blog/post.html", "/index.css"], paths)
+        self.assertListEqual(paths, events.get_nowait())
+
+        live_reload.publish([])
+        self.assertTrue(events.empty())
+
+        live_reload.close()
+        self.assertIsNone(events.get_nowait())
+
+        live_reload.unsubscribe(events)
+        live_reload.publish(["public/index.html"])
+        self.assertTrue(events.empty())
+
+    def test_url_path_is_quoted(self):
+        live_reload = LiveReload("public")
+
+        self.assertEqual(
+            "/my%20notes/caf%C3%A9%3F.html",
+            live_reload.url_path(os.path.join("public", "my notes", "café?.html")),
+        )
+        self.assertEqual(
+            "/notes(1)/a,b;c=d@e&f+g$h!i'j.html",
+            live_reload.url_path(
+                os.path.join("public", "notes(1)", "a,b;c=d@e&f+g$h!i'j.html")
+            ),
+        )
+
+    def test_inject_client(self):
+        self.assertEqual(
+            b"<body><p>text</p>" + CLIENT_SCRIPT + b"</BODY></html>",
+            inject_client(b"<body><p>text</p></BODY></html>"),
+        )
+        self.assertEqual(b"<p>text</p>" + CLIENT_SCRIPT, inject_client(b"<p>text</p>"))
+
+    def test_format_event(self):
+        self.assertEqual(b'data: ["/index.html"]\n\n', format_event(["/index.html"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
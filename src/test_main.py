@@ -0,0 +1,186 @@
+import os
+import unittest
+from unittest import mock
+
+from main import (
+    BuildError,
+    collect_pages,
+    dry_run,
+    generate_pages_from_directory,
+    parse_args,
+)
+from manifest import BuildManifest
+from plan import create_plan
+from sitetest import SiteTestCase
+
+
+class TestMain(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write_site(
+            {
+                "index.md": "# Home\n\nHello *world*",
+                "blog/post.md": "# Post\n\n* a\n* b",
+                "blog/2024/old.md": "# Old\n\n> quote",
+            }
+        )
+
+    def test_collect_pages(self):
+        public = os.path.join(self.root, "public")
+        pages = sorted(collect_pages(self.content, public))
+
+        self.assertListEqual(
+            [
+                (
+                    os.path.join(self.content, "blog", "2024", "old.md"),
+                    os.path.join(public, "blog", "2024"),
+                ),
+                (
+                    os.path.join(self.content, "blog", "post.md"),
+                    os.path.join(public, "blog"),
+                ),
+                (os.path.join(self.content, "index.md"), public),
+            ],
+            pages,
+        )
+
+    def test_parallel_output_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        parallel = os.path.join(self.root, "parallel")
+
+        generate_pages_from_directory(self.content, self.template, serial)
+        generate_pages_from_directory(self.content, self.template, parallel, jobs=2)
+
+        self.assertEqual(len(self.read_tree(serial)), 3)
+        self.assertDictEqual(self.read_tree(serial), self.read_tree(parallel))
+
+    def test_parallel_error_reports_source(self):
+        broken = os.path.join(self.content, "blog", "broken.md")
+        self.write(broken, "no title here")
+
+        with self.assertRaisesRegex(BuildError, broken):
+            generate_pages_from_directory(
+                self.content, self.template, os.path.join(self.root, "out"), jobs=2
+            )
+
+    def test_pipelined_output_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        pipelined = os.path.join(self.root, "pipelined")
+
+        generate_pages_from_directory(self.content, self.template, serial)
+        outputs = generate_pages_from_directory(
+            self.content, self.template, pipelined, io_threads=2
+        )
+
+        self.assertEqual(len(outputs), 3)
+        self.assertDictEqual(self.read_tree(serial), self.read_tree(pipelined))
+
+    def test_pipelined_error_reports_source(self):
+        broken = os.path.join(self.content, "blog", "broken.md")
+        self.write(broken, "no title here")
+
+        with self.assertRaisesRegex(BuildError, broken):
+            generate_pages_from_directory(
+                self.content,
+                self.template,
+                os.path.join(self.root, "out"),
+                io_threads=2,
+            )
+
+    def test_streamed_output_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        streamed = os.path.join(self.root, "streamed")
+        pipelined = os.path.join(self.root, "pipelined")
+
+        generate_pages_from_directory(self.content, self.template, serial)
+        generate_pages_from_directory(
+            self.content, self.template, streamed, stream_threshold=1
+        )
+        outputs = generate_pages_from_directory(
+            self.content, self.template, pipelined, io_threads=2, stream_threshold=1
+        )
+
+        self.assertEqual(len(outputs), 3)
+        self.assertDictEqual(self.read_tree(serial), self.read_tree(streamed))
+        self.assertDictEqual(self.read_tree(serial), self.read_tree(pipelined))
+
+    def test_streamed_title_matches_serial(self):
+        sources = [
+            "```\n# Not the title\n```\n\n# Title",
+            "#   Spaced   \n\nText",
+            "  # Indented\n\nText",
+        ]
+
+        for source in sources:
+            self.write(os.path.join(self.content, "index.md"), source)
+            serial = os.path.join(self.root, "serial")
+            streamed = os.path.join(self.root, "streamed")
+
+            generate_pages_from_directory(self.content, self.template, serial)
+            generate_pages_from_directory(
+                self.content, self.template, streamed, stream_threshold=1
+            )
+
+            with self.subTest(source=source):
+                self.assertDictEqual(self.read_tree(serial), self.read_tree(streamed))
+
+    def test_mapped_output_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        mapped = os.path.join(self.root, "mapped")
+
+        generate_pages_from_directory(self.content, self.template, serial)
+
+        with mock.patch("io_utils.MMAP_THRESHOLD", 1):
+            generate_pages_from_directory(self.content, self.template, mapped)
+
+        self.assertDictEqual(self.read_tree(serial), self.read_tree(mapped))
+
+    def test_template_toc(self):
+        self.write(self.template, "<title>{{ Title }}</title>{{ Toc }}|{{ Content }}")
+        self.write(
+            os.path.join(self.content, "index.md"), "# Home\n\n## Part *one*\n\nText"
+        )
+        serial = os.path.join(self.root, "serial")
+        streamed = os.path.join(self.root, "streamed")
+
+        generate_pages_from_directory(self.content, self.template, serial)
+        generate_pages_from_directory(
+            self.content, self.template, streamed, stream_threshold=1
+        )
+
+        with open(os.path.join(serial, "index.html")) as file:
+            html = file.read()
+
+        self.assertTrue(
+            html.startswith(
+                '<title>Home</title><ul ><li ><a href="#home">Home</a><ul >'
+                '<li ><a href="#part-one">Part one</a></li></ul></li></ul>|'
+            )
+        )
+        self.assertIn('<h2 id="part-one">', html)
+        self.assertDictEqual(self.read_tree(serial), self.read_tree(streamed))
+
+    def test_dry_run_writes_nothing(self):
+        public = os.path.join(self.root, "public")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        plan = create_plan(self.content, os.path.join(self.root, "static"), public)
+
+        changes = dry_run(plan, manifest)
+
+        self.assertEqual(3, len(changes))
+        self.assertIn(os.path.join(public, "index.html"), changes)
+        self.assertFalse(os.path.exists(public))
+
+    def test_parse_args(self):
+        self.assertEqual(parse_args([]).jobs, 1)
+        self.assertEqual(parse_args(["--jobs", "4"]).jobs, 4)
+        self.assertGreaterEqual(parse_args(["-j", "0"]).jobs, 1)
+        self.assertEqual(parse_args([]).io_threads, 0)
+        self.assertEqual(parse_args(["--io-threads", "8"]).io_threads, 8)
+        self.assertFalse(parse_args([]).precompress)
+        self.assertEqual(parse_args(["--compress-level", "6"]).compress_level, 6)
+        self.assertTrue(parse_args(["serve", "--on-demand"]).on_demand)
+
+
+if __name__ == "__main__":
+    unittest.main()
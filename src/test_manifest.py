@@ -0,0 +1,137 @@
+import os
+import unittest
+
+from main import generate_pages_from_directory
+from manifest import BuildManifest, OutputManifest, hash_file, hash_text
+from sitetest import SiteTestCase
+from sync import prune_files
+
+
+class TestBuildManifest(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest_path = os.path.join(self.root, ".sitegenie", "manifest.json")
+        self.write_site({"index.md": "# Home", "blog/post.md": "# Post"})
+
+    def build(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        manifest.use_template(hash_file(self.template))
+        generate_pages_from_directory(
+            self.content, self.template, self.public, manifest
+        )
+        prune_files(manifest.prune(), self.public)
+        manifest.save()
+        return manifest
+
+    def test_hash_text(self):
+        self.assertEqual(hash_text("abc"), hash_text("abc"))
+        self.assertNotEqual(hash_text("abc"), hash_text("abd"))
+
+    def test_skips_unchanged_pages(self):
+        self.build()
+        output = os.path.join(self.public, "index.html")
+        self.write(output, "untouched")
+
+        self.build()
+
+        with open(output) as file:
+            self.assertEqual(file.read(), "untouched")
+
+    def test_rebuilds_changed_source(self):
+        self.build()
+        self.write(os.path.join(self.content, "index.md"), "# Changed")
+
+        self.build()
+
+        with open(os.path.join(self.public, "index.html")) as file:
+            self.assertIn("<title>Changed</title>", file.read())
+
+    def test_template_change_invalidates_every_page(self):
+        self.build()
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+
+        manifest = self.build()
+
+        self.assertTrue(manifest.template_changed)
+        with open(os.path.join(self.public, "blog", "post.html")) as file:
+            self.assertIn("<h1>Post</h1>", file.read())
+
+    def test_prunes_removed_sources(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+
+        manifest = self.build()
+
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+        self.assertNotIn(os.path.join(self.content, "blog", "post.md"), manifest.pages)
+
+    def test_load_missing_manifest(self):
+        manifest = BuildManifest.load(os.path.join(self.root, "missing.json"))
+        self.assertEqual(manifest.pages, {})
+        self.assertIsNone(manifest.template_hash)
+
+
+class TestOutputManifest(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write_site({"index.md": "# Home", "about.md": "# About"})
+
+    def generate(self, **options):
+        output_manifest = OutputManifest(os.path.join(self.root, "outputs.json"))
+
+        if os.path.exists(output_manifest.path):
+            output_manifest = OutputManifest.load(output_manifest.path)
+
+        generate_pages_from_directory(
+            self.content,
+            self.template,
+            self.public,
+            output_manifest=output_manifest,
+            **options,
+        )
+        output_manifest.save()
+        return output_manifest
+
+    def test_unchanged_pages_are_not_rewritten(self):
+        for options in ({}, {"jobs": 2}, {"io_threads": 2}):
+            with self.subTest(options=options):
+                output = os.path.join(self.public, "index.html")
+                first = self.generate(**options)
+                os.utime(output, ns=(1, 1))
+
+                second = self.generate(**options)
+
+                self.assertEqual(1, os.stat(output).st_mtime_ns)
+                self.assertEqual(set(), second.changed)
+                self.assertDictEqual(first.files, second.files)
+                self.assertEqual(
+                    {"digest": hash_file(output), "size": os.path.getsize(output)},
+                    second.files[output],
+                )
+
+    def test_changed_page_is_replaced(self):
+        self.generate()
+        self.write(os.path.join(self.content, "index.md"), "# Changed")
+
+        output_manifest = self.generate()
+
+        self.assertEqual(
+            {os.path.join(self.public, "index.html")}, output_manifest.changed
+        )
+
+    def test_retain_and_save(self):
+        path = os.path.join(self.root, "outputs.json")
+        output_manifest = OutputManifest(path)
+        output_manifest.record("a.html", "1", 1)
+        output_manifest.record("b.html", "2", 2, changed=False)
+
+        self.assertListEqual(["b.html"], output_manifest.retain(["a.html"]))
+        output_manifest.save()
+
+        loaded = OutputManifest.load(path)
+        self.assertDictEqual({"a.html": {"digest": "1", "size": 1}}, loaded.files)
+        self.assertEqual(set(), loaded.changed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from markdown_blocks import (
@@ -10,7 +11,14 @@ from markdown_blocks import (
     block_type_ordered_list,
     block_type_paragraph,
     markdown_to_html_node,
+    markdown_file_to_html_node,
+    markdown_outline,
+    classify_line,
+    iter_blocks,
+    line_type_blank,
+    line_type_fence,
 )
+from outline import Outline
 
 
 class TestMarkdownBlocks(unittest.TestCase):
@@ -28,10 +36,9 @@ class TestMarkdownBlocks(unittest.TestCase):
         self.assertListEqual(
             [
                 "This is **bolded** paragraph",
-                "This is another paragraph with *italic* text and `code` here",
+                "This is another paragraph with *italic* text and `code` here\n"
                 "This is the same paragraph on a new line",
-                "* This is a list",
-                "* with items",
+                "* This is a list\n* with items",
             ],
             blocks,
         )
@@ -139,3 +146,111 @@ class TestMarkdownBlocks(unittest.TestCase):
         self.assertEqual(
             html_node.children[5].children[1].children[0].value, "with items"
         )
+
+    def test_classify_line(self):
+        self.assertEqual(classify_line(""), line_type_blank)
+        self.assertEqual(classify_line("### Title"), block_type_heading)
+        self.assertEqual(classify_line("####### Title"), block_type_paragraph)
+        self.assertEqual(classify_line("#hashtag"), block_type_paragraph)
+        self.assertEqual(classify_line("```python"), line_type_fence)
+        self.assertEqual(classify_line("> quote"), block_type_quota)
+        self.assertEqual(classify_line("- item"), block_type_unordered_list)
+        self.assertEqual(classify_line("**bold** text"), block_type_paragraph)
+        self.assertEqual(classify_line("12. item"), block_type_ordered_list)
+        self.assertEqual(classify_line("2024 was a year"), block_type_paragraph)
+
+    def test_iter_blocks_fenced_code(self):
+        lines = [
+            "Intro",
+            "    ```python",
+            "    def f():",
+            "",
+            "        return 1",
+            "    ```",
+            "# Heading",
+            "text",
+        ]
+
+        self.assertListEqual(
+            [
+                (block_type_paragraph, "Intro"),
+                (block_type_code, "```python\ndef f():\n\n    return 1\n```"),
+                (block_type_heading, "# Heading"),
+                (block_type_paragraph, "text"),
+            ],
+            list(iter_blocks(lines)),
+        )
+
+    def test_iter_blocks_unclosed_fence(self):
+        self.assertListEqual(
+            [(block_type_code, "```\nx = 1\n```")],
+            list(iter_blocks(["```", "x = 1"])),
+        )
+
+    def test_multiline_paragraph_and_code(self):
+        markdown = "first line\nsecond *line* end\n\n```\na * b\n  indented\n```"
+        html = markdown_to_html_node(markdown).to_html()
+
+        self.assertEqual(
+            "<div ><p ><None>first line second </None><i>line</i><None> end</None></p>"
+            "<pre ><code ><None>a * b\n  indented\n</None></code></pre></div>",
+            html,
+        )
+
+    def test_lists(self):
+        markdown = "- one\n- two\n\n9. nine\n10. ten"
+        node = markdown_to_html_node(markdown)
+
+        self.assertEqual(["ul", "ol"], [child.tag for child in node.children])
+        self.assertEqual(2, len(node.children[0].children))
+        self.assertEqual("ten", node.children[1].children[1].children[0].value)
+
+    def test_markdown_file_matches_string(self):
+        markdown = "# Title\n\nSome *text*\nmore\n\n```\ncode\n```\n\n* a\n* b\n"
+        node = markdown_file_to_html_node(io.StringIO(markdown))
+
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(), "".join(node.iter_html())
+        )
+
+    def test_markdown_file_is_parsed_lazily(self):
+        consumed = []
+
+        def lines():
+            for i in range(1000):
+                consumed.append(i)
+                yield f"paragraph {i}\n"
+                yield "\n"
+
+        fragments = markdown_file_to_html_node(lines()).iter_html()
+
+        self.assertEqual("<div >", next(fragments))
+        self.assertEqual("<p >", next(fragments))
+        self.assertLess(len(consumed), 3)
+
+    def test_markdown_bytes_match_string(self):
+        markdown = "# Caf\u00e9\n\nSome *text*\n\n```\n  code\n```\n\n1. a\n2. b"
+
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(),
+            markdown_to_html_node(markdown.encode("utf-8")).to_html(),
+        )
+
+    def test_headings_are_collected_into_the_outline(self):
+        markdown = "# The *Title*\n\n## Intro\n\ntext\n\n## Intro"
+        outline = Outline()
+        node = markdown_to_html_node(markdown, outline)
+
+        self.assertEqual("The *Title*", outline.require_title())
+        self.assertListEqual(
+            [
+                (1, "The Title", "the-title"),
+                (2, "Intro", "intro"),
+                (2, "Intro", "intro-1"),
+            ],
+            outline.headings,
+        )
+        self.assertEqual({"id": "intro-1"}, node.children[3].props)
+        self.assertListEqual(
+            outline.headings, markdown_outline(markdown.split("\n")).headings
+        )
@@ -0,0 +1,49 @@
+import unittest
+
+from outline import Outline, slugify
+
+
+class TestOutline(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual("hello-world", slugify("Hello, World!"))
+        self.assertEqual("a-b-c", slugify("  a - b  c "))
+        self.assertEqual("section", slugify("!!!"))
+
+    def test_add_assigns_unique_anchors(self):
+        outline = Outline()
+
+        self.assertEqual("intro", outline.add(2, "Intro", "Intro"))
+        self.assertEqual("intro-1", outline.add(2, "Intro", "Intro"))
+        self.assertEqual("intro-2", outline.add(3, "Intro", "*Intro*"))
+
+    def test_title_is_first_level_one_heading(self):
+        outline = Outline()
+
+        with self.assertRaisesRegex(ValueError, "Title not found"):
+            outline.require_title()
+
+        outline.add(2, "Sub", "Sub")
+        outline.add(1, "Main", "**Main**")
+        outline.add(1, "Other", "Other")
+
+        self.assertEqual("**Main**", outline.require_title())
+
+    def test_to_html_nests_levels(self):
+        outline = Outline()
+
+        for level, text in [(1, "A"), (2, "B"), (3, "C"), (2, "D"), (1, "E")]:
+            outline.add(level, text, text)
+
+        self.assertEqual(
+            '<ul ><li ><a href="#a">A</a><ul ><li ><a href="#b">B</a><ul >'
+            '<li ><a href="#c">C</a></li></ul></li><li ><a href="#d">D</a></li>'
+            '</ul></li><li ><a href="#e">E</a></li></ul>',
+            outline.to_html(),
+        )
+
+    def test_to_html_without_headings(self):
+        self.assertEqual("", Outline().to_html())
+
+
+if __name__ == "__main__":
+    unittest.main()
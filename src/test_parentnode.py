@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from leafnode import LeafNode
@@ -21,6 +22,39 @@ class TestParentNode(unittest.TestCase):
 
         self.assertEqual(node2.to_html(), '<ul class="list"><li>Item 1</li><li>Item 2</li><li>Item 3</li></ul>')
 
+    def test_iter_html(self):
+        node = ParentNode(tag="div", children=[
+            ParentNode(tag="p", children=[LeafNode(tag="b", value="Hello")]),
+            LeafNode(tag="i", value="World"),
+        ])
+
+        self.assertListEqual(
+            ["<div >", "<p >", "<b>Hello</b>", "</p>", "<i>World</i>", "</div>"],
+            list(node.iter_html()),
+        )
+        self.assertEqual(node.to_html(), "".join(node.iter_html()))
+
+    def test_write_html(self):
+        node = ParentNode(tag="ul", children=[LeafNode(tag="li", value="Item 1")])
+        stream = io.StringIO()
+
+        node.write_html(stream)
+
+        self.assertEqual(stream.getvalue(), "<ul ><li>Item 1</li></ul>")
+
+    def test_to_html_deep_tree(self):
+        depth = 50000
+        node = LeafNode(tag="b", value="x")
+
+        for _ in range(depth):
+            node = ParentNode(tag="div", children=[node])
+
+        html = node.to_html()
+
+        self.assertTrue(html.startswith("<div ><div >"))
+        self.assertEqual(html.count("</div>"), depth)
+        self.assertEqual(sum(1 for _ in node.walk()), depth + 1)
+
     def raises_exception_props_to_html(self):
         with self.assertRaisesRegex(ValueError, "ParentNode must have a tag"):
             ParentNode(props="class=\"container\"", children=[
@@ -0,0 +1,53 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline import BoundedWriter, prefetch
+
+
+class TestPipeline(unittest.TestCase):
+    def test_prefetch_keeps_order(self):
+        with ThreadPoolExecutor(4) as pool:
+            results = list(prefetch(lambda x: x * x, range(20), pool, 3))
+
+        self.assertListEqual([(x, x * x) for x in range(20)], results)
+
+    def test_prefetch_runs_ahead_up_to_depth(self):
+        started = []
+
+        with ThreadPoolExecutor(4) as pool:
+            results = prefetch(started.append, range(10), pool, 3)
+            next(results)
+            time.sleep(0.05)
+
+            self.assertListEqual([0, 1, 2, 3], sorted(started))
+            results.close()
+
+    def test_writer_blocks_when_full(self):
+        release = threading.Event()
+        writer = BoundedWriter(1, 2)
+        writer.submit(release.wait)
+        writer.submit(release.wait)
+
+        blocked = threading.Thread(target=writer.submit, args=(release.wait,))
+        blocked.start()
+        blocked.join(0.05)
+        self.assertTrue(blocked.is_alive())
+
+        release.set()
+        blocked.join(1)
+        self.assertFalse(blocked.is_alive())
+        writer.close()
+
+    def test_writer_reports_errors_through_futures(self):
+        writer = BoundedWriter(2, 4)
+        future = writer.submit(int, "x")
+        writer.close()
+
+        with self.assertRaises(ValueError):
+            future.result()
+
+
+if __name__ == "__main__":
+    unittest.main()
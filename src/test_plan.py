@@ -0,0 +1,110 @@
+import os
+import unittest
+
+from plan import LOAD_SLACK, create_plan, partition, scan_files
+from sitetest import SiteTestCase
+
+
+class TestPlan(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write_site(
+            {
+                "index.md": "# Home",
+                "blog/post.md": "# Post",
+                "blog/notes.txt": "skipped",
+            },
+            {"index.css": "body {}", "images/logo.png": "png"},
+        )
+
+    def test_scan_files(self):
+        files = sorted(
+            (entry.path, target) for entry, target in scan_files(self.static, "out")
+        )
+
+        self.assertListEqual(
+            [
+                (
+                    os.path.join(self.static, "images", "logo.png"),
+                    os.path.join("out", "images", "logo.png"),
+                ),
+                (
+                    os.path.join(self.static, "index.css"),
+                    os.path.join("out", "index.css"),
+                ),
+            ],
+            files,
+        )
+
+    def test_create_plan(self):
+        plan = create_plan(self.content, self.static, self.public)
+
+        self.assertEqual(2, plan.page_count)
+        self.assertListEqual(
+            [
+                (
+                    os.path.join(self.content, "blog", "post.md"),
+                    os.path.join(self.public, "blog"),
+                ),
+                (os.path.join(self.content, "index.md"), self.public),
+            ],
+            sorted(plan.pages),
+        )
+        self.assertEqual(2, len(plan.assets))
+
+        stat = os.stat(os.path.join(self.static, "index.css"))
+        self.assertEqual(
+            (stat.st_mtime_ns, 7), plan.stats[os.path.join(self.static, "index.css")]
+        )
+
+    def test_create_plan_without_static(self):
+        plan = create_plan(self.content, os.path.join(self.root, "missing"), "out")
+
+        self.assertEqual(2, plan.page_count)
+        self.assertListEqual([], plan.assets)
+
+    def test_partition(self):
+        stats = {f"page{i}.md": (0, size) for i, size in enumerate([90, 50, 40, 10, 0])}
+        items = [(path, "public") for path in stats]
+
+        shards = partition(items, stats, 2)
+
+        self.assertListEqual(shards, partition(list(reversed(items)), stats, 2))
+        self.assertCountEqual(items, shards[0] + shards[1])
+        self.assertListEqual([[], [], []], partition([], stats, 3))
+
+    def test_partition_is_stable(self):
+        stats = {f"page{i}.md": (0, 100 + i % 7 * 50) for i in range(200)}
+        items = [(path, "public") for path in stats]
+        shards = partition(items, stats, 4)
+        total = sum(size for _, size in stats.values())
+
+        for shard in shards:
+            load = sum(stats[path][1] for path, _ in shard)
+            self.assertLessEqual(load, (1 + LOAD_SLACK) * total / 4)
+
+        stats["page0.md"] = (0, 400)
+        resized = partition(items, stats, 4)
+        added = partition(items + [("page200.md", "public")], stats, 4)
+
+        for other in (resized, added):
+            moved = sum(
+                1
+                for before, after in zip(shards, other)
+                for item in before
+                if item not in after
+            )
+            self.assertLessEqual(moved, 3)
+
+    def test_shard(self):
+        plan = create_plan(self.content, self.static, self.public)
+        shards = [plan.shard(index, 2) for index in (1, 2)]
+
+        self.assertCountEqual(plan.pages, shards[0].pages + shards[1].pages)
+        self.assertCountEqual(plan.assets, shards[0].assets + shards[1].assets)
+        self.assertEqual(1, shards[0].page_count)
+        self.assertEqual(set(plan.stats), set(shards[0].stats) | set(shards[1].stats))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import json
+import os
+import unittest
+
+from main import generate_pages_from_directory
+from profiling import NULL_PROFILER, Profiler
+from sitetest import SiteTestCase
+
+
+class TestProfiling(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write_site({"a.md": "# A\n\n* one\n* two", "b.md": "# B\n\nText"})
+
+    def test_null_profiler(self):
+        with NULL_PROFILER.stage("noop"):
+            pass
+
+        self.assertFalse(NULL_PROFILER.enabled)
+
+    def test_stage_records(self):
+        profiler = Profiler()
+
+        with profiler.stage("outer"):
+            with profiler.stage("inner", "page.md"):
+                pass
+
+        self.assertListEqual(
+            ["inner", "outer"], [record[0] for record in profiler.records]
+        )
+        self.assertEqual("page.md", profiler.records[0][1])
+        self.assertEqual(1, profiler.stages()["outer"]["count"])
+
+    def assert_profiled(self, jobs):
+        profiler = Profiler()
+        public = os.path.join(self.root, f"public{jobs}")
+
+        generate_pages_from_directory(
+            self.content, self.template, public, jobs=jobs, profiler=profiler
+        )
+
+        stages = profiler.stages()
+        for stage in ("read_file", "markdown_to_html_node", "to_html", "write"):
+            self.assertEqual(2, stages[stage]["count"], stage)
+
+        a = os.path.join(self.content, "a.md")
+        self.assertEqual(8, profiler.nodes[a])
+        self.assertEqual(2, len(profiler.slowest_pages()))
+        self.assertIn("slowest pages", profiler.report())
+
+        with open(os.path.join(public, "a.html")) as file:
+            self.assertIn("<title>A</title>", file.read())
+
+        trace = os.path.join(self.root, "trace.json")
+        profiler.write_trace(trace)
+
+        with open(trace) as file:
+            events = json.load(file)["traceEvents"]
+
+        self.assertEqual(len(profiler.records), len(events))
+        self.assertTrue(all(event["ph"] == "X" for event in events))
+
+    def test_profile_serial_build(self):
+        self.assert_profiled(1)
+
+    def test_profile_parallel_build(self):
+        self.assert_profiled(2)
+
+
+if __name__ == "__main__":
+    unittest.main()
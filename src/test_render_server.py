@@ -0,0 +1,97 @@
+import os
+import unittest
+import urllib.error
+import urllib.request
+from unittest import mock
+
+from render_server import PageCache, PageRenderer, start_rendering_server
+from sitetest import SiteTestCase
+
+
+class TestPageCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = PageCache(max_size=10)
+        cache.put("a.md", 1, "a", b"aaaa")
+        cache.put("b.md", 1, "b", b"bbbb")
+        cache.get("a.md")
+        cache.put("c.md", 1, "c", b"cccc")
+
+        self.assertIsNone(cache.get("b.md"))
+        self.assertEqual((1, "a", b"aaaa"), cache.get("a.md"))
+        self.assertEqual(8, cache.size)
+
+        cache.put("d.md", 1, "d", b"d" * 11)
+        self.assertIsNone(cache.get("d.md"))
+        self.assertEqual(2, len(cache))
+
+
+class TestPageRenderer(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write_site(
+            {"index.md": "# Home", "blog/post.md": "# Post"}, {"index.css": "body {}"}
+        )
+
+        self.renderer = PageRenderer(self.content, self.static, self.template)
+
+    def test_source_path(self):
+        index = os.path.join(self.content, "index.md")
+        post = os.path.join(self.content, "blog", "post.md")
+
+        self.assertEqual(index, self.renderer.source_path("/"))
+        self.assertEqual(index, self.renderer.source_path("/index.html"))
+        self.assertEqual(post, self.renderer.source_path("/blog/post.html"))
+        self.assertEqual(post, self.renderer.source_path("/blog/post"))
+        self.assertIsNone(self.renderer.source_path("/blog/"))
+        self.assertIsNone(self.renderer.source_path("/missing.html"))
+        self.assertIsNone(self.renderer.source_path("/index.css"))
+        self.assertIsNone(self.renderer.source_path("/../content/index.html"))
+
+    def test_render_uses_cache(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        self.assertIn(b"<title>Post</title>", self.renderer.render(post))
+
+        with mock.patch("render_server.render_page") as render_page:
+            self.renderer.render(post)
+            os.utime(post, ns=(1, 1))
+            self.renderer.render(post)
+
+        render_page.assert_not_called()
+
+    def test_render_invalidates(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        self.renderer.render(post)
+
+        self.write(post, "# Edited")
+        self.assertIn(b"<title>Edited</title>", self.renderer.render(post))
+
+        self.write(self.template, "<h1>{{ Title }}</h1>")
+        os.utime(self.template, ns=(1, 1))
+        self.assertEqual(b"<h1>Edited</h1>", self.renderer.render(post))
+
+    def test_server(self):
+        server = start_rendering_server(self.renderer, 0)
+        url = f"http://localhost:{server.server_address[1]}"
+
+        try:
+            with urllib.request.urlopen(f"{url}/blog/post.html") as response:
+                self.assertEqual(
+                    "text/html; charset=utf-8", response.headers["Content-Type"]
+                )
+                self.assertIn(b"<title>Post</title>", response.read())
+
+            with urllib.request.urlopen(f"{url}/index.css") as response:
+                self.assertEqual(b"body {}", response.read())
+
+            with self.assertRaises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f"{url}/missing.html")
+
+            self.assertEqual(404, error.exception.code)
+            error.exception.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
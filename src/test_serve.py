@@ -0,0 +1,198 @@
+import gzip
+import json
+import os
+import unittest
+
+from main import copy_files, generate_pages_from_directory
+from manifest import BuildManifest, OutputManifest, hash_file
+from serve import IncrementalBuildError, IncrementalBuilder
+from sitetest import SiteTestCase
+
+
+class TestIncrementalBuilder(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write_site(
+            {"index.md": "# Home", "blog/post.md": "# Post"}, {"index.css": "body {}"}
+        )
+
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        manifest.use_template(hash_file(self.template))
+        copy_files(self.static, self.public, manifest)
+        generate_pages_from_directory(
+            self.content, self.template, self.public, manifest
+        )
+
+        self.builder = IncrementalBuilder(
+            manifest, self.content, self.static, self.template, self.public
+        )
+
+    def test_regenerates_only_changed_page(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(post, "# Edited")
+
+        outputs = self.builder.apply({post})
+
+        output = os.path.join(self.public, "blog", "post.html")
+        self.assertListEqual([output], outputs)
+        self.assertIn("<title>Edited</title>", self.read(output))
+
+    def test_new_and_removed_pages(self):
+        new = os.path.join(self.content, "blog", "new.md")
+        self.write(new, "# New")
+        post = os.path.join(self.content, "blog", "post.md")
+        os.remove(post)
+
+        outputs = self.builder.apply({new, post})
+
+        self.assertListEqual(
+            [
+                os.path.join(self.public, "blog", "new.html"),
+                os.path.join(self.public, "blog", "post.html"),
+            ],
+            outputs,
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "post.html")))
+
+    def test_removed_page_prunes_empty_directory(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        os.remove(post)
+
+        self.builder.apply({post})
+
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+        self.assertTrue(os.path.isdir(self.public))
+
+    def test_failed_page_does_not_stop_batch(self):
+        broken = os.path.join(self.content, "aaa.md")
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(broken, "no title")
+        self.write(post, "# Edited")
+
+        with self.assertRaises(IncrementalBuildError) as error:
+            self.builder.apply({broken, post})
+
+        output = os.path.join(self.public, "blog", "post.html")
+        self.assertListEqual([output], error.exception.outputs)
+        self.assertIn("aaa.md", str(error.exception))
+        self.assertIn("<title>Edited</title>", self.read(output))
+        self.assertSetEqual({broken}, self.builder.failed)
+
+        self.write(broken, "# Fixed")
+        outputs = self.builder.apply(set())
+
+        self.assertListEqual([os.path.join(self.public, "aaa.html")], outputs)
+        self.assertSetEqual(set(), self.builder.failed)
+
+    def test_template_change_rebuilds_every_page(self):
+        self.write(self.template, "<h1>{{ Title }}</h1>")
+
+        outputs = self.builder.apply({self.template})
+
+        self.assertEqual(2, len(outputs))
+        self.assertEqual(
+            "<h1>Home</h1>", self.read(os.path.join(self.public, "index.html"))
+        )
+        self.assertFalse(self.builder.manifest.template_changed)
+
+    def test_static_changes(self):
+        css = os.path.join(self.static, "index.css")
+        self.write(css, "body { margin: 0 }")
+
+        self.assertListEqual(
+            [os.path.join(self.public, "index.css")], self.builder.apply({css})
+        )
+
+        os.remove(css)
+        self.builder.apply({css})
+
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.css")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def tracked_build(self):
+        manifest = BuildManifest.load(os.path.join(self.root, "manifest.json"))
+        manifest.use_template(hash_file(self.template))
+        output_manifest = OutputManifest.load(os.path.join(self.root, "outputs.json"))
+        copy_files(self.static, self.public, manifest, output_manifest=output_manifest)
+        outputs = generate_pages_from_directory(
+            self.content,
+            self.template,
+            self.public,
+            manifest,
+            output_manifest=output_manifest,
+        )
+        manifest.save()
+        output_manifest.save()
+        return manifest, output_manifest, outputs
+
+    def test_output_manifest_follows_edits(self):
+        manifest, output_manifest, _ = self.tracked_build()
+        builder = IncrementalBuilder(
+            manifest,
+            self.content,
+            self.static,
+            self.template,
+            self.public,
+            output_manifest=output_manifest,
+        )
+        post = os.path.join(self.content, "blog", "post.md")
+        css = os.path.join(self.static, "index.css")
+        self.write(post, "# Edited")
+        os.remove(css)
+
+        builder.apply({post, css})
+
+        with open(output_manifest.path) as file:
+            data = json.load(file)
+
+        output = os.path.join(self.public, "blog", "post.html")
+        self.assertEqual(hash_file(output), data["files"][output]["digest"])
+        self.assertListEqual([output], data["changed"])
+        self.assertListEqual([os.path.join(self.public, "index.css")], data["removed"])
+
+    def test_build_records_pages_edited_by_watch(self):
+        self.tracked_build()
+
+        # A watch session that does not track the outputs edits a page.
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(post, "# Edited")
+        self.builder.apply({post})
+
+        _, output_manifest, outputs = self.tracked_build()
+
+        output = os.path.join(self.public, "blog", "post.html")
+        self.assertListEqual([], outputs)
+        self.assertEqual(hash_file(output), output_manifest.digest(output))
+        self.assertEqual({output}, output_manifest.changed)
+
+    def test_compressed_siblings_follow_edits(self):
+        manifest, output_manifest, _ = self.tracked_build()
+        builder = IncrementalBuilder(
+            manifest,
+            self.content,
+            self.static,
+            self.template,
+            self.public,
+            output_manifest=output_manifest,
+            compress={"min_size": 0, "level": 1},
+        )
+        post = os.path.join(self.content, "blog", "post.md")
+        sibling = os.path.join(self.public, "blog", "post.html.gz")
+        self.write(post, "# Edited")
+
+        builder.apply({post})
+
+        with gzip.open(sibling) as file:
+            self.assertIn(b"Edited", file.read())
+
+        self.assertIn(sibling, output_manifest.files)
+
+        os.remove(post)
+        builder.apply({post})
+
+        self.assertFalse(os.path.exists(sibling))
+        self.assertNotIn(sibling, output_manifest.files)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from main import BuildError, parse_args
+from manifest import BuildManifest
+from shard import find_shards, merge_shards
+from sitetest import TEMPLATE, SiteTestCase
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+class TestShard(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+
+        for directory in ("sharded", "single"):
+            root = os.path.join(self.root, directory)
+            os.makedirs(os.path.join(root, "content", "blog"))
+            self.write(os.path.join(root, "template.html"), TEMPLATE)
+            self.write(os.path.join(root, "static", "index.css"), "body {}")
+
+            for i in range(7):
+                self.write(
+                    os.path.join(root, "content", "blog", f"post{i}.md"),
+                    f"# Post {i}\n\n" + "a" * i,
+                )
+
+        self.sharded = os.path.join(self.root, "sharded")
+
+    def run_main(self, root, *args):
+        subprocess.run(
+            [sys.executable, MAIN, *args], cwd=root, check=True, capture_output=True
+        )
+
+    def merge(self):
+        # Manifests record paths relative to the root of the site.
+        cwd = os.getcwd()
+        os.chdir(self.sharded)
+
+        try:
+            output_manifest = merge_shards(find_shards())
+            manifest = BuildManifest.load(os.path.join(".sitegenie", "manifest.json"))
+        finally:
+            os.chdir(cwd)
+
+        return output_manifest, manifest
+
+    def test_shards_match_single_build(self):
+        processes = [
+            subprocess.Popen(
+                [sys.executable, MAIN, "build", "--shard", f"{index}/3"],
+                cwd=self.sharded,
+                stdout=subprocess.DEVNULL,
+            )
+            for index in (1, 2, 3)
+        ]
+
+        for process in processes:
+            self.assertEqual(0, process.wait())
+
+        output_manifest, merged = self.merge()
+        self.run_main(os.path.join(self.root, "single"), "build")
+
+        self.assertDictEqual(
+            self.read_tree(os.path.join(self.root, "single", "public")),
+            self.read_tree(os.path.join(self.sharded, "public")),
+        )
+        self.assertEqual(8, len(output_manifest.files))
+        self.assertEqual(7, len(merged.pages))
+        self.assertListEqual([os.path.join("public", "index.css")], merged.assets)
+
+    def test_merge_removes_stale_outputs(self):
+        for index in (1, 2):
+            self.run_main(self.sharded, "build", "--shard", f"{index}/2")
+
+        self.merge()
+        os.remove(os.path.join(self.sharded, "content", "blog", "post3.md"))
+
+        for index in (1, 2):
+            self.run_main(self.sharded, "build", "--shard", f"{index}/2")
+
+        output_manifest, _ = self.merge()
+        post = os.path.join("public", "blog", "post3.html")
+
+        self.assertFalse(os.path.exists(os.path.join(self.sharded, post)))
+        self.assertSetEqual({post}, output_manifest.removed)
+        self.assertSetEqual(set(), output_manifest.changed)
+
+    def test_find_shards(self):
+        shards = os.path.join(self.sharded, ".sitegenie", "shards")
+
+        with self.assertRaises(BuildError):
+            find_shards(shards)
+
+        self.run_main(self.sharded, "build", "--shard", "2/2")
+
+        with self.assertRaisesRegex(BuildError, "1-of-2"):
+            find_shards(shards)
+
+        self.run_main(self.sharded, "build", "--shard", "1/2")
+        self.assertEqual(
+            [os.path.join(shards, "1-of-2"), os.path.join(shards, "2-of-2")],
+            find_shards(shards),
+        )
+
+        self.run_main(self.sharded, "build", "--shard", "1/3")
+
+        with self.assertRaisesRegex(BuildError, "stale"):
+            find_shards(shards)
+
+    def test_parse_shard(self):
+        self.assertEqual((2, 4), parse_args(["--shard", "2/4"]).shard)
+        self.assertIsNone(parse_args([]).shard)
+
+        for value in ("0/4", "5/4", "2", "a/b"):
+            with self.assertRaises(SystemExit):
+                parse_args(["--shard", value])
+
+        with self.assertRaises(SystemExit):
+            parse_args(["serve", "--shard", "1/2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import gzip
+import http.client
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from livereload import CLIENT_SCRIPT, LiveReload
+from manifest import OutputManifest, hash_file
+from serve import start_server
+from static_server import accepted_encodings
+
+
+class TestStaticServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.public = os.path.join(self.root, "public")
+        self.outputs_path = os.path.join(self.root, "outputs.json")
+
+        os.makedirs(os.path.join(self.public, "blog"))
+        self.page = self.write("index.html", b"<p>home</p>" * 100)
+        self.write("index.html.gz", gzip.compress(b"<p>home</p>" * 100))
+        self.write("blog/image.png", os.urandom(100 * 1024))
+
+        manifest = OutputManifest(self.outputs_path)
+        manifest.record(self.page, hash_file(self.page), os.path.getsize(self.page))
+        manifest.save()
+
+        self.server = start_server(self.public, 0, self.outputs_path)
+        self.connection = http.client.HTTPConnection(
+            "localhost", self.server.server_address[1]
+        )
+
+    def tearDown(self):
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.public, name)
+
+        with open(path, "wb") as file:
+            file.write(data)
+
+        return path
+
+    def get(self, path, headers=None):
+        self.connection.request("GET", path, headers=headers or {})
+        response = self.connection.getresponse()
+        return response, response.read()
+
+    def test_strong_etag_and_not_modified(self):
+        response, body = self.get("/")
+
+        self.assertEqual(200, response.status)
+        self.assertEqual(b"<p>home</p>" * 100, body)
+        self.assertEqual(f'"{hash_file(self.page)}"', response.headers["ETag"])
+        self.assertEqual("Accept-Encoding", response.headers["Vary"])
+
+        etag = response.headers["ETag"]
+        response, body = self.get("/index.html", {"If-None-Match": etag})
+        self.assertEqual(304, response.status)
+        self.assertEqual(b"", body)
+
+        last_modified = response.headers["Last-Modified"]
+        response, _ = self.get("/index.html", {"If-Modified-Since": last_modified})
+        self.assertEqual(304, response.status)
+
+        response, _ = self.get("/index.html", {"If-None-Match": '"other"'})
+        self.assertEqual(200, response.status)
+
+    def test_weak_etag_for_changed_file(self):
+        self.write("index.html", b"<p>edited</p>")
+        os.utime(self.page, ns=(2**62, 2**62))
+
+        response, body = self.get("/index.html")
+
+        self.assertEqual(b"<p>edited</p>", body)
+        self.assertTrue(response.headers["ETag"].startswith('W/"'))
+        self.assertIsNone(response.headers["Content-Encoding"])
+
+    def test_precompressed(self):
+        response, body = self.get("/index.html", {"Accept-Encoding": "br;q=0, gzip"})
+
+        self.assertEqual("gzip", response.headers["Content-Encoding"])
+        self.assertEqual("text/html", response.headers["Content-Type"])
+        self.assertEqual(b"<p>home</p>" * 100, gzip.decompress(body))
+
+        response, _ = self.get("/index.html", {"Accept-Encoding": "gzip;q=0"})
+        self.assertIsNone(response.headers["Content-Encoding"])
+
+    def test_sendfile(self):
+        with mock.patch("static_server.SENDFILE_THRESHOLD", 1024):
+            response, body = self.get("/blog/image.png")
+
+        with open(os.path.join(self.public, "blog", "image.png"), "rb") as file:
+            self.assertEqual(file.read(), body)
+
+        self.assertEqual(str(100 * 1024), response.headers["Content-Length"])
+        self.assertEqual(404, self.get("/missing.html")[0].status)
+
+    def test_live_reload(self):
+        live_reload = LiveReload(self.public)
+        server = start_server(self.public, 0, self.outputs_path, live_reload)
+        connection = http.client.HTTPConnection("localhost", server.server_address[1])
+
+        try:
+            connection.request("GET", "/", headers={"Accept-Encoding": "gzip"})
+            response = connection.getresponse()
+            body = response.read()
+
+            self.assertIn(CLIENT_SCRIPT, body)
+            self.assertIsNone(response.headers["Content-Encoding"])
+            self.assertEqual(str(len(body)), response.headers["Content-Length"])
+            self.assertTrue(response.headers["ETag"].endswith('-livereload"'))
+
+            connection.request("GET", "/__livereload")
+            response = connection.getresponse()
+            self.assertEqual("text/event-stream", response.headers["Content-Type"])
+            self.assertEqual(b"retry: 1000\n", response.fp.readline())
+            self.assertEqual(b"\n", response.fp.readline())
+
+            live_reload.publish([os.path.join(self.public, "index.css")])
+            self.assertEqual(b'data: ["/index.css"]\n', response.fp.readline())
+        finally:
+            live_reload.close()
+            connection.close()
+            server.shutdown()
+            server.server_close()
+
+    def test_accepted_encodings(self):
+        self.assertEqual(
+            {"gzip", "br"}, accepted_encodings("gzip, deflate;q=0, br;q=0.5")
+        )
+        self.assertEqual(set(), accepted_encodings(""))
+
+
+if __name__ == "__main__":
+    unittest.main()
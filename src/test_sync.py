@@ -0,0 +1,96 @@
+import os
+import unittest
+
+from main import copy_files
+from manifest import BuildManifest
+from sitetest import SiteTestCase
+from sync import is_unchanged, prune_files, sync_files
+
+
+class TestSync(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "logo.png"), "png")
+
+    def test_sync_copies_only_changed_files(self):
+        synced, transferred = sync_files(self.static, self.public)
+        self.assertEqual(len(synced), 2)
+        self.assertEqual(len(transferred), 2)
+
+        _, transferred = sync_files(self.static, self.public)
+        self.assertListEqual([], transferred)
+
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        _, transferred = sync_files(self.static, self.public)
+        self.assertListEqual([os.path.join(self.public, "index.css")], transferred)
+        self.assertEqual(
+            "body { margin: 0 }", self.read(os.path.join(self.public, "index.css"))
+        )
+
+    def test_is_unchanged_with_checksum(self):
+        source = os.path.join(self.static, "index.css")
+        target = os.path.join(self.root, "copy.css")
+        self.write(target, "body {}")
+
+        self.assertFalse(is_unchanged(source, target))
+        self.assertTrue(is_unchanged(source, target, checksum=True))
+
+    def test_is_unchanged_with_planned_stat(self):
+        source = os.path.join(self.static, "index.css")
+        target = os.path.join(self.root, "copy.css")
+        self.write(target, "body {}")
+        stat = os.stat(target)
+
+        self.assertTrue(is_unchanged(source, target, source_stat=(stat.st_mtime_ns, 7)))
+        self.assertFalse(is_unchanged(source, target, source_stat=(0, 7)))
+        self.assertFalse(
+            is_unchanged(source, target, source_stat=(stat.st_mtime_ns, 8))
+        )
+
+    def test_hardlink(self):
+        sync_files(self.static, self.public, link_mode="hardlink")
+
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(self.static, "index.css"),
+                os.path.join(self.public, "index.css"),
+            )
+        )
+
+    def test_reflink_falls_back_to_copy(self):
+        sync_files(self.static, self.public, link_mode="reflink")
+        self.assertEqual(
+            "png", self.read(os.path.join(self.public, "images", "logo.png"))
+        )
+
+    def test_invalid_link_mode(self):
+        with self.assertRaisesRegex(ValueError, "Invalid link mode"):
+            sync_files(self.static, self.public, link_mode="symlink")
+
+    def test_prune_files_keeps_root(self):
+        sync_files(self.static, self.public)
+        logo = os.path.join(self.public, "images", "logo.png")
+        css = os.path.join(self.public, "index.css")
+
+        self.assertListEqual([logo, css], prune_files([logo, css], self.public))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images")))
+        self.assertTrue(os.path.isdir(self.public))
+
+    def test_copy_files_prunes_removed_assets_and_keeps_pages(self):
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        copy_files(self.static, self.public, manifest)
+        self.write(os.path.join(self.public, "index.html"), "<html></html>")
+
+        os.remove(os.path.join(self.static, "images", "logo.png"))
+        copy_files(self.static, self.public, manifest)
+
+        self.assertFalse(
+            os.path.exists(os.path.join(self.public, "images", "logo.png"))
+        )
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+        self.assertListEqual([os.path.join(self.public, "index.css")], manifest.assets)
+
+
+if __name__ == "__main__":
+    unittest.main()
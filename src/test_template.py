@@ -0,0 +1,52 @@
+import io
+import unittest
+
+from template import Template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile(self):
+        template = Template("<title>{{ Title }}</title><body>{{Content}}</body>")
+
+        self.assertListEqual(
+            [
+                "<title>",
+                ("Title", "{{ Title }}"),
+                "</title><body>",
+                ("Content", "{{Content}}"),
+                "</body>",
+            ],
+            template.pieces,
+        )
+        self.assertSetEqual({"Title", "Content"}, template.placeholders)
+
+    def test_render(self):
+        template = Template("<title> {{ Title }} </title>{{ Content }}{{ Title }}")
+
+        self.assertEqual(
+            "<title> Hi </title><p>x</p>Hi",
+            template.render({"Title": "Hi", "Content": "<p>x</p>"}),
+        )
+
+    def test_render_keeps_unknown_placeholders(self):
+        template = Template("{{ Title }} {{ Author }}")
+        self.assertEqual("Hi {{ Author }}", template.render({"Title": "Hi"}))
+
+    def test_render_does_not_expand_values(self):
+        template = Template("{{ Title }}|{{ Content }}")
+        self.assertEqual(
+            "{{ Content }}|body",
+            template.render({"Title": "{{ Content }}", "Content": "body"}),
+        )
+
+    def test_write_streams_callable_values(self):
+        template = Template("<a>{{ Content }}</a><b>{{ Content }}</b>")
+        stream = io.StringIO()
+
+        template.write(stream, {"Content": lambda: iter(["x", "y"])})
+
+        self.assertEqual("<a>xy</a><b>xy</b>", stream.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
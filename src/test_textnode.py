@@ -26,6 +26,14 @@ class TestTextNode(unittest.TestCase):
         italic = TextNode("Hello", "italic", None)
         self.assertEqual(italic.to_html_node().to_html(), "<i>Hello</i>")
 
+    def test_to_html_node_shared(self):
+        text = TextNode(" and ", "text")
+        self.assertIs(text.to_html_node(shared=True), text.to_html_node(shared=True))
+        self.assertIsNot(text.to_html_node(), text.to_html_node())
+
+    def test_slots(self):
+        self.assertFalse(hasattr(TextNode("Hello", "text"), "__dict__"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,99 @@
+import os
+import unittest
+
+from sitetest import SiteTestCase
+from watch import InotifyWatcher, PollingWatcher, watch
+
+
+class FakeWatcher:
+    def __init__(self, batches):
+        self.batches = batches
+
+    def wait(self, timeout=None):
+        if not self.batches:
+            raise KeyboardInterrupt
+
+        return self.batches.pop(0)
+
+
+class TestWatch(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write_site({}, template="{{ Content }}")
+
+    def assert_detects_changes(self, watcher):
+        page = os.path.join(self.content, "page.md")
+        self.write(page, "# Page")
+        self.write(os.path.join(self.root, "unwatched.txt"), "ignored")
+        self.assertSetEqual({page}, watcher.wait(1))
+
+        os.remove(page)
+        self.assertSetEqual({page}, watcher.wait(1))
+
+        self.write(self.template, "<b>{{ Content }}</b>!")
+        self.assertSetEqual({self.template}, watcher.wait(1))
+
+        self.assertSetEqual(set(), watcher.wait(0))
+
+    def test_polling_watcher(self):
+        self.assert_detects_changes(PollingWatcher([self.content, self.template], 0))
+
+    def test_inotify_watcher(self):
+        try:
+            watcher = InotifyWatcher([self.content, self.template])
+        except OSError:
+            self.skipTest("inotify is not available")
+
+        try:
+            self.assert_detects_changes(watcher)
+
+            nested = os.path.join(self.content, "blog")
+            os.makedirs(nested)
+            self.write(os.path.join(nested, "post.md"), "# Post")
+            changed = watcher.wait(1) | watcher.wait(0.1)
+            self.assertIn(os.path.join(nested, "post.md"), changed)
+
+            moved = os.path.join(self.content, "moved")
+            os.rename(nested, moved)
+            changed = watcher.wait(1) | watcher.wait(0.1)
+            self.assertSetEqual(
+                {os.path.join(nested, "post.md"), os.path.join(moved, "post.md")},
+                changed,
+            )
+
+            os.rename(moved, os.path.join(self.root, "outside"))
+            changed = watcher.wait(1) | watcher.wait(0.1)
+            self.assertSetEqual({os.path.join(moved, "post.md")}, changed)
+
+            self.write(os.path.join(self.root, "outside", "post.md"), "# Out")
+            self.assertSetEqual(set(), watcher.wait(0.1))
+
+            page = os.path.join(self.content, "page.md")
+            self.write(page, "# Page")
+            watcher.wait(1)
+            away = os.path.join(self.root, "away")
+            os.rename(self.content, away)
+            changed = watcher.wait(1) | watcher.wait(0.1)
+            self.assertSetEqual({page}, changed)
+
+            os.rename(away, self.content)
+            changed = watcher.wait(1) | watcher.wait(0.1)
+            self.assertSetEqual({page}, changed)
+
+            self.write(page, "# Edited")
+            self.assertSetEqual({page}, watcher.wait(1))
+        finally:
+            watcher.close()
+
+    def test_watch_debounces_bursts(self):
+        batches = []
+        watcher = FakeWatcher([{"a"}, {"b"}, set(), {"c"}, set()])
+
+        with self.assertRaises(KeyboardInterrupt):
+            watch(watcher, batches.append, debounce=0)
+
+        self.assertListEqual([{"a", "b"}, {"c"}], batches)
+
+
+if __name__ == "__main__":
+    unittest.main()
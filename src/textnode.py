@@ -1,4 +1,4 @@
-from leafnode import LeafNode
+from leafnode import LeafNode, shared_leaf
 
 
 text_type_text = "text"
@@ -20,6 +20,8 @@ class TextNode:
         url (str, optional): The URL associated with the text. Defaults to None.
     """
 
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         """
         Initializes a TextNode instance with the given text, text type, and optional URL.
@@ -34,10 +36,13 @@ class TextNode:
         self.text_type = text_type
         self.url = url
 
-    def to_html_node(self):
+    def to_html_node(self, shared=False):
         """
         Converts the TextNode to a LeafNode, representing the HTML element.
 
+        Args:
+            shared (bool, optional): Reuse flyweight leaves for short text without attributes. Defaults to False.
+
         Returns:
             LeafNode: The LeafNode instance representing the HTML element.
 
@@ -46,6 +51,9 @@ class TextNode:
         """
 
         if self.text_type == text_type_text:
+            if shared:
+                return shared_leaf(None, self.text)
+
             return LeafNode(None, self.text)
         if self.text_type == text_type_link:
             return LeafNode("a", self.text, {"href": self.url})
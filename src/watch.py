@@ -0,0 +1,390 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+)
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class PollingWatcher:
+    """
+    PollingWatcher detects changes by periodically comparing the size and mtime
+    of every watched file. It works on every platform.
+
+    Attributes:
+        paths (list): The watched files and directories.
+        interval (float): The number of seconds between two scans.
+    """
+
+    def __init__(self, paths, interval=0.5):
+        """
+        Initializes a PollingWatcher and takes the first snapshot.
+
+        Args:
+            paths (list): The files and directories to watch.
+            interval (float, optional): The number of seconds between two scans. Defaults to 0.5.
+        """
+
+        self.paths = paths
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        """
+        Records the size and mtime of every watched file.
+
+        Returns:
+            dict: Maps each file path to its (mtime, size) tuple.
+        """
+
+        snapshot = {}
+
+        for path in self.paths:
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+                continue
+
+            for root, _, files in os.walk(path):
+                for file in files:
+                    file_path = os.path.join(root, file)
+
+                    try:
+                        stat = os.stat(file_path)
+                    except FileNotFoundError:
+                        continue
+
+                    snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+
+        return snapshot
+
+    def wait(self, timeout=None):
+        """
+        Waits for changes to the watched paths.
+
+        Args:
+            timeout (float, optional): The maximum number of seconds to wait. Defaults to waiting forever.
+
+        Returns:
+            set: The paths that were created, modified or removed.
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in snapshot.keys() | self.snapshot.keys()
+                if snapshot.get(path) != self.snapshot.get(path)
+            }
+            self.snapshot = snapshot
+
+            if changed:
+                return changed
+
+            if deadline is None:
+                time.sleep(self.interval)
+                continue
+
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0:
+                return set()
+
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        """
+        Releases the resources of the watcher.
+        """
+
+
+class InotifyWatcher:
+    """
+    InotifyWatcher receives change notifications from the Linux kernel through
+    inotify, so nothing is scanned while the watched paths are idle.
+
+    Attributes:
+        paths (list): The watched files and directories.
+    """
+
+    def __init__(self, paths):
+        """
+        Initializes an InotifyWatcher and watches every directory under the given paths.
+
+        Args:
+            paths (list): The files and directories to watch.
+
+        Raises:
+            OSError: If inotify is not available.
+        """
+
+        library = ctypes.util.find_library("c")
+
+        if library is None:
+            raise OSError("libc not found")
+
+        self._libc = ctypes.CDLL(library, use_errno=True)
+
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.paths = paths
+        self._directories = {}
+        self._files = set()
+        self._trees = []
+        # The files known under the watched trees, reported when their
+        # directory is moved away or deleted.
+        self._known = set()
+
+        for path in paths:
+            if os.path.isdir(path):
+                self._trees.append(os.path.normpath(path))
+                self._watch_tree(path)
+                # The parent reports the tree itself being moved away or deleted.
+                self._watch(os.path.dirname(os.path.normpath(path)) or ".")
+            else:
+                self._files.add(os.path.normpath(path))
+                self._watch(os.path.dirname(path) or ".")
+
+    def _watch(self, directory):
+        """
+        Adds an inotify watch on a single directory.
+
+        Args:
+            directory (str): The directory to watch.
+        """
+
+        wd = self._libc.inotify_add_watch(
+            self.fd, os.fsencode(directory), ctypes.c_uint32(WATCH_MASK)
+        )
+
+        if wd >= 0:
+            self._directories[wd] = directory
+
+    def _watch_tree(self, directory):
+        """
+        Watches a directory and all its subdirectories.
+
+        Args:
+            directory (str): The root of the tree to watch.
+
+        Returns:
+            set: The files found in the tree.
+        """
+
+        files = set()
+
+        for root, _, names in os.walk(directory):
+            self._watch(root)
+            files.update(os.path.normpath(os.path.join(root, n)) for n in names)
+
+        self._known |= files
+        return files
+
+    def _forget_tree(self, directory):
+        """
+        Stops watching a directory that was moved away or deleted, along with its
+        subdirectories.
+
+        Args:
+            directory (str): The root of the tree.
+
+        Returns:
+            set: The files that were known in the tree.
+        """
+
+        prefix = directory + os.sep
+        files = {path for path in self._known if path.startswith(prefix)}
+        self._known -= files
+
+        for wd, watched in list(self._directories.items()):
+            if watched == directory or watched.startswith(prefix):
+                del self._directories[wd]
+                self._libc.inotify_rm_watch(self.fd, wd)
+
+        return files
+
+    def _is_watched(self, path):
+        """
+        Checks whether a path belongs to one of the watched files or directories.
+
+        Args:
+            path (str): The path to check.
+
+        Returns:
+            bool: True if the path is watched.
+        """
+
+        path = os.path.normpath(path)
+
+        if path in self._files or path in self._trees:
+            return True
+
+        return any(path.startswith(tree + os.sep) for tree in self._trees)
+
+    def _read_events(self):
+        """
+        Drains the pending inotify events.
+
+        Returns:
+            set: The paths affected by the events.
+        """
+
+        changed = set()
+
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+
+            pos = 0
+
+            while pos < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, pos)
+                pos += EVENT_HEADER.size
+                name = os.fsdecode(data[pos : pos + length].rstrip(b"\0"))
+                pos += length
+
+                if mask & IN_Q_OVERFLOW:
+                    changed.update(self.paths)
+                    continue
+
+                directory = self._directories.get(wd)
+
+                if mask & IN_IGNORED:
+                    self._directories.pop(wd, None)
+
+                if directory is None or not name:
+                    continue
+
+                path = os.path.normpath(os.path.join(directory, name))
+
+                if not self._is_watched(path):
+                    continue
+
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        changed.update(self._watch_tree(path))
+                    elif mask & (IN_DELETE | IN_MOVED_FROM):
+                        changed.update(self._forget_tree(path))
+                    continue
+
+                if mask & (IN_DELETE | IN_MOVED_FROM):
+                    self._known.discard(path)
+                else:
+                    self._known.add(path)
+
+                changed.add(path)
+
+    def wait(self, timeout=None):
+        """
+        Waits for changes to the watched paths.
+
+        Args:
+            timeout (float, optional): The maximum number of seconds to wait. Defaults to waiting forever.
+
+        Returns:
+            set: The paths that were created, modified or removed.
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            remaining = None
+
+            if deadline is not None:
+                remaining = max(0, deadline - time.monotonic())
+
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+
+            if ready:
+                changed = self._read_events()
+
+                if changed:
+                    return changed
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+
+    def close(self):
+        """
+        Releases the inotify file descriptor.
+        """
+
+        os.close(self.fd)
+
+
+def create_watcher(paths, interval=0.5):
+    """
+    Creates the most efficient watcher available, falling back to polling.
+
+    Args:
+        paths (list): The files and directories to watch.
+        interval (float, optional): The polling interval used by the fallback. Defaults to 0.5.
+
+    Returns:
+        InotifyWatcher or PollingWatcher: The watcher.
+    """
+
+    try:
+        return InotifyWatcher(paths)
+    except OSError:
+        return PollingWatcher(paths, interval)
+
+
+def watch(watcher, on_change, debounce=0.1):
+    """
+    Calls on_change with batches of changed paths, waiting for bursts of events
+    to settle first. Runs until interrupted.
+
+    Args:
+        watcher (InotifyWatcher or PollingWatcher): The watcher to read changes from.
+        on_change (callable): Called with the set of changed paths.
+        debounce (float, optional): The number of quiet seconds that end a burst. Defaults to 0.1.
+    """
+
+    while True:
+        changed = watcher.wait()
+
+        while True:
+            more = watcher.wait(debounce)
+
+            if not more:
+                break
+
+            changed |= more
+
+        on_change(changed)